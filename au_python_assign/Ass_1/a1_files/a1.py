@@ -1,42 +1,201 @@
+import argparse
+import shutil
+import sys
+import time
+from collections import Counter, deque
+
 from a1_support import *
 
 
-def display_game(game, grid_size):
+def display_game(game, grid_size, file=None, viewport=None):
     """Prints the current game to the player.
 
-    First loop takes care of the first line only.
-    Second loop adds rest of the rows to the print string.
+    The header line is written first, then each row followed by its wall.
+    Rows are written straight to the output as they are made, so the time
+    taken is linear in the size of the grid and no second copy of the whole
+    board is held in memory.
+
+    With a viewport only that window of the board is formatted, labelled
+    with its real rows and columns, so the cost does not depend on grid_size.
 
 	Parameters:
 		game (str): Game string.
         grid_size (int): Size of the game grid.
+        file (file): Text stream to write to, sys.stdout by default.
+        viewport (tuple<int, int, int, int>): Top row, left column, number of
+            rows and number of columns to show; the whole board by default.
 	"""
-    wall_h = WALL_HORIZONTAL * 5 * grid_size + WALL_HORIZONTAL
-    i = 0
-    print_game = ""
-    while i <= grid_size: # first line
-        if i == 0:
-            print_game += "  " + WALL_VERTICAL
+    write = (sys.stdout if file is None else file).write
+    top, left, rows, columns = viewport or (0, 0, grid_size, grid_size)
+    width = len(row_label(top + rows - 1))
+    wall_h = WALL_HORIZONTAL * 5 * columns + WALL_HORIZONTAL
+    separator = f" {WALL_VERTICAL} "
+
+    header = [" " * width + " " + WALL_VERTICAL]
+    for i in range(left + 1, left + columns + 1): # first line
+        if i < 10:
+            header.append(" " + str(i) + " " + WALL_VERTICAL)
         else:
-            if i < 10:
-                print_game += " " + str(i) + " " + WALL_VERTICAL
-            else:
-                print_game += " " + str(i) + WALL_VERTICAL
-        i += 1
-
-    print_game += '\n' + wall_h
-    i = 0
-    j = 0
-    while i < grid_size: # row
-        print_game += '\n' + ALPHA[i] + " " + WALL_VERTICAL
-        while j < grid_size: # cell
-            print_game += " " + game[j+i*grid_size] + " " + WALL_VERTICAL
-            j += 1
-        print_game += '\n' + wall_h
-        i += 1
-        j = 0
-
-    print(print_game)
+            header.append(f"{i:>3}" + WALL_VERTICAL)
+    write("".join(header) + "\n" + wall_h + "\n")
+
+    for i in range(top, top + rows): # row
+        start = i * grid_size + left
+        row = game[start:start + columns]
+        write(f"{row_label(i):<{width}} {WALL_VERTICAL} "
+              + separator.join(row) + separator.rstrip() + "\n" + wall_h + "\n")
+
+
+def viewport_around(index, grid_size, size=VIEWPORT_SIZE):
+    """Returns the viewport of display_game centred on a cell.
+
+    The window is moved back inside the board near its edges, and boards no
+    bigger than size are shown whole.
+
+    Parameters:
+        index (int): Index of the cell to centre on.
+        grid_size (int): Size of the game grid.
+        size (int): Number of rows and columns in the viewport.
+
+    Returns:
+        (tuple<int, int, int, int>): Top row, left column, rows and columns.
+    """
+    size = min(size, grid_size)
+    row, column = divmod(index, grid_size)
+    top = min(max(row - size // 2, 0), grid_size - size)
+    left = min(max(column - size // 2, 0), grid_size - size)
+    return top, left, size, size
+
+
+class TerminalRenderer:
+    """Draws the game on an ANSI terminal, updating only what changed.
+
+    The grid is drawn once with display_game. After that only the cells
+    which differ from the last drawn state are rewritten, each one moved to
+    with a cursor-addressing escape sequence. The whole screen is drawn
+    again when the terminal is resized, the viewport moves or after reset.
+    """
+
+    def __init__(self, grid_size, file=None):
+        """Constructor.
+
+        Parameters:
+            grid_size (int): Size of the game grid.
+            file (file): Text stream of the terminal, sys.stdout by default.
+        """
+        self._grid_size = grid_size
+        self._file = sys.stdout if file is None else file
+        self._viewport = None
+        self._terminal_size = None
+        self._rows = []
+        self._idle_lines = 0
+
+    def reset(self):
+        """Makes the next update draw the whole screen, e.g. after restart."""
+        self._viewport = None
+
+    def update(self, game, viewport=None):
+        """Brings the terminal up to date with the game.
+
+        Afterwards the cursor is left on a cleared line under the grid, ready
+        for the prompt.
+
+        Parameters:
+            game (str): Game string.
+            viewport (tuple<int, int, int, int>): Window shown, as for display_game.
+        """
+        grid_size = self._grid_size
+        viewport = viewport or (0, 0, grid_size, grid_size)
+        terminal_size = shutil.get_terminal_size()
+        if viewport != self._viewport or terminal_size != self._terminal_size:
+            self._redraw(game, viewport, terminal_size)
+            return
+
+        top, left, rows, columns = viewport
+        width = len(row_label(top + rows - 1))
+        write = self._file.write
+        changed = False
+        for i in range(rows):
+            start = (top + i) * grid_size + left
+            row = game[start:start + columns]
+            old_row = self._rows[i]
+            if row == old_row:
+                continue
+            for j in range(columns):
+                if row[j] != old_row[j]:
+                    write(f"\x1b[{3 + 2 * i};{width + 4 + 4 * j}H{row[j]}")
+            self._rows[i] = row
+            changed = True
+
+        # Messages printed after the last prompt are kept until something
+        # changes or they would scroll the grid off the top of the screen.
+        self._idle_lines += 3
+        if changed or 3 + 2 * rows + self._idle_lines > terminal_size.lines:
+            write(f"\x1b[{3 + 2 * rows};1H\x1b[J")
+            self._idle_lines = 0
+        self._file.flush()
+
+    def _redraw(self, game, viewport, terminal_size):
+        """Clears the screen and draws the whole viewport."""
+        top, left, rows, columns = viewport
+        self._file.write("\x1b[H\x1b[2J")
+        display_game(game, self._grid_size, self._file, viewport)
+        self._file.flush()
+        self._rows = [game[(top + i) * self._grid_size + left:
+                           (top + i) * self._grid_size + left + columns]
+                      for i in range(rows)]
+        self._viewport = viewport
+        self._terminal_size = terminal_size
+        self._idle_lines = 0
+
+
+def cell_position(text, grid_size):
+    """Reads a cell such as "A1" or "AB12" into a position.
+
+    Parameters:
+        text (str): Row label followed by a column number, counted from 1.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (tuple<int, int>): Position of the cell; row, column.
+        None: If text is not a cell on the grid.
+    """
+    letters = text.rstrip("0123456789")
+    digits = text[len(letters):]
+    row = row_from_label(letters)
+    if row == -1 or row >= grid_size or not digits:
+        return None
+    column = int(digits)
+    if not 1 <= column <= grid_size:
+        return None
+    return row, column - 1
+
+
+def parse_action(action, grid_size):
+    """Reads a player action, without printing or asking anything.
+
+	Parameters:
+		action (str): Player input - action.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (tuple<str, tuple<int, int>>): Kind of action, one of "help", "quit",
+            "reset", "move", "flag", "chord", "view" or "invalid", and the position of
+            the cell for cell actions, otherwise None.
+	"""
+    if action == "h": # Help
+        return "help", None
+    elif action == "q": # Quit
+        return "quit", None
+    elif action == ":)": # Restart
+        return "reset", None
+
+    kind = {"f ": "flag", "c ": "chord", "v ": "view"}.get(action[:2], "move")
+    position = cell_position(action if kind == "move" else action[2:], grid_size)
+    if position is None:
+        return "invalid", None
+    return kind, position
+
 
 def parse_position(action, grid_size):
     """Checking validity of player input.
@@ -51,10 +210,11 @@ def parse_position(action, grid_size):
         (tuple<int, int>): Tuple of position if player inputs flag on move to cell.
         (str): String for game to decide what to do based on player input.
 	"""
-    if action == "h": # Help
+    kind, position = parse_action(action, grid_size)
+    if kind == "help":
         print(HELP_TEXT)
         return None
-    elif action == "q": # Quit
+    elif kind == "quit":
         quit_yn = str(input("You sure about that buddy? (y/n): "))
         if quit_yn == "y":
             print("Catch you on the flip side.")
@@ -64,26 +224,12 @@ def parse_position(action, grid_size):
         else:
             print(INVALID)
             return None
-    elif len(action) >= 2 and len(action) <= 3 and action[0] in ALPHA and action[1:].isdigit(): # Move to cell
-        if ALPHA.find(action[0]) < grid_size and int(action[1:]) <= grid_size:
-            position = ALPHA.find(action[0]), int(action[1:]) - 1
-            return position
-        else:
-            print(INVALID)
-            return None
-    elif len(action) >= 4 and len(action) <= 5 and action[0] =="f" and action[1] == " " and action[2] in ALPHA and action[3:].isdigit(): # Flag cell
-        if ALPHA.find(action[2]) < grid_size and int(action[3:]) <= grid_size:
-            position = ALPHA.find(action[2]), int(action[3:]) - 1
-            return position
-        else:
-            print(INVALID)
-            return None
-    elif action == ":)": # Restart
+    elif kind == "reset":
         print("It's rewind time.")
         return "reset"
-    else:
+    elif kind == "invalid":
         print(INVALID)
-        return None
+    return position
 
 
 def position_to_index(position, grid_size):
@@ -117,14 +263,19 @@ def index_to_position(index, grid_size):
 def replace_character_at_index(game, index, character):
     """Replaces character at game index to a different one.
 
+    A BoardStore is updated in place; a plain string is rebuilt.
+
 	Parameters:
-        game (str): Game string.
+        game (str|BoardStore): Game string.
 		index (int): Index in a game string.
         character (str): Character to replace at game index.
 
     Returns:
-        (str): Game string.
+        (str|BoardStore): Game string.
 	"""
+    if isinstance(game, BoardStore):
+        game[index] = character
+        return game
     game = game[:index] + character + game[index + 1:]
     return game
 
@@ -142,7 +293,7 @@ def flag_cell(game, index):
     if game[index] != FLAG:
         game = replace_character_at_index(game, index, FLAG)
     else:
-        game = game[:index] + UNEXPOSED + game[index + 1:]
+        game = replace_character_at_index(game, index, UNEXPOSED)
     return game
 
 
@@ -192,12 +343,7 @@ def neighbour_directions(index, grid_size):
     Returns:
         (list<int>): List of indexes representing neighbour cells.
 	"""
-    neighbours = []
-    for direction in DIRECTIONS:
-        neighbour = index_in_direction(index, grid_size, direction)
-        if neighbour != None:
-            neighbours.append(neighbour)
-    return neighbours
+    return neighbour_table(grid_size).neighbours(index)
 
 
 def number_at_cell(game, pokemon_locations, grid_size, index):
@@ -212,6 +358,10 @@ def number_at_cell(game, pokemon_locations, grid_size, index):
     Returns:
         (int): Number of pokemons in neighbour cells to the selected one.
 	"""
+    if (isinstance(pokemon_locations, PokemonLocations)
+            and pokemon_locations.get_grid_size() == grid_size):
+        return pokemon_locations.get_counts()[index]
+
     neighbours = neighbour_directions(index, grid_size)
     poke_num_neighbour = 0
 
@@ -222,6 +372,29 @@ def number_at_cell(game, pokemon_locations, grid_size, index):
     return poke_num_neighbour
 
 
+def chord_targets(game, grid_size, index):
+    """Returns the cells a chord on a numbered cell would reveal.
+
+    A chord reveals every unexposed neighbour of a number once that many of
+    its neighbours are flagged.
+
+	Parameters:
+        game (str): Game string.
+        grid_size (int): Size of the game grid.
+		index (int): Index of the numbered cell.
+
+    Returns:
+        (list<int>): Unexposed neighbours, or an empty list if the number is
+            not satisfied or the cell is not a number.
+	"""
+    if not game[index].isdigit():
+        return []
+    neighbours = neighbour_directions(index, grid_size)
+    if sum(1 for i in neighbours if game[i] == FLAG) != int(game[index]):
+        return []
+    return [i for i in neighbours if game[i] == UNEXPOSED]
+
+
 def check_win(game, pokemon_locations):
     """Returns True if win conditions were met.
 
@@ -245,10 +418,11 @@ def check_win(game, pokemon_locations):
     return win
 
 
-def main():
+def main(seed=None, board_id=None, ansi=False, journal=None):
     """Main function of the Pokemon game.
 
     The game starts with request for player input concerning grid size and number of pokemons.
+    When a board ID is given, the board it identifies is played instead.
 
     Game string is generated, printed out and player has to input an action.
     This repeats until end of game occurs.
@@ -258,50 +432,56 @@ def main():
     For list of valid actions, read string "HELP_TEXT" from a1_support.py.
 
     Game loops until a check_win function returns True or until the player looses, resets the game, or quits.
+
+    Big boards are shown through a viewport which follows the last action
+    and can be moved with the "v" command. The rules are played by a
+    GameSession. With ansi the grid is drawn by a
+    TerminalRenderer, which only rewrites the cells that changed.
+
+    Parameters:
+        seed (int|random.Random): Seed or random generator for reproducible boards.
+        board_id (str): ID of a board to play, see make_board_id.
+        ansi (bool): Draw the game with ANSI escape sequences.
+        journal (Journal): Journal to record the games and moves in.
 	"""
-    grid_size = int(input("Please input the size of the grid: "))
-    number_of_pokemons = int(input("Please input the number of pokemons: "))
-
-    pokemon_locations = generate_pokemons(grid_size, number_of_pokemons)
-    
-    game = grid_size * grid_size * UNEXPOSED
-    position = None
-    
-    while check_win(game, pokemon_locations) != True:
-        while position == None:
-            display_game(game, grid_size)
-            action = str(input('\n' + "Please input action: "))
-            position = parse_position(action, grid_size)
-            if position == "quit":
-                return
-            elif position != None and position != "reset":
-                index = position_to_index(position, grid_size)
-                if game[index] == FLAG and action[0] != "f":
-                        position = None
-                    
-        position = None
-        if action[0] == "f":
-            game = flag_cell(game, index)
-        elif action == ":)":
-            pokemon_locations = generate_pokemons(grid_size, number_of_pokemons)
-            game = grid_size * grid_size * UNEXPOSED
-        elif index in pokemon_locations:
-            for i in pokemon_locations:
-                game = replace_character_at_index(game, i, POKEMON)
-            display_game(game, grid_size)
+    if board_id is not None:
+        grid_size, number_of_pokemons, seed = parse_board_id(board_id)
+    else:
+        grid_size = int(input("Please input the size of the grid: "))
+        number_of_pokemons = int(input("Please input the number of pokemons: "))
+
+    session = GameSession(grid_size, number_of_pokemons, seed, journal)
+    centre = grid_size // 2 * grid_size + grid_size // 2
+    viewport = viewport_around(centre, grid_size)
+    renderer = TerminalRenderer(grid_size) if ansi else None
+    if renderer is not None:
+        show = renderer.update
+    else:
+        show = lambda game, viewport: display_game(game, grid_size, viewport=viewport)
+
+    while True:
+        show(session.get_game(), viewport)
+        action = str(input('\n' + "Please input action: "))
+        position = parse_position(action, grid_size)
+        if position == "quit":
+            return
+        elif position == None:
+            continue
+        elif position != "reset":
+            viewport = viewport_around(position_to_index(position, grid_size), grid_size)
+
+        result = session.act(action)
+        if result == "reset" and renderer is not None:
+            renderer.reset()
+        elif result == "lost":
+            show(session.get_game(), viewport)
             print("You have scared away all the pokemons.")
             return
-        else:
-            search = big_fun_search(game, grid_size, pokemon_locations, index)
-            game = replace_character_at_index(game, index, EXPOSED)
-            for i in search:
-                pok_num = number_at_cell(game, pokemon_locations, grid_size, i)
-                if game[i] != FLAG:
-                    game = replace_character_at_index(game, i, str(int(EXPOSED) + pok_num))
-                    
-    display_game(game, grid_size)
-    print("You win.")
-    return
+        elif result == "won":
+            show(session.get_game(), viewport)
+            print("You win.")
+            return
+
 
 def big_fun_search(game, grid_size, pokemon_locations, index):
     """Searching adjacent cells to see if there are any Pokemon"s present.
@@ -327,31 +507,291 @@ def big_fun_search(game, grid_size, pokemon_locations, index):
 	Returns:
 		(list<int>): List of cells to turn visible.
 	"""
-    queue = [index]
-    discovered = [index]
     visible = []
 
     if game[index] == FLAG:
-	    return queue
+        return [index]
 
-    number = number_at_cell(game, pokemon_locations, grid_size, index)
-    if number != 0:
-	    return queue
+    counts = counts_for(pokemon_locations, grid_size)
+    if counts[index] != 0:
+        return [index]
 
+    table = neighbour_table(grid_size)
+    discovered = bytearray(grid_size * grid_size)
+    discovered[index] = 1
+    queue = deque([index])
     while queue:
-	    node = queue.pop()
-	    for neighbour in neighbour_directions(node, grid_size):
-		    if neighbour in discovered or neighbour is None:
-			    continue
-
-		    discovered.append(neighbour)
-		    if game[neighbour] != FLAG:
-			    number = number_at_cell(game, pokemon_locations, grid_size, neighbour)
-			    if number == 0:
-				    queue.append(neighbour)
-		    visible.append(neighbour)
+        node = queue.popleft()
+        for offset in table.offsets_at(node):
+            neighbour = node + offset
+            if discovered[neighbour]:
+                continue
+
+            discovered[neighbour] = 1
+            if game[neighbour] != FLAG and counts[neighbour] == 0:
+                queue.append(neighbour)
+            visible.append(neighbour)
     return visible
+
+
+def reveal_region(game, grid_size, pokemon_locations, index):
+    """Reveals the selected cell and everything big_fun_search would open.
+
+    Works directly on the cell codes of a BoardStore: the frontier is a deque
+    and discovered cells are marked in a bytearray, so the cost is
+    proportional to the revealed region. Flagged cells are neither revealed
+    nor searched through.
+
+    Parameters:
+        game (BoardStore): Game store, updated in place.
+        grid_size (int): Size of game.
+        pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        index (int): Index of the currently selected cell
+
+    Returns:
+        (list<int>): Indexes of the cells which were turned visible.
+    """
+    cells = game.get_cells()
+    flag = cell_code(FLAG)
+    unexposed = cell_code(UNEXPOSED)
+    exposed = cell_code(EXPOSED)
+    counts = counts_for(pokemon_locations, grid_size)
+    changed = []
+
+    if cells[index] == flag:
+        return changed
+    if cells[index] == unexposed:
+        cells[index] = exposed + counts[index]
+        changed.append(index)
+    if counts[index] != 0:
+        game.touch()
+        return changed
+
+    offsets_at = neighbour_table(grid_size).offsets_at
+    discovered = bytearray(len(cells))
+    discovered[index] = 1
+    queue = deque([index])
+    while queue:
+        node = queue.popleft()
+        for offset in offsets_at(node):
+            neighbour = node + offset
+            if discovered[neighbour]:
+                continue
+            discovered[neighbour] = 1
+            code = cells[neighbour]
+            if code == flag:
+                continue
+            if code == unexposed:
+                cells[neighbour] = exposed + counts[neighbour]
+                changed.append(neighbour)
+            if counts[neighbour] == 0:
+                queue.append(neighbour)
+
+    game.touch()
+    return changed
+
 # #########################UNCOMMENT THIS FUNCTION WHEN READY#######################
 
+_JOURNAL_OPS = {"move": JOURNAL_MOVE, "flag": JOURNAL_FLAG, "chord": JOURNAL_CHORD}
+
+
+class GameSession:
+    """A game of Pokemon driven by action strings, with no input or output.
+
+    Actions are the ones the player types, see HELP_TEXT, and are read with
+    parse_action. Moves reveal cells like big_fun_search, working in place on
+    a BoardStore, so sessions can be driven at machine speed.
+    """
+
+    def __init__(self, grid_size, number_of_pokemons, seed=None, journal=None):
+        """Constructor.
+
+        Parameters:
+            grid_size (int): Size of the game grid.
+            number_of_pokemons (int): Number of pokemons on the board.
+            seed (int|random.Random): Seed or random generator for reproducible boards.
+            journal (Journal): Journal to record the games and moves in.
+        """
+        self._grid_size = grid_size
+        self._number_of_pokemons = number_of_pokemons
+        self._seeds = board_seeds(seed)
+        self._journal = journal
+        self.new_game()
+
+    def new_game(self):
+        """Starts a new game on the next board."""
+        self._seed = next(self._seeds)
+        self._pokemon_locations = seeded_pokemons(self._grid_size,
+                                                  self._number_of_pokemons, self._seed)
+        self._game = BoardStore(self._grid_size * self._grid_size * UNEXPOSED)
+        self._status = "playing"
+        self._num_actions = 0
+        if self._journal is not None:
+            self._journal.start_game(make_board_id(self._grid_size,
+                                                   self._number_of_pokemons, self._seed))
+
+    def get_game(self):
+        """Returns the game store, which is updated in place as the game goes on."""
+        return self._game
+
+    def get_pokemon_locations(self):
+        """Returns the locations of the pokemons in the current game."""
+        return self._pokemon_locations
+
+    def state(self):
+        """Returns the state of the current game.
+
+        Returns:
+            (dict<str, object>): The board ID, game string, status ("playing",
+                "won" or "lost") and number of actions taken.
+        """
+        return {
+            "board_id": make_board_id(self._grid_size, self._number_of_pokemons, self._seed),
+            "game": str(self._game),
+            "status": self._status,
+            "actions": self._num_actions,
+        }
+
+    def act(self, action):
+        """Takes one player action.
+
+        Parameters:
+            action (str): Player input - action.
+
+        Returns:
+            (str): What happened: "revealed", "flagged", "ignored" for a move
+                onto a flag or a flag on a revealed cell, "lost", "won",
+                "reset", "over" if the game has already ended, or the kind of
+                an action without effect on the board ("help", "quit", "view"
+                or "invalid").
+        """
+        kind, position = parse_action(action, self._grid_size)
+        if kind == "reset":
+            self.new_game()
+            return "reset"
+        elif kind not in _JOURNAL_OPS:
+            return kind
+        elif self._status != "playing":
+            return "over"
+
+        index = position_to_index(position, self._grid_size)
+        if kind == "move" and self._game[index] == FLAG:
+            return "ignored"
+        elif kind == "flag" and self._game[index] not in (UNEXPOSED, FLAG):
+            return "ignored"
+        elif kind == "chord":
+            targets = chord_targets(self._game, self._grid_size, index)
+            if not targets:
+                return "ignored"
+
+        self._num_actions += 1
+        if self._journal is not None:
+            self._journal.record(_JOURNAL_OPS[kind], index)
+        if kind == "flag":
+            self._game = flag_cell(self._game, index)
+            result = "flagged"
+        elif kind == "chord":
+            # A wrong flag uncovers a Pokemon, which loses like a move onto it.
+            if any(i in self._pokemon_locations for i in targets):
+                return self._lose()
+            for i in targets:
+                reveal_region(self._game, self._grid_size, self._pokemon_locations, i)
+            result = "revealed"
+        elif index in self._pokemon_locations:
+            return self._lose()
+        else:
+            reveal_region(self._game, self._grid_size, self._pokemon_locations, index)
+            result = "revealed"
+
+        if check_win(self._game, self._pokemon_locations):
+            self._status = "won"
+            return "won"
+        return result
+
+    def _lose(self):
+        """Shows every pokemon and ends the game.
+
+        Returns:
+            (str): "lost".
+        """
+        for i in self._pokemon_locations:
+            self._game = replace_character_at_index(self._game, i, POKEMON)
+        self._status = "lost"
+        return "lost"
+
+
+def run_actions(session, actions):
+    """Plays a sequence of actions on a session without rendering anything.
+
+    A new game is started whenever one is won or lost.
+
+    Parameters:
+        session (GameSession): Session to drive.
+        actions (iterable<str>): Actions, e.g. the lines of a file.
+
+    Returns:
+        (dict<str, object>): Number of actions, count of each result, games
+            finished and the elapsed seconds.
+    """
+    results = Counter()
+    start = time.perf_counter()
+    for action in actions:
+        action = action.rstrip("\r\n")
+        if not action:
+            continue
+        result = session.act(action)
+        results[result] += 1
+        if result in ("won", "lost"):
+            session.new_game()
+    elapsed = time.perf_counter() - start
+    return {
+        "actions": sum(results.values()),
+        "results": results,
+        "games": results["won"] + results["lost"],
+        "seconds": elapsed,
+    }
+
+
+def print_summary(summary):
+    """Prints the statistics returned by run_actions."""
+    rate = summary["actions"] / summary["seconds"] if summary["seconds"] else 0.0
+    print(f"{summary['actions']} actions, {summary['games']} games finished "
+          f"in {summary['seconds']:.3f}s ({rate:,.0f} actions/s)")
+    for result, count in sorted(summary["results"].items()):
+        print(f"  {result:<9} {count}")
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Pokemon: Got 2 Find Them All!")
+    parser.add_argument("--seed", type=int, help="seed for reproducible boards")
+    parser.add_argument("--board", help="ID of a board to play")
+    parser.add_argument("--ansi", action="store_true",
+                        help="redraw only changed cells using ANSI escape sequences")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="play the actions in FILE ('-' for stdin) without rendering")
+    parser.add_argument("--size", type=int, help="grid size for --batch")
+    parser.add_argument("--pokemons", type=int, help="number of pokemons for --batch")
+    parser.add_argument("--journal", metavar="FILE", help="append the games and moves to FILE")
+    args = parser.parse_args()
+    if args.batch is not None and args.board is None and (args.size is None
+                                                          or args.pokemons is None):
+        parser.error("--batch needs --board, or --size and --pokemons")
+    journal_file = None if args.journal is None else open(args.journal, "a", encoding="ascii")
+    journal = None if journal_file is None else Journal(journal_file)
+    try:
+        if args.batch is None:
+            main(args.seed, args.board, args.ansi, journal)
+        else:
+            if args.board is not None:
+                grid_size, number_of_pokemons, seed = parse_board_id(args.board)
+            else:
+                grid_size, number_of_pokemons, seed = args.size, args.pokemons, args.seed
+            session = GameSession(grid_size, number_of_pokemons, seed, journal)
+            if args.batch == "-":
+                print_summary(run_actions(session, sys.stdin))
+            else:
+                with open(args.batch, encoding="utf-8") as actions:
+                    print_summary(run_actions(session, actions))
+    finally:
+        if journal_file is not None:
+            journal_file.close()
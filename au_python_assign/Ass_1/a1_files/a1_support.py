@@ -1,3 +1,4 @@
+import functools
 import random
 
 ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
@@ -14,37 +15,547 @@ POKEMON = "☺"
 FLAG = "♥"
 UNEXPOSED = "~"
 EXPOSED = "0"
+VIEWPORT_SIZE = 20
 INVALID = "That ain't a valid action buddy."
 HELP_TEXT = """h - Help.
-<Uppercase Letter><number> - Selecting a cell (e.g. 'A1')
-f <Uppercase Letter><number> - Placing flag at cell (e.g. 'f A1')
+<Uppercase Letters><number> - Selecting a cell (e.g. 'A1', 'AB12')
+f <Uppercase Letters><number> - Placing flag at cell (e.g. 'f A1')
+c <Uppercase Letters><number> - Reveal the neighbours of a number whose pokemons are all flagged (e.g. 'c B2')
+v <Uppercase Letters><number> - Centre the view on a cell (e.g. 'v AB12')
 :) - Restart game.
 q - Quit.
 """
 
+# Single byte codes of the cell characters stored in a BoardStore.
+# Digits and UNEXPOSED are plain ASCII and are stored as themselves.
+_ENCODE = str.maketrans({FLAG: "F", POKEMON: "P"})
+_CODES = {character: ord(character.translate(_ENCODE))
+          for character in EXPOSED + "12345678" + UNEXPOSED + FLAG + POKEMON}
+_CHARACTERS = {code: character for character, code in _CODES.items()}
 
-def generate_pokemons(grid_size, number_of_pokemons):
+
+class BoardStore:
+    """Mutable game string backed by a bytearray of cell codes.
+
+    Supports the parts of the str interface used by the game functions
+    (indexing, slicing, len, find, count and in), so it can be passed
+    anywhere a game string is read. Cells are updated in place with
+    item assignment; str() gives a cached string view.
+    """
+
+    def __init__(self, game):
+        """Create a store holding a copy of the game string.
+
+        Parameters:
+            game (str): Game string.
+        """
+        self._cells = bytearray(game.translate(_ENCODE), "ascii")
+        self._view = None
+
+    def __len__(self):
+        """Returns the number of cells."""
+        return len(self._cells)
+
+    def __getitem__(self, index):
+        """Returns the character at index, or a string for a slice."""
+        if isinstance(index, slice):
+            return self._decode(self._cells[index])
+        return _CHARACTERS[self._cells[index]]
+
+    def __setitem__(self, index, character):
+        """Replaces the character at index in place."""
+        self._cells[index] = _CODES[character]
+        self._view = None
+
+    def __iter__(self):
+        """Iterates over the game characters."""
+        return iter(str(self))
+
+    def __contains__(self, character):
+        """Returns True if the game contains character."""
+        if character in _CODES:
+            return _CODES[character] in self._cells
+        return character in str(self)
+
+    def __str__(self):
+        if self._view is None:
+            self._view = self._decode(self._cells)
+        return self._view
+
+    def __repr__(self):
+        return f"BoardStore({str(self)!r})"
+
+    @staticmethod
+    def _decode(cells):
+        """Convert stored cell codes back to game characters.
+
+        Parameters:
+            cells (bytes): Cell codes.
+
+        Returns:
+            (str): Game string.
+        """
+        return cells.decode("ascii").replace("F", FLAG).replace("P", POKEMON)
+
+    def get_cells(self):
+        """Get the cell codes, for loops that should not build string views.
+
+        Returns:
+            (bytearray): One code per cell, see cell_code.
+        """
+        return self._cells
+
+    def touch(self):
+        """Drop the cached string view after writing through get_cells."""
+        self._view = None
+
+    def find(self, character):
+        """Returns the lowest index of character, or -1 if it is not present.
+
+        Parameters:
+            character (str): Single game character.
+
+        Returns:
+            (int): Index of the first matching cell.
+        """
+        return self._cells.find(_CODES[character])
+
+    def count(self, character):
+        """Returns the number of cells holding character.
+
+        Parameters:
+            character (str): Single game character.
+
+        Returns:
+            (int): Number of matching cells.
+        """
+        return self._cells.count(_CODES[character])
+
+
+def cell_code(character):
+    """Returns the code a BoardStore uses for a game character.
+
+    Digits are consecutive, so the code of number n is cell_code(EXPOSED) + n.
+
+    Parameters:
+        character (str): Single game character.
+
+    Returns:
+        (int): Cell code.
+    """
+    return _CODES[character]
+
+
+class NeighbourTable:
+    """Neighbour lookup table for one grid size.
+
+    Holds the index offset of each direction in DIRECTIONS and a border mask
+    per cell, where bit k is set if DIRECTIONS[k] stays on the grid. The
+    neighbours of a cell are its index plus the offsets selected by its mask,
+    so no direction strings are compared at lookup time.
+    """
+
+    def __init__(self, grid_size):
+        """Build the table.
+
+        Parameters:
+            grid_size (int): Size of the game grid.
+        """
+        self._grid_size = grid_size
+        self._offsets = tuple(
+            (-grid_size if UP in direction else grid_size if DOWN in direction else 0)
+            + (-1 if LEFT in direction else 1 if RIGHT in direction else 0)
+            for direction in DIRECTIONS)
+
+        def row_masks(row):
+            masks = bytearray(grid_size)
+            for col in range(grid_size):
+                mask = 0
+                for bit, direction in enumerate(DIRECTIONS):
+                    if ((UP not in direction or row > 0)
+                            and (DOWN not in direction or row < grid_size - 1)
+                            and (LEFT not in direction or col > 0)
+                            and (RIGHT not in direction or col < grid_size - 1)):
+                        mask |= 1 << bit
+                masks[col] = mask
+            return masks
+
+        if grid_size > 1:
+            self._masks = (row_masks(0) + row_masks(1) * (grid_size - 2)
+                           + row_masks(grid_size - 1))
+        else:
+            self._masks = row_masks(0)
+
+        # Only nine distinct masks occur, so the offsets of each are shared.
+        self._mask_offsets = {
+            mask: tuple(offset for bit, offset in enumerate(self._offsets)
+                        if mask >> bit & 1)
+            for mask in set(self._masks)}
+
+    def get_offsets(self):
+        """Get the index offset of each direction, in DIRECTIONS order.
+
+        Returns:
+            (tuple<int, ...>): Index offsets.
+        """
+        return self._offsets
+
+    def get_masks(self):
+        """Get the border mask of every cell.
+
+        Returns:
+            (bytearray): One mask per cell.
+        """
+        return self._masks
+
+    def offsets_at(self, index):
+        """Returns the offsets leading to the neighbours of a cell.
+
+        Parameters:
+            index (int): Index in a game string.
+
+        Returns:
+            (tuple<int, ...>): Index offsets of the cell's neighbours.
+        """
+        return self._mask_offsets[self._masks[index]]
+
+    def neighbours(self, index):
+        """Returns indexes of the neighbour cells, in DIRECTIONS order.
+
+        Parameters:
+            index (int): Index in a game string.
+
+        Returns:
+            (list<int>): List of indexes representing neighbour cells.
+        """
+        return [index + offset for offset in self._mask_offsets[self._masks[index]]]
+
+
+@functools.lru_cache(maxsize=8)
+def neighbour_table(grid_size):
+    """Returns the shared NeighbourTable for a grid size, building it once.
+
+    Parameters:
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (NeighbourTable): Neighbour table for the grid size.
+    """
+    return NeighbourTable(grid_size)
+
+
+def pokemon_counts(pokemon_locations, grid_size):
+    """Counts the neighbouring Pokemon of every cell.
+
+    Parameters:
+        pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (bytearray): Number of Pokemon next to each cell.
+    """
+    cell_count = grid_size ** 2
+    table = neighbour_table(grid_size)
+    # Visiting the neighbours of each Pokemon only beats adding up the
+    # shifted boards below about one Pokemon in 48 cells.
+    if len(pokemon_locations) * 48 < cell_count:
+        counts = bytearray(cell_count)
+        for location in pokemon_locations:
+            for offset in table.offsets_at(location):
+                counts[location + offset] += 1
+        return counts
+
+    # Dense boards: treat the board as one big integer with a byte per cell
+    # and add a shifted copy of the Pokemon for each direction. A count is at
+    # most 8, so no byte ever carries into its neighbour.
+    pokemon = bytearray(cell_count)
+    for location in pokemon_locations:
+        pokemon[location] = 1
+    bits = int.from_bytes(pokemon, "little")
+    every_column = int.from_bytes(b"\x01" * cell_count, "little")
+    not_first_column = int.from_bytes(
+        (b"\x00" + b"\x01" * (grid_size - 1)) * grid_size, "little")
+    not_last_column = int.from_bytes(
+        (b"\x01" * (grid_size - 1) + b"\x00") * grid_size, "little")
+
+    total = 0
+    for direction, offset in zip(DIRECTIONS, table.get_offsets()):
+        shifted = bits >> 8 * offset if offset > 0 else bits << -8 * offset
+        if LEFT in direction:
+            total += shifted & not_first_column
+        elif RIGHT in direction:
+            total += shifted & not_last_column
+        else:
+            total += shifted & every_column
+    return bytearray(total.to_bytes(cell_count, "little"))
+
+
+def counts_for(pokemon_locations, grid_size):
+    """Returns neighbour counts for pokemon_locations, reusing stored ones.
+
+    Parameters:
+        pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (bytearray): Number of Pokemon next to each cell.
+    """
+    if (isinstance(pokemon_locations, PokemonLocations)
+            and pokemon_locations.get_grid_size() == grid_size):
+        return pokemon_locations.get_counts()
+    return pokemon_counts(pokemon_locations, grid_size)
+
+
+class PokemonLocations(tuple):
+    """Tuple of Pokemon locations which also holds the neighbour counts.
+
+    The counts are built once, when first asked for, so the number shown at
+    any cell is a lookup rather than a scan of the tuple. A set of the
+    locations backs membership tests.
+    """
+
+    def __new__(cls, locations, grid_size, counts=None):
+        """Create the locations tuple.
+
+        Parameters:
+            locations (iterable<int>): Indexes of the Pokemon.
+            grid_size (int): Size of the game grid.
+            counts (bytearray): Neighbour counts if already known.
+        """
+        self = super().__new__(cls, locations)
+        self._grid_size = grid_size
+        self._counts = counts
+        self._set = frozenset(self)
+        return self
+
+    def __contains__(self, index):
+        """Returns True if there is a Pokemon at index."""
+        return index in self._set
+
+    def __reduce__(self):
+        """Pickle as the plain locations and grid size."""
+        return PokemonLocations, (tuple(self), self._grid_size)
+
+    def get_grid_size(self):
+        """Get the size of the grid the Pokemon were placed on.
+
+        Returns:
+            (int): Size of the game grid.
+        """
+        return self._grid_size
+
+    def get_counts(self):
+        """Get the number of Pokemon next to each cell.
+
+        Returns:
+            (bytearray): One count per cell.
+        """
+        if self._counts is None:
+            self._counts = pokemon_counts(self, self._grid_size)
+        return self._counts
+
+    def get_set(self):
+        """Get the locations as a set, for membership tests.
+
+        Returns:
+            (frozenset<int>): Indexes of the Pokemon.
+        """
+        return self._set
+
+
+def generate_pokemons(grid_size, number_of_pokemons, rng=random):
     """Pokemons will be generated and given a random index within the game.
 
+    Sampling without replacement takes time linear in the number of
+    Pokemon, even on huge boards filled close to capacity.
+
     Parameters:
         grid_size (int): The grid size of the game.
         number_of_pokemons (int): The number of pokemons that the game will have.
+        rng (random.Random): Source of randomness, the random module by default.
 
     Returns:
-        (tuple<int>): A tuple containing  indexes where the pokemons are
+        (PokemonLocations): A tuple containing  indexes where the pokemons are
         created for the game string.
     """
     cell_count = grid_size ** 2
-    pokemon_locations = ()
+    number_of_pokemons = max(0, min(number_of_pokemons, cell_count))
+    if number_of_pokemons > cell_count // 2:
+        # Nearly full boards: sample the few empty cells instead.
+        empty = set(rng.sample(range(cell_count), cell_count - number_of_pokemons))
+        pokemon_locations = [index for index in range(cell_count) if index not in empty]
+    else:
+        pokemon_locations = rng.sample(range(cell_count), number_of_pokemons)
+
+    return PokemonLocations(pokemon_locations, grid_size)
+
+
+def board_seeds(seed=None):
+    """Yields the seeds of the successive boards of a session.
+
+    Parameters:
+        seed (int|random.Random): With an int, the first board uses it and
+            later seeds are drawn from random.Random(seed). With a
+            random.Random, every seed is drawn from it. With None, seeds are
+            drawn from the random module.
+
+    Yields:
+        (int): Board seed.
+    """
+    if isinstance(seed, int):
+        yield seed
+        rng = random.Random(seed)
+    else:
+        rng = random if seed is None else seed
+    while True:
+        yield rng.getrandbits(32)
+
+
+def seeded_pokemons(grid_size, number_of_pokemons, seed):
+    """Generates the Pokemon of the board identified by a seed.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons that the game will have.
+        seed (int): Board seed.
+
+    Returns:
+        (PokemonLocations): The same locations for the same arguments.
+    """
+    return generate_pokemons(grid_size, number_of_pokemons, random.Random(seed))
+
+
+def row_label(row):
+    """Returns the label of a row: "A" to "Z", then "AA", "AB" and so on.
+
+    Parameters:
+        row (int): Row number, counted from 0.
+
+    Returns:
+        (str): Row label.
+    """
+    label = ""
+    row += 1
+    while row:
+        row, letter = divmod(row - 1, len(ALPHA))
+        label = ALPHA[letter] + label
+    return label
+
+
+def row_from_label(label):
+    """Reads a row number out of a row label, the inverse of row_label.
+
+    Parameters:
+        label (str): Row label made of uppercase letters.
+
+    Returns:
+        (int): Row number, counted from 0, or -1 if label is not a row label.
+    """
+    if not label:
+        return -1
+    row = 0
+    for letter in label:
+        position = ALPHA.find(letter)
+        if position == -1:
+            return -1
+        row = row * len(ALPHA) + position + 1
+    return row - 1
+
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _to_base36(number):
+    """Formats an int in base 36, which int(text, 36) reads back."""
+    sign = "-" if number < 0 else ""
+    number = abs(number)
+    digits = ""
+    while True:
+        number, digit = divmod(number, 36)
+        digits = _BASE36[digit] + digits
+        if number == 0:
+            return sign + digits
+
+
+def make_board_id(grid_size, number_of_pokemons, seed):
+    """Returns a short identifier from which a board can be generated again.
+
+    For example make_board_id(10, 15, 12345) returns "a.f.9ix".
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons that the game will have.
+        seed (int): Board seed.
+
+    Returns:
+        (str): Board ID.
+    """
+    return ".".join(_to_base36(number) for number in (grid_size, number_of_pokemons, seed))
+
+
+def parse_board_id(board_id):
+    """Reads the grid size, number of pokemons and seed out of a board ID.
+
+    Parameters:
+        board_id (str): Board ID made by make_board_id.
+
+    Returns:
+        (tuple<int, int, int>): Grid size, number of pokemons and seed.
+
+    Raises:
+        ValueError: If board_id is not a valid board ID.
+    """
+    parts = board_id.split(".")
+    if len(parts) != 3:
+        raise ValueError(f"invalid board ID: {board_id!r}")
+    grid_size, number_of_pokemons, seed = (int(part, 36) for part in parts)
+    return grid_size, number_of_pokemons, seed
+
+
+JOURNAL_BOARD = "B"
+JOURNAL_MOVE = "M"
+JOURNAL_FLAG = "F"
+JOURNAL_CHORD = "C"
+JOURNAL_UNDO = "U"
+JOURNAL_REDO = "R"
+
+
+class Journal:
+    """Append-only record of the games played and the moves made in them.
+
+    Each line is an operation and its argument: JOURNAL_BOARD and the ID of
+    the board a game starts on, then JOURNAL_MOVE, JOURNAL_FLAG or
+    JOURNAL_CHORD and the index of each cell the player played, or
+    JOURNAL_UNDO or JOURNAL_REDO on their own. Replaying the moves on a
+    board generated from the ID gives back the same game.
+    """
+
+    def __init__(self, file):
+        """Create a journal writing to an open text file.
+
+        Parameters:
+            file (file): Text stream, normally opened for appending.
+        """
+        self._file = file
+
+    def start_game(self, board_id):
+        """Records the start of a game.
 
-    for _ in range(number_of_pokemons):
-        if len(pokemon_locations) >= cell_count:
-            break
-        index = random.randint(0, cell_count-1)
+        Parameters:
+            board_id (str): ID of the board, see make_board_id.
+        """
+        self._file.write(f"{JOURNAL_BOARD} {board_id}\n")
 
-        while index in pokemon_locations:
-            index = random.randint(0, cell_count-1)
+    def record(self, op, index=None):
+        """Records a move.
 
-        pokemon_locations += (index,)
+        Parameters:
+            op (str): JOURNAL_MOVE, JOURNAL_FLAG, JOURNAL_CHORD, JOURNAL_UNDO
+                or JOURNAL_REDO.
+            index (int): Index of the cell, except for undo and redo.
+        """
+        self._file.write(f"{op}\n" if index is None else f"{op} {index}\n")
 
-    return pokemon_locations
+    def flush(self):
+        """Writes any buffered records to the file."""
+        self._file.flush()
@@ -0,0 +1,373 @@
+"""
+Behavioural tests of a1.py and a1_support.py
+"""
+
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+# The test runner is shared with Assignment 3.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Ass_3"))
+from testrunner import OrderedTestCase, TestMaster
+
+
+class A1:
+    display_game: ...
+    TerminalRenderer: ...
+    viewport_around: ...
+    cell_position: ...
+    parse_action: ...
+    parse_position: ...
+    GameSession: ...
+    run_actions: ...
+
+
+class A1Support:
+    ALPHA: ...
+    FLAG: ...
+    INVALID: ...
+    UNEXPOSED: ...
+    WALL_HORIZONTAL: ...
+    WALL_VERTICAL: ...
+    row_label: ...
+    row_from_label: ...
+    make_board_id: ...
+
+
+class TestA1(OrderedTestCase):
+    a1: A1
+    a1_support: A1Support
+
+
+class TestLabels(TestA1):
+    def test_round_trip(self):
+        """ test row_from_label reads back every row_label, past 26 rows """
+        labels = set()
+        for row in range(20000):
+            label = self.a1_support.row_label(row)
+            self.assertTrue(label.isalpha() and label.isupper(), msg=label)
+            self.assertEqual(self.a1_support.row_from_label(label), row, msg=label)
+            labels.add(label)
+        self.assertEqual(len(labels), 20000)
+
+    def test_boundaries(self):
+        """ test the labels where another letter is added """
+        row_label = self.a1_support.row_label
+        self.assertEqual([row_label(row) for row in range(26)], list(self.a1_support.ALPHA))
+        self.assertEqual(row_label(26), "AA")
+        self.assertEqual(row_label(27), "AB")
+        self.assertEqual(row_label(51), "AZ")
+        self.assertEqual(row_label(52), "BA")
+        self.assertEqual(row_label(701), "ZZ")
+        self.assertEqual(row_label(702), "AAA")
+
+    def test_bad_labels(self):
+        """ test row_from_label rejects what is not a row label """
+        for label in ("", "a", "Aa", "A1", "1", "@", "[", "A B", "É"):
+            self.assertEqual(self.a1_support.row_from_label(label), -1, msg=label)
+
+    def test_cell_position(self):
+        """ test cells with multi-letter rows are read, and cells off the grid are not """
+        cell_position = self.a1.cell_position
+        self.assertEqual(cell_position("A1", 30), (0, 0))
+        self.assertEqual(cell_position("Z30", 30), (25, 29))
+        self.assertEqual(cell_position("AA1", 30), (26, 0))
+        self.assertEqual(cell_position("AD12", 30), (29, 11))
+        for text in ("AE1", "A0", "A31", "A", "1", "", "a1", "A-1", "A1A"):
+            self.assertIsNone(cell_position(text, 30), msg=text)
+        self.assertIsNone(cell_position("AA1", 26))
+
+    def test_parse(self):
+        """ test actions on multi-letter rows are parsed, and bad ones rejected """
+        self.assertEqual(self.a1.parse_action("AB3", 40), ("move", (27, 2)))
+        self.assertEqual(self.a1.parse_action("f AB40", 40), ("flag", (27, 39)))
+        self.assertEqual(self.a1.parse_action("c AN1", 40), ("chord", (39, 0)))
+        self.assertEqual(self.a1.parse_action("AO1", 40), ("invalid", None))
+        self.assertEqual(self.a1.parse_action("f ab3", 40), ("invalid", None))
+        self.assertEqual(self.a1.parse_position("AB3", 40), (27, 2))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertIsNone(self.a1.parse_position("AB41", 40))
+        self.assertEqual(output.getvalue(), self.a1_support.INVALID + "\n")
+
+
+def random_game(rng, grid_size):
+    """ A game string of random cell characters. """
+    return "".join(rng.choice("~♥☺012345678") for _ in range(grid_size ** 2))
+
+
+class TestDisplay(TestA1):
+    def _baseline(self, game, grid_size):
+        """ The display of the original display_game, before viewports """
+        ALPHA = self.a1_support.ALPHA
+        WALL_HORIZONTAL = self.a1_support.WALL_HORIZONTAL
+        WALL_VERTICAL = self.a1_support.WALL_VERTICAL
+        wall_h = WALL_HORIZONTAL * 5 * grid_size + WALL_HORIZONTAL
+        i = 0
+        print_game = ""
+        while i <= grid_size:
+            if i == 0:
+                print_game += "  " + WALL_VERTICAL
+            else:
+                if i < 10:
+                    print_game += " " + str(i) + " " + WALL_VERTICAL
+                else:
+                    print_game += " " + str(i) + WALL_VERTICAL
+            i += 1
+
+        print_game += '\n' + wall_h
+        i = 0
+        j = 0
+        while i < grid_size:
+            print_game += '\n' + ALPHA[i] + " " + WALL_VERTICAL
+            while j < grid_size:
+                print_game += " " + game[j+i*grid_size] + " " + WALL_VERTICAL
+                j += 1
+            print_game += '\n' + wall_h
+            i += 1
+            j = 0
+        return print_game + "\n"
+
+    def _display(self, game, grid_size, viewport=None):
+        """ The display written by display_game """
+        output = io.StringIO()
+        self.a1.display_game(game, grid_size, output, viewport)
+        return output.getvalue()
+
+    def test_same_as_baseline(self):
+        """ test the whole board is shown exactly as before, to file or stdout """
+        rng = random.Random(12)
+        for grid_size in range(1, 27):
+            game = random_game(rng, grid_size)
+            expected = self._baseline(game, grid_size)
+            self.assertEqual(self._display(game, grid_size), expected, msg=grid_size)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.a1.display_game(game, grid_size)
+            self.assertEqual(output.getvalue(), expected, msg=grid_size)
+
+    def test_viewport(self):
+        """ test a viewport shows its window with the real row and column labels """
+        rng = random.Random(1212)
+        grid_size = 40
+        game = random_game(rng, grid_size)
+        lines = self._display(game, grid_size, (26, 9, 3, 4)).splitlines()
+        self.assertEqual(lines[0], "   | 10| 11| 12| 13|")
+        self.assertEqual(len(lines), 2 + 2 * 3)
+        for i, row in enumerate(range(26, 29)):
+            cells = game[row * grid_size + 9:row * grid_size + 13]
+            self.assertEqual(lines[2 + 2 * i],
+                             f"{self.a1_support.row_label(row)} | " + " | ".join(cells) + " |")
+            self.assertEqual(lines[3 + 2 * i], lines[1])
+
+    def test_viewport_around(self):
+        """ test viewports are centred on the cell and clipped at the board edges """
+        viewport_around = self.a1.viewport_around
+        self.assertEqual(viewport_around(0, 100, 20), (0, 0, 20, 20))
+        self.assertEqual(viewport_around(99 * 100 + 99, 100, 20), (80, 80, 20, 20))
+        self.assertEqual(viewport_around(50 * 100 + 50, 100, 20), (40, 40, 20, 20))
+        self.assertEqual(viewport_around(3 * 100 + 97, 100, 20), (0, 80, 20, 20))
+        self.assertEqual(viewport_around(95 * 100 + 2, 100, 21), (79, 0, 21, 21))
+        self.assertEqual(viewport_around(7, 10, 20), (0, 0, 10, 10))
+        for index in range(30 ** 2):
+            top, left, rows, columns = viewport_around(index, 30, 7)
+            row, column = divmod(index, 30)
+            self.assertTrue(0 <= top <= row < top + rows <= 30)
+            self.assertTrue(0 <= left <= column < left + columns <= 30)
+            self.assertEqual((rows, columns), (7, 7))
+
+
+class TestRenderer(TestA1):
+    def setUp(self):
+        """ Fix the terminal size the renderer reads """
+        self._terminal = mock.patch.dict(os.environ, {"COLUMNS": "120", "LINES": "60"})
+        self._terminal.start()
+        self._output = io.StringIO()
+        self._renderer = self.a1.TerminalRenderer(5, self._output)
+
+    def tearDown(self):
+        self._terminal.stop()
+
+    def _update(self, game, viewport=None):
+        """ What the renderer writes for one update """
+        self._output.seek(0)
+        self._output.truncate()
+        self._renderer.update(game, viewport)
+        return self._output.getvalue()
+
+    def _display(self, game, viewport=None):
+        """ What display_game writes """
+        output = io.StringIO()
+        self.a1.display_game(game, 5, output, viewport)
+        return output.getvalue()
+
+    def test_first_draw(self):
+        """ test the first update clears the screen and draws what display_game does """
+        game = "~" * 25
+        self.assertEqual(self._update(game), "\x1b[H\x1b[2J" + self._display(game))
+
+    def test_changed_cells_only(self):
+        """ test an update rewrites just the changed cells, then clears under the grid """
+        self._update("~" * 25)
+        game = "~" * 7 + "3" + "~" * 16 + "♥"
+        self.assertEqual(self._update(game), "\x1b[5;13H3\x1b[11;21H♥\x1b[13;1H\x1b[J")
+        self.assertEqual(self._update(game), "")
+
+    def test_positions_match_display(self):
+        """ test every cell is rewritten where display_game puts it """
+        rng = random.Random(13)
+        old = random_game(rng, 5)
+        self._update(old)
+        for index in range(25):
+            game = old[:index] + ("0" if old[index] != "0" else "1") + old[index + 1:]
+            written = self._update(game)
+            line, column = written[2:written.index("H")].split(";")
+            shown = self._display(game).splitlines()
+            self.assertEqual(shown[int(line) - 1][int(column) - 1], game[index])
+            old = game
+
+    def test_full_redraws(self):
+        """ test moving the viewport, reset and resizing draw everything again """
+        game = "~" * 25
+        self._update(game)
+        self.assertEqual(self._update(game, (1, 1, 3, 3)),
+                         "\x1b[H\x1b[2J" + self._display(game, (1, 1, 3, 3)))
+        self._renderer.reset()
+        self.assertEqual(self._update(game, (1, 1, 3, 3)),
+                         "\x1b[H\x1b[2J" + self._display(game, (1, 1, 3, 3)))
+        with mock.patch.dict(os.environ, {"LINES": "40"}):
+            self.assertTrue(self._update(game, (1, 1, 3, 3)).startswith("\x1b[H\x1b[2J"))
+
+
+class TestSession(TestA1):
+    GRID_SIZE = 6
+    POKEMONS = 5
+    SEED = 21
+
+    def _cell(self, index):
+        """ The action text of a cell """
+        row, column = divmod(index, self.GRID_SIZE)
+        return f"{self.a1_support.row_label(row)}{column + 1}"
+
+    def _win(self, session):
+        """ Flag every pokemon, then move onto the cells still covered
+
+        Returns:
+            (list<str>, list<str>): The actions taken and what each did.
+        """
+        actions = [f"f {self._cell(index)}" for index in session.get_pokemon_locations()]
+        results = [session.act(action) for action in actions]
+        for index in range(self.GRID_SIZE ** 2):
+            if session.get_game()[index] == self.a1_support.UNEXPOSED:
+                actions.append(self._cell(index))
+                results.append(session.act(actions[-1]))
+        return actions, results
+
+    def _winning_game(self, pokemons):
+        """ The game string of a won board, worked out from the pokemons """
+        positions = [divmod(pokemon, self.GRID_SIZE) for pokemon in pokemons]
+        game = ""
+        for index in range(self.GRID_SIZE ** 2):
+            row, column = divmod(index, self.GRID_SIZE)
+            if index in pokemons:
+                game += self.a1_support.FLAG
+            else:
+                game += str(sum(abs(r - row) <= 1 and abs(c - column) <= 1
+                                for r, c in positions))
+        return game
+
+    def _script(self):
+        """ Actions winning the first seeded game and losing the second
+
+        Returns:
+            (list<str>, Counter): The lines and the results they should give.
+        """
+        session = self.a1.GameSession(self.GRID_SIZE, self.POKEMONS, self.SEED)
+        actions, results = self._win(session)
+        session.new_game()
+        pokemon = session.get_pokemon_locations()[0]
+        lines = actions + ["", "x y", "f A1", "f A1", self._cell(pokemon)]
+        expected = {"flagged": self.POKEMONS + 2, "revealed": len(actions) - self.POKEMONS - 1,
+                    "won": 1, "invalid": 1, "lost": 1}
+        return lines, expected
+
+    def test_scripted_win(self):
+        """ test a seeded session is won by flagging the pokemons and moving everywhere else """
+        session = self.a1.GameSession(self.GRID_SIZE, self.POKEMONS, self.SEED)
+        pokemons = session.get_pokemon_locations()
+        self.assertEqual(len(set(pokemons)), self.POKEMONS)
+        actions, results = self._win(session)
+        self.assertEqual(results[:self.POKEMONS], ["flagged"] * self.POKEMONS)
+        self.assertEqual(set(results[self.POKEMONS:-1]), {"revealed"})
+        self.assertEqual(results[-1], "won")
+        self.assertEqual(session.state(), {
+            "board_id": self.a1_support.make_board_id(self.GRID_SIZE, self.POKEMONS, self.SEED),
+            "game": self._winning_game(pokemons),
+            "status": "won",
+            "actions": len(actions),
+        })
+        self.assertEqual(session.act("A1"), "over")
+        self.assertEqual(session.act(":)"), "reset")
+        self.assertEqual(session.state()["game"], self.a1_support.UNEXPOSED * self.GRID_SIZE ** 2)
+
+    def test_run_actions(self):
+        """ test a batch run wins then loses, starting a new game after each """
+        lines, expected = self._script()
+        session = self.a1.GameSession(self.GRID_SIZE, self.POKEMONS, self.SEED)
+        summary = self.a1.run_actions(session, [line + "\n" for line in lines])
+        self.assertEqual(summary["actions"], len(lines) - 1)
+        self.assertEqual(summary["games"], 2)
+        self.assertEqual(dict(summary["results"]), expected)
+        self.assertEqual(session.state()["actions"], 0)
+
+    def test_batch_command(self):
+        """ test --batch prints the summary of a file or of stdin """
+        lines, expected = self._script()
+        a1_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "a1.py")
+        command = [sys.executable, a1_path, "--size", str(self.GRID_SIZE),
+                   "--pokemons", str(self.POKEMONS), "--seed", str(self.SEED), "--batch"]
+        script = "".join(line + "\n" for line in lines)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "actions.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(script)
+            outputs = [
+                subprocess.run(command + [path], capture_output=True, encoding="utf-8",
+                               check=True).stdout,
+                subprocess.run(command + ["-"], input=script, capture_output=True,
+                               encoding="utf-8", check=True).stdout,
+            ]
+        for output in outputs:
+            first, *counts = output.splitlines()
+            self.assertTrue(first.startswith(f"{len(lines) - 1} actions, 2 games finished in "),
+                            msg=first)
+            self.assertEqual(counts, [f"  {result:<9} {count}"
+                                      for result, count in sorted(expected.items())])
+
+
+def main():
+    test_cases = [
+        TestLabels,
+        TestDisplay,
+        TestRenderer,
+        TestSession,
+    ]
+
+    master = TestMaster(max_diff=None,
+                        suppress_stdout=True,
+                        timeout=60,
+                        include_no_print=True,
+                        scripts=[
+                            ('a1_support', 'a1_support.py'),
+                            ('a1', 'a1.py'),
+                        ])
+    master.run(test_cases)
+
+
+if __name__ == '__main__':
+    main()
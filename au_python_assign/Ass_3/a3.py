@@ -1,6 +1,12 @@
+import argparse
+import bisect
+import functools
 import random
-import tkinter as tk
-from tkinter import messagebox
+import re
+import struct
+import sys
+from array import array
+from collections import OrderedDict, deque
 
 UP = "up"
 DOWN = "down"
@@ -17,343 +23,3496 @@ EXPOSED = "0"
 TASK_ONE = 1
 TASK_TWO = 2
 
+# Single byte codes of the cell characters stored in a BoardStore.
+# Digits and UNEXPOSED are plain ASCII and are stored as themselves.
+_ENCODE = str.maketrans({FLAG: "F", POKEMON: "P"})
+_CODES = {character: ord(character.translate(_ENCODE))
+          for character in EXPOSED + "12345678" + UNEXPOSED + FLAG + POKEMON}
+_CHARACTERS = {code: character for character, code in _CODES.items()}
+
+
+class BoardStore:
+    """Mutable game string backed by a bytearray of cell codes.
+
+    Supports the parts of the str interface used by the game functions
+    (indexing, slicing, len, find, count and in), so it can be passed
+    anywhere a game string is read. Cells are updated in place with
+    item assignment; str() gives a cached string view.
+    """
+
+    def __init__(self, game):
+        """Create a store holding a copy of the game string.
+
+        Parameters:
+            game (str): Game string.
+        """
+        self._cells = bytearray(game.translate(_ENCODE), "ascii")
+        self._view = None
+
+    def __len__(self):
+        """Returns the number of cells."""
+        return len(self._cells)
+
+    def __getitem__(self, index):
+        """Returns the character at index, or a string for a slice."""
+        if isinstance(index, slice):
+            return self._decode(self._cells[index])
+        return _CHARACTERS[self._cells[index]]
+
+    def __setitem__(self, index, character):
+        """Replaces the character at index in place."""
+        self._cells[index] = _CODES[character]
+        self._view = None
+
+    def __iter__(self):
+        """Iterates over the game characters."""
+        return iter(str(self))
+
+    def __contains__(self, character):
+        """Returns True if the game contains character."""
+        if character in _CODES:
+            return _CODES[character] in self._cells
+        return character in str(self)
+
+    def __str__(self):
+        if self._view is None:
+            self._view = self._decode(self._cells)
+        return self._view
+
+    def __repr__(self):
+        return f"BoardStore({str(self)!r})"
+
+    @staticmethod
+    def _decode(cells):
+        """Convert stored cell codes back to game characters.
+
+        Parameters:
+            cells (bytes): Cell codes.
+
+        Returns:
+            (str): Game string.
+        """
+        return cells.decode("ascii").replace("F", FLAG).replace("P", POKEMON)
+
+    def get_cells(self):
+        """Get the cell codes, for loops that should not build string views.
+
+        Returns:
+            (bytearray): One code per cell, see cell_code.
+        """
+        return self._cells
+
+    def touch(self):
+        """Drop the cached string view after writing through get_cells."""
+        self._view = None
+
+    def find(self, character):
+        """Returns the lowest index of character, or -1 if it is not present.
+
+        Parameters:
+            character (str): Single game character.
+
+        Returns:
+            (int): Index of the first matching cell.
+        """
+        return self._cells.find(_CODES[character])
+
+    def count(self, character):
+        """Returns the number of cells holding character.
+
+        Parameters:
+            character (str): Single game character.
+
+        Returns:
+            (int): Number of matching cells.
+        """
+        return self._cells.count(_CODES[character])
+
+
+def cell_code(character):
+    """Returns the code a BoardStore uses for a game character.
+
+    Digits are consecutive, so the code of number n is cell_code(EXPOSED) + n.
+
+    Parameters:
+        character (str): Single game character.
+
+    Returns:
+        (int): Cell code.
+    """
+    return _CODES[character]
+
+
+class NeighbourTable:
+    """Neighbour lookup table for one grid size.
+
+    Holds the index offset of each direction in DIRECTIONS and a border mask
+    per cell, where bit k is set if DIRECTIONS[k] stays on the grid. The
+    neighbours of a cell are its index plus the offsets selected by its mask,
+    so no direction strings are compared at lookup time.
+    """
+
+    def __init__(self, grid_size):
+        """Build the table.
+
+        Parameters:
+            grid_size (int): Size of the game grid.
+        """
+        self._grid_size = grid_size
+        self._offsets = tuple(
+            (-grid_size if UP in direction else grid_size if DOWN in direction else 0)
+            + (-1 if LEFT in direction else 1 if RIGHT in direction else 0)
+            for direction in DIRECTIONS)
+
+        def row_masks(row):
+            masks = bytearray(grid_size)
+            for col in range(grid_size):
+                mask = 0
+                for bit, direction in enumerate(DIRECTIONS):
+                    if ((UP not in direction or row > 0)
+                            and (DOWN not in direction or row < grid_size - 1)
+                            and (LEFT not in direction or col > 0)
+                            and (RIGHT not in direction or col < grid_size - 1)):
+                        mask |= 1 << bit
+                masks[col] = mask
+            return masks
+
+        if grid_size > 1:
+            self._masks = (row_masks(0) + row_masks(1) * (grid_size - 2)
+                           + row_masks(grid_size - 1))
+        else:
+            self._masks = row_masks(0)
+
+        # Only nine distinct masks occur, so the offsets of each are shared.
+        self._mask_offsets = {
+            mask: tuple(offset for bit, offset in enumerate(self._offsets)
+                        if mask >> bit & 1)
+            for mask in set(self._masks)}
+
+    def get_offsets(self):
+        """Get the index offset of each direction, in DIRECTIONS order.
+
+        Returns:
+            (tuple<int, ...>): Index offsets.
+        """
+        return self._offsets
+
+    def get_masks(self):
+        """Get the border mask of every cell.
+
+        Returns:
+            (bytearray): One mask per cell.
+        """
+        return self._masks
+
+    def offsets_at(self, index):
+        """Returns the offsets leading to the neighbours of a cell.
+
+        Parameters:
+            index (int): Index in a game string.
+
+        Returns:
+            (tuple<int, ...>): Index offsets of the cell's neighbours.
+        """
+        return self._mask_offsets[self._masks[index]]
+
+    def neighbours(self, index):
+        """Returns indexes of the neighbour cells, in DIRECTIONS order.
+
+        Parameters:
+            index (int): Index in a game string.
+
+        Returns:
+            (list<int>): List of indexes representing neighbour cells.
+        """
+        return [index + offset for offset in self._mask_offsets[self._masks[index]]]
+
+
+@functools.lru_cache(maxsize=8)
+def neighbour_table(grid_size):
+    """Returns the shared NeighbourTable for a grid size, building it once.
+
+    Parameters:
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (NeighbourTable): Neighbour table for the grid size.
+    """
+    return NeighbourTable(grid_size)
+
+
+def pokemon_counts(pokemon_locations, grid_size):
+    """Counts the neighbouring Pokemon of every cell.
+
+    Parameters:
+        pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (bytearray): Number of Pokemon next to each cell.
+    """
+    cell_count = grid_size ** 2
+    table = neighbour_table(grid_size)
+    # Visiting the neighbours of each Pokemon only beats adding up the
+    # shifted boards below about one Pokemon in 48 cells.
+    if len(pokemon_locations) * 48 < cell_count:
+        counts = bytearray(cell_count)
+        for location in pokemon_locations:
+            for offset in table.offsets_at(location):
+                counts[location + offset] += 1
+        return counts
+
+    # Dense boards: treat the board as one big integer with a byte per cell
+    # and add a shifted copy of the Pokemon for each direction. A count is at
+    # most 8, so no byte ever carries into its neighbour.
+    pokemon = bytearray(cell_count)
+    for location in pokemon_locations:
+        pokemon[location] = 1
+    bits = int.from_bytes(pokemon, "little")
+    every_column = int.from_bytes(b"\x01" * cell_count, "little")
+    not_first_column = int.from_bytes(
+        (b"\x00" + b"\x01" * (grid_size - 1)) * grid_size, "little")
+    not_last_column = int.from_bytes(
+        (b"\x01" * (grid_size - 1) + b"\x00") * grid_size, "little")
+
+    total = 0
+    for direction, offset in zip(DIRECTIONS, table.get_offsets()):
+        shifted = bits >> 8 * offset if offset > 0 else bits << -8 * offset
+        if LEFT in direction:
+            total += shifted & not_first_column
+        elif RIGHT in direction:
+            total += shifted & not_last_column
+        else:
+            total += shifted & every_column
+    return bytearray(total.to_bytes(cell_count, "little"))
+
+
+def counts_for(pokemon_locations, grid_size):
+    """Returns neighbour counts for pokemon_locations, reusing stored ones.
+
+    Parameters:
+        pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (bytearray): Number of Pokemon next to each cell.
+    """
+    if (isinstance(pokemon_locations, PokemonLocations)
+            and pokemon_locations.get_grid_size() == grid_size):
+        return pokemon_locations.get_counts()
+    return pokemon_counts(pokemon_locations, grid_size)
+
+
+class PokemonLocations(tuple):
+    """Tuple of Pokemon locations which also holds the neighbour counts.
+
+    The counts are built once, when first asked for, so the number shown at
+    any cell is a lookup rather than a scan of the tuple. A set of the
+    locations backs membership tests.
+    """
+
+    def __new__(cls, locations, grid_size, counts=None):
+        """Create the locations tuple.
+
+        Parameters:
+            locations (iterable<int>): Indexes of the Pokemon.
+            grid_size (int): Size of the game grid.
+            counts (bytearray): Neighbour counts if already known.
+        """
+        self = super().__new__(cls, locations)
+        self._grid_size = grid_size
+        self._counts = counts
+        self._set = frozenset(self)
+        return self
+
+    def __contains__(self, index):
+        """Returns True if there is a Pokemon at index."""
+        return index in self._set
+
+    def __reduce__(self):
+        """Pickle as the plain locations and grid size."""
+        return PokemonLocations, (tuple(self), self._grid_size)
+
+    def get_grid_size(self):
+        """Get the size of the grid the Pokemon were placed on.
+
+        Returns:
+            (int): Size of the game grid.
+        """
+        return self._grid_size
+
+    def get_counts(self):
+        """Get the number of Pokemon next to each cell.
+
+        Returns:
+            (bytearray): One count per cell.
+        """
+        if self._counts is None:
+            self._counts = pokemon_counts(self, self._grid_size)
+        return self._counts
+
+    def get_set(self):
+        """Get the locations as a set, for membership tests.
+
+        Returns:
+            (frozenset<int>): Indexes of the Pokemon.
+        """
+        return self._set
+
+
+class ZeroRegions:
+    """Connected regions of zero cells, labelled once for a Pokemon layout.
+
+    Every cell with no neighbouring Pokemon gets the id of its region, and
+    each region keeps its zero cells and the numbered cells bordering it.
+    Clicking any zero cell opens exactly its region's cells, so repeated
+    probes of the same board become lookups instead of searches.
+    """
+
+    def __init__(self, pokemon_locations, grid_size):
+        """Label all zero regions with one pass over the grid.
+
+        Parameters:
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of the game grid.
+        """
+        self._pokemon_locations = pokemon_locations
+        self._grid_size = grid_size
+        self._labels = array("i", [-1]) * (grid_size ** 2)
+        self._zeros = []
+        self._borders = []
+
+        counts = counts_for(pokemon_locations, grid_size)
+        pokemon = set(pokemon_locations)
+        offsets_at = neighbour_table(grid_size).offsets_at
+        labels = self._labels
+        bordered = array("i", [-1]) * (grid_size ** 2)
+
+        for start in range(grid_size ** 2):
+            if counts[start] != 0 or labels[start] != -1 or start in pokemon:
+                continue
+            label = len(self._zeros)
+            zeros = [start]
+            borders = []
+            labels[start] = label
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for offset in offsets_at(node):
+                    neighbour = node + offset
+                    if counts[neighbour] == 0:
+                        if labels[neighbour] == -1:
+                            labels[neighbour] = label
+                            zeros.append(neighbour)
+                            queue.append(neighbour)
+                    elif bordered[neighbour] != label:
+                        bordered[neighbour] = label
+                        borders.append(neighbour)
+            self._zeros.append(zeros)
+            self._borders.append(borders)
+
+    def get_pokemon_locations(self):
+        """Get the Pokemon layout the regions were labelled for.
+
+        Returns:
+            (tuple<int, ...>): Tuple of all Pokemon's locations.
+        """
+        return self._pokemon_locations
+
+    def get_num_regions(self):
+        """Get the number of zero regions.
+
+        Returns:
+            (int): Number of zero regions.
+        """
+        return len(self._zeros)
+
+    def region_at(self, index):
+        """Returns the id of the zero region containing a cell.
+
+        Parameters:
+            index (int): Index in the game string.
+
+        Returns:
+            (int): Region id, or -1 if the cell is not a zero cell.
+        """
+        return self._labels[index]
+
+    def get_zeros(self, label):
+        """Get the zero cells of a region.
+
+        Parameters:
+            label (int): Region id.
+
+        Returns:
+            (list<int>): Indexes of the region's zero cells.
+        """
+        return self._zeros[label]
+
+    def get_borders(self, label):
+        """Get the numbered cells bordering a region.
+
+        Parameters:
+            label (int): Region id.
+
+        Returns:
+            (list<int>): Indexes of the region's border cells.
+        """
+        return self._borders[label]
+
+
+def board_seeds(seed=None):
+    """Yields the seeds of the successive boards of a session.
+
+    Parameters:
+        seed (int|random.Random): With an int, the first board uses it and
+            later seeds are drawn from random.Random(seed). With a
+            random.Random, every seed is drawn from it. With None, seeds are
+            drawn from the random module.
+
+    Yields:
+        (int): Board seed.
+    """
+    if isinstance(seed, int):
+        yield seed
+        rng = random.Random(seed)
+    else:
+        rng = random if seed is None else seed
+    while True:
+        yield rng.getrandbits(32)
+
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _to_base36(number):
+    """Formats an int in base 36, which int(text, 36) reads back."""
+    sign = "-" if number < 0 else ""
+    number = abs(number)
+    digits = ""
+    while True:
+        number, digit = divmod(number, 36)
+        digits = _BASE36[digit] + digits
+        if number == 0:
+            return sign + digits
+
+
+def make_board_id(grid_size, number_of_pokemons, seed):
+    """Returns a short identifier from which a board can be generated again.
+
+    For example make_board_id(10, 15, 12345) returns "a.f.9ix".
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons that the game will have.
+        seed (int): Board seed.
+
+    Returns:
+        (str): Board ID.
+    """
+    return ".".join(_to_base36(number) for number in (grid_size, number_of_pokemons, seed))
+
+
+def parse_board_id(board_id):
+    """Reads the grid size, number of pokemons and seed out of a board ID.
+
+    Parameters:
+        board_id (str): Board ID made by make_board_id.
+
+    Returns:
+        (tuple<int, int, int>): Grid size, number of pokemons and seed.
+
+    Raises:
+        ValueError: If board_id is not a valid board ID.
+    """
+    parts = board_id.split(".")
+    if len(parts) != 3:
+        raise ValueError(f"invalid board ID: {board_id!r}")
+    grid_size, number_of_pokemons, seed = (int(part, 36) for part in parts)
+    return grid_size, number_of_pokemons, seed
+
+
+# Saved games: a header, then the cells packed four to a byte as 2-bit
+# states, then the Pokemon indexes as little-endian uint32s. The numbers
+# of exposed cells follow from the Pokemon, so they are not stored.
+SAVE_MAGIC = b"PKMN"
+SAVE_VERSION = 2
+SAVE_EXTENSION = ".pkmn"
+_SAVE_HEADER = struct.Struct("<4sBIIIqIIII")
+# Seed saved for Pokemon placed by the caller, which no seed generates.
+NO_SEED = -2 ** 63
+# 2-bit states, in order: covered, exposed (any number), flagged, shown.
+_STATES = UNEXPOSED + EXPOSED + FLAG + POKEMON
+# Cell code to state, and back; every number maps to the exposed state.
+_CODE_STATES = bytes(1 if _CHARACTERS.get(code, "?").isdigit()
+                     else max(_STATES.find(_CHARACTERS.get(code, "?")), 0)
+                     for code in range(256))
+_STATE_CODES = bytes(_CODES[_STATES[state]] if state < len(_STATES) else 0xFF
+                     for state in range(256))
+_EXPOSED_MASK = bytes(0xFF if state == 1 else 0 for state in range(256))
+
+
+def pack_cells(cells):
+    """Packs cell codes into 2-bit states, four cells to a byte.
+
+    The four cells of each byte are shifted into place as big ints, so no
+    Python loop runs per cell.
+
+    Parameters:
+        cells (bytes): Cell codes, see cell_code.
+
+    Returns:
+        (bytes): Packed states; the first cell is in the top bits of the first byte.
+    """
+    states = cells.translate(_CODE_STATES)
+    states += bytes(-len(states) % 4)
+    packed = 0
+    for part in range(4):
+        packed = (packed << 2) | int.from_bytes(states[part::4], "big")
+    return packed.to_bytes(len(states) // 4, "big")
+
+
+def unpack_cells(packed, counts):
+    """Unpacks cell codes packed by pack_cells.
+
+    Exposed cells get their number from counts, added to the code of
+    EXPOSED for all of them at once.
+
+    Parameters:
+        packed (bytes|memoryview): Packed states.
+        counts (bytes): Number of Pokemon next to each cell, one per cell.
+
+    Returns:
+        (bytearray): Cell codes.
+    """
+    size = len(packed)
+    num_cells = len(counts)
+    both = int.from_bytes(packed, "big")
+    low_mask = int.from_bytes(b"\x03" * size, "big")
+    states = bytearray(4 * size)
+    for part in range(4):
+        states[part::4] = ((both >> 2 * (3 - part)) & low_mask).to_bytes(size, "big")
+    del states[num_cells:]
+    # Codes are below 0x80 and numbers at most 8, so no byte carries.
+    numbers = (int.from_bytes(counts, "big")
+               & int.from_bytes(states.translate(_EXPOSED_MASK), "big"))
+    cells = int.from_bytes(states.translate(_STATE_CODES), "big") + numbers
+    return bytearray(cells.to_bytes(num_cells, "big"))
+
+
+HISTORY_SIZE = 100
+
 
 class BoardModel:
     """
-    Model of the game board
+    Model of the game board
+    """
+    def __init__(self, grid_size, num_pokemon):
+        """ Create a board with randomly placed Pokemon.
+
+        Use BoardModel.seeded or BoardModel.from_board_id for a board that
+        can be generated again.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            num_pokemon (int): The number of pokemons that the game will have.
+        """
+        self._setup(grid_size, num_pokemon, None)
+
+    @classmethod
+    def seeded(cls, grid_size, num_pokemon, seed):
+        """ Create a board whose Pokemon are generated from a seed.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            num_pokemon (int): The number of pokemons that the game will have.
+            seed (int|random.Random): Seed of the first board, or a private
+                generator to draw board seeds from. See board_seeds.
+
+        Returns:
+            (BoardModel): The new board.
+        """
+        board = cls.__new__(cls)
+        board._setup(grid_size, num_pokemon, seed)
+        return board
+
+    @classmethod
+    def from_board_id(cls, board_id):
+        """ Create the board identified by a board ID.
+
+        Parameters:
+            board_id (str): Board ID, see get_board_id.
+
+        Returns:
+            (BoardModel): The new board.
+        """
+        grid_size, num_pokemon, seed = parse_board_id(board_id)
+        return cls.seeded(grid_size, num_pokemon, seed)
+
+    @classmethod
+    def with_pokemon(cls, grid_size, pokemon_locations, seed=None):
+        """ Create a board with Pokemon placed by the caller, e.g. by a generator.
+
+        No board ID generates these Pokemon, so get_board_id returns None
+        until new_game places Pokemon from the seed.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            pokemon_locations (list<int>): Indexes of the Pokemon.
+            seed (int|random.Random): Seed or generator of board seeds.
+
+        Returns:
+            (BoardModel): The new board.
+        """
+        board = cls.__new__(cls)
+        board._setup(grid_size, len(pokemon_locations), seed, list(pokemon_locations))
+        board._seed = None
+        return board
+
+    def _setup(self, grid_size, num_pokemon, seed, pokemon_locations=None):
+        """ Initialise a new board, see seeded.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            num_pokemon (int): The number of pokemons that the game will have.
+            seed (int|random.Random): Seed or generator of board seeds.
+            pokemon_locations (list<int>): Locations to use instead of generating them.
+        """
+        self._grid_size = grid_size
+        self._num_pokemon = num_pokemon
+        self._game = BoardStore(UNEXPOSED * grid_size ** 2)
+        self._regions = None
+        self._undo = deque(maxlen=HISTORY_SIZE)
+        self._redo = []
+        self._seeds = board_seeds(seed)
+        self._generate_board(pokemon_locations)
+        self._num_attempted_catches = 0
+
+    def _generate_board(self, pokemon_locations=None):
+        """ Place Pokemon using the next seed of this board's session.
+
+        Parameters:
+            pokemon_locations (list<int>): Locations generated from that seed
+                before, e.g. by a saved game, to use instead of generating them.
+        """
+        self._seed = next(self._seeds)
+        if pokemon_locations is None:
+            pokemon_locations = self.generate_pokemons(
+                self._grid_size, self._num_pokemon, random.Random(self._seed))
+        else:
+            pokemon_locations = self._make_locations(pokemon_locations, self._grid_size)
+        self._place_pokemon(pokemon_locations)
+
+    def get_seed(self):
+        """ Get the seed the Pokemon were generated from.
+
+        Returns:
+            (int): Board seed, or None if the Pokemon were placed by the
+            caller, see with_pokemon.
+        """
+        return self._seed
+
+    def get_board_id(self):
+        """ Get a short ID from which this board can be generated again.
+
+        Returns:
+            (str): Board ID, see make_board_id, or None if the Pokemon were
+            placed by the caller, see with_pokemon.
+        """
+        if self._seed is None:
+            return None
+        return make_board_id(self._grid_size, self._num_pokemon, self._seed)
+
+    def get_grid_size(self):
+        """ Get the grid size of the game.
+
+        Returns:
+            (int): Number of cells in a row or column.
+        """
+        return self._grid_size
+
+    def to_bytes(self):
+        """ Encode the board in the binary save format.
+
+        The header holds the grid size, Pokemon counts, seed (NO_SEED for
+        Pokemon placed by the caller) and counters, followed by the cells
+        packed as 2-bit states (see pack_cells) and the Pokemon indexes as
+        uint32s. A 1000x1000 board takes 250 KB for its cells and 4 bytes
+        per Pokemon, so 450 KB with 50,000 Pokemon.
+
+        Returns:
+            (bytes): The saved game.
+        """
+        pokemon_locations = self.get_pokemon_locations()
+        try:
+            header = _SAVE_HEADER.pack(
+                SAVE_MAGIC, SAVE_VERSION, self._grid_size, self._num_pokemon,
+                len(pokemon_locations), NO_SEED if self._seed is None else self._seed,
+                self._num_attempted_catches,
+                self.get_num_unexposed(), self.get_num_flags(), self.get_num_correct_flags())
+        except struct.error as error:
+            raise ValueError(f"board cannot be saved: {error}") from None
+        indexes = array("I", pokemon_locations)
+        if sys.byteorder == "big":
+            indexes.byteswap()
+        return header + pack_cells(self._cell_codes()) + indexes.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Create a board from a game saved by to_bytes.
+
+        The data is read through a memoryview: the header is unpacked in
+        place, the Pokemon indexes are cast from their slice and the cells
+        are unpacked from theirs, with the numbers worked out from the
+        Pokemon, without copying the input first.
+
+        Parameters:
+            data (bytes): The saved game.
+
+        Returns:
+            (BoardModel): The saved board.
+
+        Raises:
+            ValueError: If data is not a valid saved game.
+        """
+        view = memoryview(data)
+        if len(view) < _SAVE_HEADER.size:
+            raise ValueError("saved game is too short")
+        (magic, version, grid_size, num_pokemon, num_locations, seed, attempted_catches,
+         num_unexposed, num_flags, num_correct_flags) = _SAVE_HEADER.unpack_from(view)
+        if magic != SAVE_MAGIC or version != SAVE_VERSION:
+            raise ValueError("not a saved Pokemon game")
+
+        num_cells = grid_size ** 2
+        cells_end = _SAVE_HEADER.size + (num_cells + 3) // 4
+        if len(view) != cells_end + 4 * num_locations:
+            raise ValueError("saved game has the wrong size")
+        if sys.byteorder == "big":
+            indexes = array("I", view[cells_end:])
+            indexes.byteswap()
+        else:
+            indexes = view[cells_end:].cast("I")
+        pokemon_locations = list(indexes)
+        if num_locations and max(pokemon_locations) >= num_cells:
+            raise ValueError("saved Pokemon are outside the grid")
+
+        board = cls.__new__(cls)
+        board._setup(grid_size, num_pokemon, seed, pokemon_locations)
+        if seed == NO_SEED:
+            board._seed = None
+        board._load_cells(unpack_cells(view[_SAVE_HEADER.size:cells_end],
+                                       counts_for(board.get_pokemon_locations(), grid_size)))
+        board._num_attempted_catches = attempted_catches
+        if (board.get_num_unexposed(), board.get_num_flags(), board.get_num_correct_flags()) \
+                != (num_unexposed, num_flags, num_correct_flags):
+            raise ValueError("saved counters do not match the saved cells")
+        return board
+
+    def save(self, filename):
+        """ Save the board to a file, see to_bytes.
+
+        Parameters:
+            filename (str): Path of the file to write.
+        """
+        data = self.to_bytes()
+        with open(filename, "wb") as file:
+            file.write(data)
+
+    @classmethod
+    def load(cls, filename):
+        """ Load a board saved to a file, see from_bytes.
+
+        Parameters:
+            filename (str): Path of the file to read.
+
+        Returns:
+            (BoardModel): The saved board.
+        """
+        with open(filename, "rb") as file:
+            data = file.read()
+        return cls.from_bytes(data)
+
+    def _cell_codes(self):
+        """ Get the cell codes of the game, see cell_code.
+
+        Returns:
+            (bytearray): One code per cell.
+        """
+        return self._game.get_cells()
+
+    def _load_cells(self, cells):
+        """ Replace the game with cell codes read from a saved game.
+
+        Parameters:
+            cells (bytearray): One code per cell.
+        """
+        self._game = BoardStore("")
+        self._game.get_cells()[:] = cells
+        self._recount()
+        self._clear_history()
+
+    def _place_pokemon(self, pokemon_locations):
+        """ Use a new Pokemon layout, dropping anything derived from the old one.
+
+        Parameters:
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        """
+        self._pokemon_locations = pokemon_locations
+        self._regions = None
+        self._recount()
+
+    def _recount(self):
+        """ Count unexposed cells, flags and correct flags from scratch.
+
+        Moves keep these counts up to date; a full count is only needed
+        when the whole game string or the Pokemon are replaced.
+        """
+        self._num_unexposed = self._game.count(UNEXPOSED)
+        self._num_flags = self._game.count(FLAG)
+        self._num_correct_flags = 0
+        if self._num_flags:
+            cells = self._game.get_cells()
+            flag = cell_code(FLAG)
+            self._num_correct_flags = sum(1 for i in self._pokemon_locations if cells[i] == flag)
+
+    def get_num_unexposed(self):
+        """ Get the number of unexposed cells, not counting flagged cells.
+
+        Returns:
+            (int): Number of unexposed cells.
+        """
+        return self._num_unexposed
+
+    def get_num_flags(self):
+        """ Get the number of flags placed.
+
+        Returns:
+            (int): Number of flags.
+        """
+        return self._num_flags
+
+    def get_num_correct_flags(self):
+        """ Get the number of flags placed on Pokemon.
+
+        Returns:
+            (int): Number of correctly flagged Pokemon.
+        """
+        return self._num_correct_flags
+
+    def restart_game(self):
+        """ Cover every cell again, keeping the same Pokemon."""
+        self._game = BoardStore(UNEXPOSED * self._grid_size ** 2)
+        self._num_attempted_catches = 0
+        self._num_unexposed = self._grid_size ** 2
+        self._num_flags = 0
+        self._num_correct_flags = 0
+        self._clear_history()
+
+    def new_game(self):
+        """ Start again with newly placed Pokemon."""
+        self.restart_game()
+        self._generate_board()
+
+    def set_history_size(self, size):
+        """ Set how many moves can be undone, dropping the oldest beyond that.
+
+        Parameters:
+            size (int): Maximum number of moves kept, HISTORY_SIZE by default.
+        """
+        self._undo = deque(self._undo, maxlen=size)
+        del self._redo[size:]
+
+    def can_undo(self):
+        """ Returns True if there is a move to undo."""
+        return bool(self._undo)
+
+    def can_redo(self):
+        """ Returns True if there is an undone move to redo."""
+        return bool(self._redo)
+
+    def undo(self):
+        """ Undo the last move: a reveal, a flag or showing the Pokemon.
+
+        Only the cells the move changed are written back, so the cost is
+        proportional to the size of the move, not of the board.
+
+        Returns:
+            (bool): True if a move was undone.
+        """
+        if not self._undo:
+            return False
+        change = self._undo.pop()
+        self._apply_change(change, True)
+        self._redo.append(change)
+        return True
+
+    def redo(self):
+        """ Make the last undone move again.
+
+        Returns:
+            (bool): True if a move was redone.
+        """
+        if not self._redo:
+            return False
+        change = self._redo.pop()
+        self._apply_change(change, False)
+        self._undo.append(change)
+        return True
+
+    def _clear_history(self):
+        """ Forget every move, e.g. when the whole game is replaced."""
+        self._undo.clear()
+        self._redo.clear()
+
+    def _remember(self, indexes, before):
+        """ Add a move on the model's own board to the undo history.
+
+        Parameters:
+            indexes (list<int>): Cells the move changed.
+            before (bytes): Their cell codes before the move.
+        """
+        cells = self._game.get_cells()
+        after = bytes(cells[i] for i in indexes)
+        if after != before:
+            self._undo.append((array("i", indexes), before, after))
+            self._redo.clear()
+
+    def _apply_change(self, change, undo):
+        """ Write the cells of a remembered move, keeping the counters up to date.
+
+        Parameters:
+            change (tuple<array, bytes, bytes>): Cells, codes before and
+                codes after the move.
+            undo (bool): Write the codes from before the move, not after.
+        """
+        indexes, before, after = change
+        cells = self._game.get_cells()
+        unexposed = cell_code(UNEXPOSED)
+        flag = cell_code(FLAG)
+        pokemon_locations = self._pokemon_locations
+        for index, code in zip(indexes, before if undo else after):
+            old = cells[index]
+            cells[index] = code
+            self._num_unexposed += (code == unexposed) - (old == unexposed)
+            flagged = (code == flag) - (old == flag)
+            self._num_flags += flagged
+            if flagged and index in pokemon_locations:
+                self._num_correct_flags += flagged
+        self._game.touch()
+
+    def label_regions(self):
+        """ Label the zero regions of the current Pokemon layout.
+
+        Optional precomputation for boards that are probed many times:
+        afterwards big_fun_search and reveal_cells look up the region of a
+        zero cell instead of searching for it. The labels are dropped when
+        the Pokemon are placed again.
+
+        Returns:
+            (ZeroRegions): The labelled regions.
+        """
+        if self._regions is None:
+            self._regions = ZeroRegions(self._pokemon_locations, self._grid_size)
+        return self._regions
+
+    def _region_cells(self, game, grid_size, pokemon_locations, index):
+        """ Look up the cells opened from a zero cell in the labelled regions.
+
+        The lookup is only used when the regions were labelled for these
+        Pokemon and no flag inside the region could stop the cascade early.
+
+        Parameters:
+            game (str|BoardStore): Game string.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (tuple<list<int>, list<int>>): Zero and border cells of the region,
+            or None if the region cannot be used.
+        """
+        regions = self._regions
+        if (regions is None or regions.get_pokemon_locations() is not pokemon_locations
+                or grid_size != self._grid_size):
+            return None
+        label = regions.region_at(index)
+        if label == -1:
+            return None
+        zeros = regions.get_zeros(label)
+        if FLAG in game:
+            for i in zeros:
+                if game[i] == FLAG:
+                    return None
+        return zeros, regions.get_borders(label)
+
+    def set_game(self, game):
+        """ Sets the game string to a new one.
+
+        Parameters:
+            game (str): The game string.
+        """
+        if game is not str(self._game):
+            self._game = BoardStore(game)
+            self._recount()
+            self._clear_history()
+
+    def get_game(self):
+        """ Get the game string.
+
+        Returns:
+            (str): Game string.
+        """
+        return str(self._game)
+
+    def _store_for(self, game):
+        """ Get a mutable store for a game string passed in by a caller.
+
+        The model's own store is reused when game is its current string view,
+        so updates happen in place instead of copying the board.
+
+        Parameters:
+            game (str): The game string.
+
+        Returns:
+            (BoardStore): Store holding game.
+        """
+        if game is self._game or game is str(self._game):
+            return self._game
+        return BoardStore(game)
+    
+    def get_pokemon_locations(self):
+        """ Get pokemon lcoations.
+        
+        Returns:
+            (tuple<int, ...>): Tuple of all Pokemon's locations.
+        """
+        return self._pokemon_locations
+
+    def get_num_attempted_catches(self):
+        """ Get number of attempted catches.
+        
+        Returns:
+            (int): Number of attempted catches.
+        """
+        return self._num_attempted_catches
+
+    def get_num_pokemon(self):
+        """ Get number of pokemons.
+        
+        Returns:
+            (int): Number of pokemons.
+        """
+        return self._num_pokemon
+
+    def check_loss(self, index):
+        """ Checks, if the player lost the game. If yes, returns True.
+            Updates the game string with pokemon locations to show to the player.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+
+        Returns:
+            (bool): True if player lost.
+        """
+        if index in self._pokemon_locations:
+            cells = self._game.get_cells()
+            before = bytes(cells[i] for i in self._pokemon_locations)
+            for i in self._pokemon_locations:
+                self._game[i] = POKEMON
+            self._recount()
+            self._remember(list(self._pokemon_locations), before)
+            return True
+        else:
+            return False
+
+    def position_to_index(self, position, grid_size):
+        """Convert the row, column coordinate in the grid to the game strings index.
+
+        Parameters:
+            position (tuple<int, int>): The row, column position of a cell.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (int): The index of the cell in the game string.
+        """
+        index = position[0] * grid_size + position[1]
+        return index
+
+    def index_to_position(self, index, grid_size):
+        """ Converts the game string index to row, column coordinate.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (tuple<int, int>): The row, column position of a cell.
+        """
+        position = index % grid_size , index // grid_size
+        return position
+
+    def replace_character_at_index(self, game, index, character):
+        """A specified index in the game string 
+        at the specified index is replaced by a new character.
+
+        A BoardStore is updated in place; a plain string is rebuilt.
+
+        Parameters:
+            game (str|BoardStore): The game string.
+            index (int): The index in the game string where the character is replaced.
+            character (str): The new character that will be replacing the old character.
+
+        Returns:
+            (str|BoardStore): The updated game string.
+        """
+        if isinstance(game, BoardStore):
+            game[index] = character
+            return game
+        game = game[:index] + character + game[index + 1:]
+        return game
+
+    def flag_cell(self, game, index):
+        """Toggle Flag on or off at selected index. If the selected index is already
+        revealed, the game would return with no changes.
+
+        Parameters:
+            game (str): The game string.
+            index (int): The index in the game string where a flag is placed.
+
+        Returns:
+            (str): The updated game string.
+        """
+        store = self._store_for(game)
+        if store is not self._game:
+            self._game = store
+            self._recount()
+            self._clear_history()
+        self.toggle_flag(index)
+        return str(store)
+
+    def toggle_flag(self, index):
+        """Toggle Flag on or off at index on the model's own board, without
+        building a game string. Exposed cells are left as they are.
+
+        Parameters:
+            index (int): The index in the game string where a flag is placed.
+
+        Returns:
+            (bool): True if the cell changed.
+        """
+        store = self._game
+        before = bytes([store.get_cells()[index]])
+        if store[index] == FLAG:
+            store[index] = UNEXPOSED
+            change = -1
+        elif store[index] == UNEXPOSED:
+            store[index] = FLAG
+            change = 1
+        else:
+            return False
+
+        self._num_flags += change
+        self._num_unexposed -= change
+        if index in self._pokemon_locations:
+            self._num_correct_flags += change
+        self._remember([index], before)
+        return True
+
+    def cell_at(self, index):
+        """Get the character of one cell without building the game string.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+
+        Returns:
+            (str): The cell's game character.
+        """
+        return _CHARACTERS[self._game.get_cells()[index]]
+
+    def get_exposed_cells(self):
+        """Get the cells which show a number, zero included.
+
+        Returns:
+            (iterable<int>): Indexes of the exposed cells, in index order.
+        """
+        covered = (UNEXPOSED, FLAG, POKEMON)
+        return (index for index, character in enumerate(self.get_game())
+                if character not in covered)
+
+    def index_in_direction(self, index, grid_size, direction):
+        """The index in the game string is updated by determining the
+        adjacent cell given the direction.
+        The index of the adjacent cell in the game is then calculated and returned.
+
+        For example:
+        | 1 | 2 | 3 |
+        A | i | j | k |
+        B | l | m | n |
+        C | o | p | q |
+
+        The index of m is 4 in the game string.
+        if the direction specified is "up" then:
+        the updated position corresponds with j which has the index of 1 in the game string.
+
+        Parameters:
+            index (int): The index in the game string.
+            grid_size (int): The grid size of the game.
+            direction (str): The direction of the adjacent cell.
+
+        Returns:
+            (int): The index in the game string corresponding to the new cell position
+            in the game.
+
+            None for invalid direction.
+        """
+        # convert index to row, col coordinate
+        col = index % grid_size
+        row = index // grid_size
+        if RIGHT in direction:
+            col += 1
+        elif LEFT in direction:
+            col -= 1
+        
+        if UP in direction:
+            row -= 1
+        elif DOWN in direction:
+            row += 1
+
+        if not (0 <= col < grid_size and 0 <= row < grid_size):
+            return None
+
+        return self.position_to_index((row, col), grid_size)
+
+    def neighbour_directions(self, index, grid_size):
+        """Seek out all direction that has a neighbouring cell.
+
+        Parameters:
+            index (int): The index in the game string.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (list<int>): A list of index that has a neighbouring cell.
+        """
+        return neighbour_table(grid_size).neighbours(index)
+
+    def number_at_cell(self, game, pokemon_locations, grid_size, index):
+        """Calculates what number should be displayed at that specific index in the game.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (int): Number to be displayed at the given index in the game string.
+        """
+        if game[index] != UNEXPOSED:
+            return int(game[index])
+
+        if (isinstance(pokemon_locations, PokemonLocations)
+                and pokemon_locations.get_grid_size() == grid_size):
+            return pokemon_locations.get_counts()[index]
+
+        number = 0
+        for neighbour in self.neighbour_directions(index, grid_size):
+            if neighbour in pokemon_locations:
+                number += 1
+
+        return number
+
+    def check_win(self, game, pokemon_locations):
+        """Checking if the player has won the game.
+
+        Uses the running counts kept by the model, so it takes constant time.
+
+        Parameters:
+            game (str): Game string. It is not read; see has_won.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+
+        Returns:
+            (bool): True if the player has won the game, false if not.
+        """
+        return self._num_unexposed == 0 and self._num_flags == len(pokemon_locations)
+
+    def has_won(self):
+        """ Check if the player has won the board's game, from the running
+        counts kept by the model.
+
+        Returns:
+            (bool): True if every cell is exposed or flagged and there are as
+            many flags as Pokemon.
+        """
+        return self._num_unexposed == 0 and self._num_flags == len(self.get_pokemon_locations())
+
+    def reveal_cells(self, game, grid_size, pokemon_locations, index):
+        """Reveals all neighbouring cells at index and repeats for all
+        cells that had a 0.
+
+        Does not reveal flagged cells or cells with Pokemon.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (str): The updated game string
+        """
+        store = self._store_for(game)
+        changed = self._reveal(store, grid_size, pokemon_locations, index)
+        if store is self._game:
+            self._num_unexposed -= len(changed)
+            self._remember(changed, UNEXPOSED.encode() * len(changed))
+        return str(store)
+
+    def big_fun_search(self, game, grid_size, pokemon_locations, index):
+        """Searching adjacent cells to see if there are any Pokemon"s present.
+
+        Using some sick algorithms.
+
+        Find all cells which should be revealed when a cell is selected.
+
+        For cells which have a zero value (i.e. no neighbouring pokemons) all the cell"s
+        neighbours are revealed. If one of the neighbouring cells is also zero then
+        all of that cell"s neighbours are also revealed. This repeats until no
+        zero value neighbours exist.
+
+        For cells which have a non-zero value (i.e. cells with neighbour pokemons), only
+        the cell itself is revealed.
+
+        Parameters:
+            game (str): Game string.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): List of cells to turn visible.
+        """
+        visible = []
+
+        if game[index] == FLAG:
+            return [index]
+
+        counts = counts_for(pokemon_locations, grid_size)
+        if counts[index] != 0:
+            return [index]
+
+        region = self._region_cells(game, grid_size, pokemon_locations, index)
+        if region is not None:
+            zeros, borders = region
+            return [i for i in zeros if i != index] + borders
+
+        table = neighbour_table(grid_size)
+        discovered = bytearray(grid_size * grid_size)
+        discovered[index] = 1
+        queue = deque([index])
+        while queue:
+            node = queue.popleft()
+            for offset in table.offsets_at(node):
+                neighbour = node + offset
+                if discovered[neighbour]:
+                    continue
+
+                discovered[neighbour] = 1
+                if game[neighbour] != FLAG and counts[neighbour] == 0:
+                    queue.append(neighbour)
+                visible.append(neighbour)
+        return visible
+
+    def reveal_region(self, index):
+        """Reveals the selected cell and everything big_fun_search would open,
+        updating the model's board in place.
+
+        Parameters:
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): Indexes of the cells which were turned visible.
+        """
+        changed = self._reveal(self._game, self._grid_size, self._pokemon_locations, index)
+        self._num_unexposed -= len(changed)
+        self._remember(changed, UNEXPOSED.encode() * len(changed))
+        return changed
+
+    def chord(self, index):
+        """Reveals every unflagged neighbour of a number whose Pokemon are
+        all flagged, as one move.
+
+        Nothing happens unless the cell shows a number and that many of its
+        neighbours are flagged. If a flag is wrong, the uncovered Pokemon
+        loses the game as check_loss does; otherwise the neighbours are
+        revealed with their cascades and undo takes them all back at once.
+
+        Parameters:
+            index (int): Index of the numbered cell.
+
+        Returns:
+            (bool): True if a neighbour held a Pokemon and the player lost.
+        """
+        game = self._game
+        if not game[index].isdigit():
+            return False
+        neighbours = neighbour_table(self._grid_size).neighbours(index)
+        if sum(1 for i in neighbours if game[i] == FLAG) != int(game[index]):
+            return False
+        targets = [i for i in neighbours if game[i] == UNEXPOSED]
+        for i in targets:
+            if i in self._pokemon_locations:
+                return self.check_loss(i)
+
+        changed = []
+        for i in targets:
+            if game[i] == UNEXPOSED:
+                changed += self._reveal(game, self._grid_size, self._pokemon_locations, i)
+        self._num_unexposed -= len(changed)
+        self._remember(changed, UNEXPOSED.encode() * len(changed))
+        return False
+
+    def _reveal(self, store, grid_size, pokemon_locations, index):
+        """Flood fill behind reveal_cells and reveal_region.
+
+        Works on the cell codes directly: the frontier is a deque and
+        discovered cells are marked in a bytearray, so the cost is
+        proportional to the revealed region. Flagged cells are neither
+        revealed nor searched through.
+
+        Parameters:
+            store (BoardStore): Board to update in place.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): Indexes of the cells which were turned visible.
+        """
+        cells = store.get_cells()
+        flag = cell_code(FLAG)
+        unexposed = cell_code(UNEXPOSED)
+        exposed = cell_code(EXPOSED)
+        counts = counts_for(pokemon_locations, grid_size)
+        changed = []
+
+        if cells[index] == flag:
+            return changed
+        if cells[index] == unexposed:
+            cells[index] = exposed + counts[index]
+            changed.append(index)
+        if counts[index] != 0:
+            store.touch()
+            return changed
+
+        region = self._region_cells(store, grid_size, pokemon_locations, index)
+        if region is not None:
+            for cells_to_open in region:
+                for i in cells_to_open:
+                    if cells[i] == unexposed:
+                        cells[i] = exposed + counts[i]
+                        changed.append(i)
+            store.touch()
+            return changed
+
+        offsets_at = neighbour_table(grid_size).offsets_at
+        discovered = bytearray(len(cells))
+        discovered[index] = 1
+        queue = deque([index])
+        while queue:
+            node = queue.popleft()
+            for offset in offsets_at(node):
+                neighbour = node + offset
+                if discovered[neighbour]:
+                    continue
+                discovered[neighbour] = 1
+                code = cells[neighbour]
+                if code == flag:
+                    continue
+                if code == unexposed:
+                    cells[neighbour] = exposed + counts[neighbour]
+                    changed.append(neighbour)
+                if counts[neighbour] == 0:
+                    queue.append(neighbour)
+
+        store.touch()
+        return changed
+
+    def generate_pokemons(self, grid_size, number_of_pokemons, rng=random):
+        """Pokemons will be generated and given a random index within the game.
+
+        Sampling without replacement takes time linear in the number of
+        Pokemon, even on huge boards filled close to capacity.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            number_of_pokemons (int): The number of pokemons that the game will have.
+            rng (random.Random): Source of randomness, the random module by default.
+
+        Returns:
+            (PokemonLocations): A tuple containing  indexes where the pokemons are
+            created for the game string.
+        """
+        cell_count = grid_size ** 2
+        number_of_pokemons = max(0, min(number_of_pokemons, cell_count))
+        if number_of_pokemons > cell_count // 2:
+            # Nearly full boards: sample the few empty cells instead.
+            empty = set(rng.sample(range(cell_count), cell_count - number_of_pokemons))
+            pokemon_locations = [index for index in range(cell_count) if index not in empty]
+        else:
+            pokemon_locations = rng.sample(range(cell_count), number_of_pokemons)
+
+        return self._make_locations(pokemon_locations, grid_size)
+
+    def _make_locations(self, pokemon_locations, grid_size):
+        """ Wrap newly generated locations, counting their neighbours.
+
+        Parameters:
+            pokemon_locations (list<int>): Indexes of the Pokemon.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (PokemonLocations): The locations with their neighbour counts.
+        """
+        return PokemonLocations(pokemon_locations, grid_size)
+
+    def character_at_index(self, game, index):
+        """ Returns character at the specified game string index.
+
+        Parameters:
+            game (str): Game string.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (string): Character at game string index.
+        """
+        character = game[index]
+        return character
+
+
+def _import_numpy():
+    """ Import NumPy, which only the "numpy" engine needs.
+
+    Returns:
+        (module): The numpy module.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('the "numpy" board engine needs NumPy installed') from None
+    return numpy
+
+
+class NumpyBoardModel(BoardModel):
+    """
+    Board model which works on the board as 2D NumPy arrays.
+
+    The game state is a uint8 array viewing the model's BoardStore, so
+    string access still works, and the Pokemon mask and neighbour counts
+    are boolean and uint8 arrays of the same shape. Counting, cascades and
+    showing the Pokemon are whole-array operations.
+    """
+
+    def _setup(self, grid_size, num_pokemon, seed, pokemon_locations=None):
+        """ Initialise a new board, see BoardModel.seeded.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            num_pokemon (int): The number of pokemons that the game will have.
+            seed (int|random.Random): Seed or generator of board seeds.
+            pokemon_locations (list<int>): Locations to use instead of generating them.
+        """
+        self._np = _import_numpy()
+        super()._setup(grid_size, num_pokemon, seed, pokemon_locations)
+
+    def _make_locations(self, pokemon_locations, grid_size):
+        """ Wrap newly generated locations, counting neighbours with a 3x3 sum.
+
+        Parameters:
+            pokemon_locations (list<int>): Indexes of the Pokemon.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (PokemonLocations): The locations with their neighbour counts.
+        """
+        np = self._np
+        mines = np.zeros(grid_size ** 2, dtype=bool)
+        mines[np.asarray(pokemon_locations, dtype=np.intp)] = True
+        mines = mines.reshape(grid_size, grid_size)
+
+        padded = np.pad(mines.astype(np.uint8), 1)
+        counts = sum(padded[1 + row:1 + row + grid_size, 1 + col:1 + col + grid_size]
+                     for row in (-1, 0, 1) for col in (-1, 0, 1)) - mines
+        return PokemonLocations(pokemon_locations, grid_size,
+                                bytearray(counts.astype(np.uint8).tobytes()))
+
+    def _place_pokemon(self, pokemon_locations):
+        """ Use a new Pokemon layout and rebuild its mask.
+
+        Parameters:
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        """
+        np = self._np
+        mines = np.zeros(self._grid_size ** 2, dtype=bool)
+        mines[np.asarray(pokemon_locations, dtype=np.intp)] = True
+        self._mines = mines.reshape(self._grid_size, self._grid_size)
+        super()._place_pokemon(pokemon_locations)
+
+    def _as_array(self, store):
+        """ View a store's cells as a 2D array, without copying.
+
+        Parameters:
+            store (BoardStore): Board to view.
+
+        Returns:
+            (numpy.ndarray): uint8 array of cell codes, grid_size x grid_size.
+        """
+        grid_size = self._grid_size
+        return self._np.frombuffer(store.get_cells(), dtype=self._np.uint8).reshape(
+            grid_size, grid_size)
+
+    def get_state(self):
+        """ Get the game state as a 2D array of BoardStore cell codes.
+
+        Returns:
+            (numpy.ndarray): Writable view of the board, see cell_code.
+        """
+        return self._as_array(self._game)
+
+    def get_pokemon_mask(self):
+        """ Get where the Pokemon are.
+
+        Returns:
+            (numpy.ndarray): Boolean array, True at every Pokemon.
+        """
+        return self._mines
+
+    def get_counts(self):
+        """ Get the number of Pokemon next to every cell.
+
+        Returns:
+            (numpy.ndarray): uint8 array of neighbour counts.
+        """
+        return self._np.frombuffer(self._pokemon_locations.get_counts(), dtype=self._np.uint8
+                                   ).reshape(self._grid_size, self._grid_size)
+
+    def _recount(self):
+        """ Count unexposed cells, flags and correct flags with array reductions."""
+        np = self._np
+        state = self.get_state()
+        flags = state == cell_code(FLAG)
+        self._num_unexposed = int(np.count_nonzero(state == cell_code(UNEXPOSED)))
+        self._num_flags = int(np.count_nonzero(flags))
+        self._num_correct_flags = int(np.count_nonzero(flags & self._mines))
+
+    def check_loss(self, index):
+        """ Checks, if the player lost the game. If yes, returns True.
+            Shows every Pokemon with a single masked assignment.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+
+        Returns:
+            (bool): True if player lost.
+        """
+        if not self._mines.flat[index]:
+            return False
+        state = self.get_state()
+        before = state[self._mines].tobytes()
+        state[self._mines] = cell_code(POKEMON)
+        self._game.touch()
+        self._recount()
+        self._remember(self._np.flatnonzero(self._mines).tolist(), before)
+        return True
+
+    def _cascade(self, store, grid_size, pokemon_locations, index, with_flags=False):
+        """ Find the cells opened from a zero cell by repeated dilation.
+
+        Each step grows the region by one cell in every direction from its
+        unflagged zero cells, only inside the region's bounding box plus a
+        margin of one, until it stops changing. The zero and flag masks are
+        computed for that window too, so a small cascade costs little on a
+        large board.
+
+        Parameters:
+            store (BoardStore): Board to search.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of a zero cell.
+            with_flags (bool): Also include flagged cells next to the region,
+                which big_fun_search lists but which are never revealed.
+
+        Returns:
+            (tuple<numpy.ndarray, int, int>): Boolean region mask of its
+            bounding box, and the box's top row and left column.
+        """
+        np = self._np
+        state = self._as_array(store)
+        counts = np.frombuffer(counts_for(pokemon_locations, grid_size), dtype=np.uint8
+                               ).reshape(grid_size, grid_size)
+
+        row, col = divmod(index, grid_size)
+        top, bottom, left, right = row, row + 1, col, col + 1
+        region = np.zeros((1, 1), dtype=bool)
+        region[0, 0] = True
+        while True:
+            top2, bottom2 = max(top - 1, 0), min(bottom + 1, grid_size)
+            left2, right2 = max(left - 1, 0), min(right + 1, grid_size)
+            window = np.zeros((bottom2 - top2, right2 - left2), dtype=bool)
+            window[top - top2:bottom - top2, left - left2:right - left2] = region
+
+            unflagged = state[top2:bottom2, left2:right2] != cell_code(FLAG)
+            seeds = window & unflagged & (counts[top2:bottom2, left2:right2] == 0)
+            grown = seeds.copy()
+            grown[1:, :] |= seeds[:-1, :]
+            grown[:-1, :] |= seeds[1:, :]
+            spread = grown.copy()
+            grown[:, 1:] |= spread[:, :-1]
+            grown[:, :-1] |= spread[:, 1:]
+            flagged_border = grown & ~unflagged
+            grown &= unflagged
+            grown |= window
+
+            if np.count_nonzero(grown) == np.count_nonzero(region):
+                if with_flags:
+                    return window | flagged_border, top2, left2
+                return region, top, left
+
+            rows = np.flatnonzero(grown.any(axis=1))
+            cols = np.flatnonzero(grown.any(axis=0))
+            top, bottom = top2 + rows[0], top2 + rows[-1] + 1
+            left, right = left2 + cols[0], left2 + cols[-1] + 1
+            region = grown[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+    def big_fun_search(self, game, grid_size, pokemon_locations, index):
+        """Find all cells which should be revealed when a cell is selected,
+        using the vectorised cascade. See BoardModel.big_fun_search.
+
+        Parameters:
+            game (str): Game string.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): List of cells to turn visible.
+        """
+        if game[index] == FLAG or counts_for(pokemon_locations, grid_size)[index] != 0:
+            return [index]
+        region, top, left = self._cascade(
+            self._store_for(game), grid_size, pokemon_locations, index, with_flags=True)
+        rows, cols = self._np.nonzero(region)
+        visible = ((rows + top) * grid_size + cols + left).tolist()
+        visible.remove(index)
+        return visible
+
+    def _reveal(self, store, grid_size, pokemon_locations, index):
+        """Reveal the selected cell and, from a zero cell, its whole region
+        with array operations.
+
+        Parameters:
+            store (BoardStore): Board to update in place.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): Indexes of the cells which were turned visible.
+        """
+        np = self._np
+        cells = store.get_cells()
+        counts = counts_for(pokemon_locations, grid_size)
+        if cells[index] == cell_code(FLAG):
+            return []
+        if counts[index] != 0:
+            if cells[index] != cell_code(UNEXPOSED):
+                return []
+            cells[index] = cell_code(EXPOSED) + counts[index]
+            store.touch()
+            return [index]
+
+        region, top, left = self._cascade(store, grid_size, pokemon_locations, index)
+        height, width = region.shape
+        state = self._as_array(store)[top:top + height, left:left + width]
+        opened = region & (state == cell_code(UNEXPOSED))
+        count_box = np.frombuffer(counts, dtype=np.uint8).reshape(
+            grid_size, grid_size)[top:top + height, left:left + width]
+        state[opened] = cell_code(EXPOSED) + count_box[opened]
+        store.touch()
+
+        rows, cols = np.nonzero(opened)
+        return ((rows + top) * grid_size + cols + left).tolist()
+
+
+BITBOARD_MAX_GRID_SIZE = 64
+
+_BYTE_MASKS = bytes(0xFF if byte == ord("1") else 0 for byte in range(256))
+
+
+class BitboardTables:
+    """Masks for working on a bitboard of one grid size.
+
+    Bit i of a bitboard is the cell at index i. Shifting by one moves a
+    cell sideways and shifting by grid_size moves it up or down; the
+    column masks stop sideways moves wrapping onto the next row.
+    """
+
+    def __init__(self, grid_size):
+        """Build the masks.
+
+        Parameters:
+            grid_size (int): Size of the game grid.
+        """
+        self._grid_size = grid_size
+        self._full = (1 << grid_size ** 2) - 1
+        first_column = sum(1 << row * grid_size for row in range(grid_size))
+        self._not_first_column = self._full & ~first_column
+        self._not_last_column = self._full & ~(first_column << grid_size - 1)
+        self._neighbours = [self.spread(1 << index) for index in range(grid_size ** 2)]
+        self._fills = {}
+
+    def get_full(self):
+        """Get the bitboard with every cell set.
+
+        Returns:
+            (int): Bitboard of the whole grid.
+        """
+        return self._full
+
+    def fill(self, code):
+        """Get a byte per cell, all holding the same code.
+
+        Parameters:
+            code (int): Byte value.
+
+        Returns:
+            (int): The bytes as a little-endian int.
+        """
+        if code not in self._fills:
+            self._fills[code] = int.from_bytes(bytes((code,)) * self._grid_size ** 2, "little")
+        return self._fills[code]
+
+    def byte_mask(self, bits):
+        """Spread a bitboard out to one byte per cell.
+
+        Parameters:
+            bits (int): Bitboard.
+
+        Returns:
+            (int): Little-endian bytes, 0xFF for set cells and 0 otherwise.
+        """
+        cells = bin(bits)[2:].zfill(self._grid_size ** 2)[::-1]
+        return int.from_bytes(cells.encode("ascii").translate(_BYTE_MASKS), "little")
+
+    def neighbour_mask(self, index):
+        """Get the bitboard of a cell's neighbours.
+
+        Parameters:
+            index (int): Index in the game string.
+
+        Returns:
+            (int): Bitboard of the neighbour cells.
+        """
+        return self._neighbours[index]
+
+    def spread(self, bits):
+        """Move a bitboard by one cell in each of the eight directions.
+
+        Parameters:
+            bits (int): Bitboard.
+
+        Returns:
+            (int): Every cell which is a neighbour of a cell of bits.
+        """
+        sideways = ((bits << 1) & self._not_first_column) | ((bits >> 1) & self._not_last_column)
+        row = bits | sideways
+        return (sideways | (row << self._grid_size) | (row >> self._grid_size)) & self._full
+
+    def dilate(self, bits):
+        """Grow a bitboard by one cell in all eight directions.
+
+        Parameters:
+            bits (int): Bitboard.
+
+        Returns:
+            (int): The cells of bits and all their neighbours.
+        """
+        return bits | self.spread(bits)
+
+
+@functools.lru_cache(maxsize=8)
+def bitboard_tables(grid_size):
+    """Returns the shared BitboardTables for a grid size, building it once.
+
+    Parameters:
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (BitboardTables): Masks for the grid size.
+    """
+    return BitboardTables(grid_size)
+
+
+def bits_to_indexes(bits):
+    """Lists the set bits of a bitboard.
+
+    Parameters:
+        bits (int): Bitboard.
+
+    Returns:
+        (list<int>): Indexes of the set cells, in increasing order.
+    """
+    indexes = []
+    while bits:
+        lowest = bits & -bits
+        indexes.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return indexes
+
+
+def count_bits(bits):
+    """Counts the set bits of a bitboard.
+
+    int.bit_count would do, but needs Python 3.10.
+
+    Parameters:
+        bits (int): Bitboard.
+
+    Returns:
+        (int): Number of set cells.
+    """
+    return bin(bits).count("1")
+
+
+def bits_from_game(game, character):
+    """Builds the bitboard of the cells holding a character.
+
+    Parameters:
+        game (str): Game string.
+        character (str): Character to look for.
+
+    Returns:
+        (int): Bitboard of the matching cells.
+    """
+    return int("0" + "".join("1" if cell == character else "0" for cell in reversed(game)), 2)
+
+
+class BitboardBoardModel(BoardModel):
+    """
+    Board model which keeps the Pokemon, flags and exposed cells as bits of
+    Python ints, for grids up to BITBOARD_MAX_GRID_SIZE.
+
+    The number at a cell is the popcount of the Pokemon under its neighbour
+    mask, and a cascade is a loop of shift-and-mask dilations. A board is a
+    handful of ints; the game string is only built when asked for.
+    """
+
+    def _setup(self, grid_size, num_pokemon, seed, pokemon_locations=None):
+        """ Initialise a new board, see BoardModel.seeded.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            num_pokemon (int): The number of pokemons that the game will have.
+            seed (int|random.Random): Seed or generator of board seeds.
+            pokemon_locations (list<int>): Locations to use instead of generating them.
+
+        Raises:
+            ValueError: If the grid is too large for a bitboard.
+        """
+        if grid_size > BITBOARD_MAX_GRID_SIZE:
+            raise ValueError(f"bitboards support grids up to {BITBOARD_MAX_GRID_SIZE}, "
+                             f"not {grid_size}")
+        self._grid_size = grid_size
+        self._num_pokemon = num_pokemon
+        self._tables = bitboard_tables(grid_size)
+        self._regions = None
+        self._undo = deque(maxlen=HISTORY_SIZE)
+        self._redo = []
+        self._seeds = board_seeds(seed)
+        self.restart_game()
+        self._generate_board(pokemon_locations)
+
+    def _make_locations(self, pokemon_locations, grid_size):
+        """ Keep generated locations as they are; the bits replace the counts.
+
+        Parameters:
+            pokemon_locations (list<int>): Indexes of the Pokemon.
+            grid_size (int): The grid size of the game.
+
+        Returns:
+            (list<int>): The locations.
+        """
+        return pokemon_locations
+
+    def _place_pokemon(self, pokemon_locations):
+        """ Use a new Pokemon layout.
+
+        Parameters:
+            pokemon_locations (iterable<int>): Indexes of the Pokemon.
+        """
+        self._mines = 0
+        for index in pokemon_locations:
+            self._mines |= 1 << index
+        self._zeros = self._tables.get_full() & ~self._tables.spread(self._mines)
+        self._digits = None
+        self._pokemon_locations = None
+        self._regions = None
+        self._view = None
+
+    def get_pokemon_locations(self):
+        """ Get pokemon locations, built from the Pokemon bits when first asked for.
+
+        Returns:
+            (tuple<int, ...>): Tuple of all Pokemon's locations.
+        """
+        if self._pokemon_locations is None:
+            self._pokemon_locations = PokemonLocations(bits_to_indexes(self._mines), self._grid_size)
+        return self._pokemon_locations
+
+    def label_regions(self):
+        """ Label the zero regions of the current Pokemon layout.
+
+        Cascades on a bitboard do not use the labels; they are available
+        for analysis.
+
+        Returns:
+            (ZeroRegions): The labelled regions.
+        """
+        if self._regions is None:
+            self._regions = ZeroRegions(self.get_pokemon_locations(), self._grid_size)
+        return self._regions
+
+    def restart_game(self):
+        """ Cover every cell again, keeping the same Pokemon."""
+        self._flags = 0
+        self._exposed = 0
+        self._shown = 0
+        self._num_attempted_catches = 0
+        self._view = None
+        self._clear_history()
+
+    def set_game(self, game):
+        """ Sets the game string to a new one.
+
+        Parameters:
+            game (str): The game string.
+        """
+        if game is self._view:
+            return
+        self._flags = bits_from_game(game, FLAG)
+        self._shown = bits_from_game(game, POKEMON)
+        self._exposed = self._tables.get_full() & ~(
+            bits_from_game(game, UNEXPOSED) | self._flags | self._shown)
+        self._view = None
+        self._clear_history()
+
+    def _cell_codes(self):
+        """ Get the cell codes of the game, see cell_code.
+
+        Returns:
+            (bytearray): One code per cell.
+        """
+        return BoardStore(self.get_game()).get_cells()
+
+    def _load_cells(self, cells):
+        """ Replace the game with cell codes read from a saved game.
+
+        Parameters:
+            cells (bytearray): One code per cell.
+        """
+        self.set_game(BoardStore._decode(cells))
+
+    def get_game(self):
+        """ Get the game string, built from the bitboards.
+
+        Returns:
+            (str): Game string.
+        """
+        if self._view is None:
+            # Spread each bitboard out to one byte per cell and pick every
+            # cell's code with byte masks, so no Python loop runs per cell.
+            tables = self._tables
+            if self._digits is None:
+                counts = pokemon_counts(bits_to_indexes(self._mines), self._grid_size)
+                self._digits = int.from_bytes(counts, "little") + tables.fill(cell_code(EXPOSED))
+            codes = ((self._digits & tables.byte_mask(self._exposed))
+                     | (tables.fill(cell_code(FLAG)) & tables.byte_mask(self._flags))
+                     | (tables.fill(cell_code(POKEMON)) & tables.byte_mask(self._shown))
+                     | (tables.fill(cell_code(UNEXPOSED)) & tables.byte_mask(self._unexposed())))
+            self._view = BoardStore._decode(codes.to_bytes(self._grid_size ** 2, "little"))
+        return self._view
+
+    def _count(self, index):
+        """ Count the Pokemon next to a cell.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+
+        Returns:
+            (int): Number of neighbouring Pokemon.
+        """
+        return count_bits(self._mines & self._tables.neighbour_mask(index))
+
+    def _unexposed(self):
+        """ Get the bitboard of cells that are neither exposed nor flagged.
+
+        Returns:
+            (int): Bitboard of unexposed cells.
+        """
+        return self._tables.get_full() & ~(self._exposed | self._flags | self._shown)
+
+    def _recount(self):
+        """ Nothing to do: the counts are popcounts of the bitboards."""
+
+    def _state(self):
+        """ Get the bitboards a move can change.
+
+        Returns:
+            (tuple<int, int, int>): Flagged, exposed and shown Pokemon bits.
+        """
+        return self._flags, self._exposed, self._shown
+
+    def _remember_state(self, before):
+        """ Add a move to the undo history.
+
+        Ints are immutable, so the bitboards from before and after the move
+        are kept as they are instead of being copied.
+
+        Parameters:
+            before (tuple<int, int, int>): Bitboards from before the move.
+        """
+        after = self._state()
+        if after != before:
+            self._undo.append((before, after))
+            self._redo.clear()
+
+    def _apply_change(self, change, undo):
+        """ Put back the bitboards from before or after a remembered move.
+
+        Parameters:
+            change (tuple<tuple, tuple>): Bitboards before and after the move.
+            undo (bool): Use the bitboards from before the move.
+        """
+        self._flags, self._exposed, self._shown = change[0] if undo else change[1]
+        self._view = None
+
+    def get_num_unexposed(self):
+        """ Get the number of unexposed cells, not counting flagged cells.
+
+        Returns:
+            (int): Number of unexposed cells.
+        """
+        return count_bits(self._unexposed())
+
+    def get_num_flags(self):
+        """ Get the number of flags placed.
+
+        Returns:
+            (int): Number of flags.
+        """
+        return count_bits(self._flags)
+
+    def get_num_correct_flags(self):
+        """ Get the number of flags placed on Pokemon.
+
+        Returns:
+            (int): Number of correctly flagged Pokemon.
+        """
+        return count_bits(self._flags & self._mines)
+
+    def check_loss(self, index):
+        """ Checks, if the player lost the game. If yes, returns True and
+            shows every Pokemon.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+
+        Returns:
+            (bool): True if player lost.
+        """
+        if not self._mines >> index & 1:
+            return False
+        before = self._state()
+        self._shown = self._mines
+        self._flags &= ~self._mines
+        self._view = None
+        self._remember_state(before)
+        return True
+
+    def flag_cell(self, game, index):
+        """Toggle Flag on or off at selected index. If the selected index is already
+        revealed, the game would return with no changes.
+
+        Parameters:
+            game (str): The game string.
+            index (int): The index in the game string where a flag is placed.
+
+        Returns:
+            (str): The updated game string.
+        """
+        self.set_game(game)
+        self.toggle_flag(index)
+        return self.get_game()
+
+    def toggle_flag(self, index):
+        """Toggle Flag on or off at index, see BoardModel.toggle_flag.
+
+        Parameters:
+            index (int): The index in the game string where a flag is placed.
+
+        Returns:
+            (bool): True if the cell changed.
+        """
+        bit = 1 << index
+        if not (self._flags & bit or self._unexposed() & bit):
+            return False
+        before = self._state()
+        self._flags ^= bit
+        self._view = None
+        self._remember_state(before)
+        return True
+
+    def cell_at(self, index):
+        """Get the character of one cell from the bitboards.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+
+        Returns:
+            (str): The cell's game character.
+        """
+        if self._exposed >> index & 1:
+            return str(self._count(index))
+        if self._flags >> index & 1:
+            return FLAG
+        if self._shown >> index & 1:
+            return POKEMON
+        return UNEXPOSED
+
+    def number_at_cell(self, game, pokemon_locations, grid_size, index):
+        """Calculates what number should be displayed at that specific index in the game.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (int): Number to be displayed at the given index in the game string.
+        """
+        if game[index] != UNEXPOSED:
+            return int(game[index])
+        return self._count(index)
+
+    def check_win(self, game, pokemon_locations):
+        """Checking if the player has won the game.
+
+        Parameters:
+            game (str): Game string. It is not read; see has_won.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+
+        Returns:
+            (bool): True if the player has won the game, false if not.
+        """
+        return not self._unexposed() and count_bits(self._flags) == len(pokemon_locations)
+
+    def has_won(self):
+        """ Check if the player has won the board's game.
+
+        Returns:
+            (bool): True if every cell is exposed or flagged and there are as
+            many flags as Pokemon.
+        """
+        return not self._unexposed() and count_bits(self._flags) == count_bits(self._mines)
+
+    def _cascade(self, flags, index):
+        """ Find the cells opened from a zero cell by repeated dilation.
+
+        Parameters:
+            flags (int): Bitboard of flagged cells, which stop the cascade.
+            index (int): Index of a zero cell.
+
+        Returns:
+            (tuple<int, int>): Bitboards of the opened cells, and of the
+            flagged cells next to them.
+        """
+        dilate = self._tables.dilate
+        passable = self._zeros & ~flags
+        region = 1 << index
+        while True:
+            grown = dilate(region & passable)
+            opened = (grown | region) & ~flags
+            if opened == region:
+                return region, grown & flags
+            region = opened
+
+    def big_fun_search(self, game, grid_size, pokemon_locations, index):
+        """Find all cells which should be revealed when a cell is selected,
+        using bitboard dilation. See BoardModel.big_fun_search.
+
+        Parameters:
+            game (str): Game string.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): List of cells to turn visible.
+        """
+        if game[index] == FLAG or not self._zeros >> index & 1:
+            return [index]
+        flags = self._flags if game is self._view else bits_from_game(game, FLAG)
+        region, flagged = self._cascade(flags, index)
+        return bits_to_indexes((region | flagged) & ~(1 << index))
+
+    def _reveal_bits(self, index):
+        """ Reveal a cell and its cascade on the model's bitboards.
+
+        Parameters:
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (int): Bitboard of the cells which were turned visible.
+        """
+        bit = 1 << index
+        if self._flags & bit:
+            return 0
+        if self._zeros & bit:
+            region = self._cascade(self._flags, index)[0]
+        else:
+            region = bit
+        changed = region & self._unexposed()
+        if changed:
+            before = self._state()
+            self._exposed |= changed
+            self._view = None
+            self._remember_state(before)
+        return changed
+
+    def reveal_region(self, index):
+        """Reveals the selected cell and everything big_fun_search would open.
+
+        Parameters:
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): Indexes of the cells which were turned visible.
+        """
+        return bits_to_indexes(self._reveal_bits(index))
+
+    def chord(self, index):
+        """Reveals every unflagged neighbour of a satisfied number, merging
+        their cascades into one update of the bitboards. See BoardModel.chord.
+
+        Parameters:
+            index (int): Index of the numbered cell.
+
+        Returns:
+            (bool): True if a neighbour held a Pokemon and the player lost.
+        """
+        neighbours = self._tables.neighbour_mask(index)
+        if (not self._exposed >> index & 1
+                or count_bits(self._flags & neighbours) != self._count(index)):
+            return False
+        targets = neighbours & self._unexposed()
+        if targets & self._mines:
+            return self.check_loss(bits_to_indexes(targets & self._mines)[0])
+
+        opened = 0
+        for i in bits_to_indexes(targets & self._zeros):
+            if not opened >> i & 1:
+                opened |= self._cascade(self._flags, i)[0]
+        changed = (targets | opened) & self._unexposed()
+        if changed:
+            before = self._state()
+            self._exposed |= changed
+            self._view = None
+            self._remember_state(before)
+        return False
+
+    def reveal_cells(self, game, grid_size, pokemon_locations, index):
+        """Reveals all neighbouring cells at index and repeats for all
+        cells that had a 0.
+
+        Does not reveal flagged cells or cells with Pokemon.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (str): The updated game string
+        """
+        self.set_game(game)
+        self._reveal_bits(index)
+        return self.get_game()
+
+
+_EXPOSED_RUN = re.compile("[0-8]+")
+
+
+def merge_runs(bounds, columns):
+    """ Add columns to a row's exposed runs.
+
+    Parameters:
+        bounds (tuple<int, ...>): Start and end columns of the runs, in
+            order: start0, end0, start1, end1, ... with the ends excluded.
+        columns (iterable<int>): Columns to add.
+
+    Returns:
+        (tuple<int, ...>): Bounds of the merged runs.
+    """
+    runs = list(zip(bounds[::2], bounds[1::2]))
+    for column in sorted(columns):
+        if runs and runs[-1][1] == column:
+            runs[-1] = (runs[-1][0], column + 1)
+        else:
+            runs.append((column, column + 1))
+    runs.sort()
+
+    merged = []
+    for start, end in runs:
+        if merged and start <= merged[-1]:
+            merged[-1] = max(merged[-1], end)
+        else:
+            merged += [start, end]
+    return tuple(merged)
+
+
+class SparseBoardModel(BoardModel):
     """
-    def __init__(self, grid_size, num_pokemon):
+    Board model for huge grids with few Pokemon, which stores what has been
+    explored instead of one character per cell.
+
+    Exposed cells are kept as runs of columns per row, flags and shown
+    Pokemon as sets of indexes, and numbers are counted from the Pokemon
+    set when needed, so memory grows with the explored area rather than
+    the board area. The game string is built each time it is asked for and
+    not kept; play with reveal_region, toggle_flag and cell_at, which work
+    on indexes, to do without it.
+    """
+
+    def _setup(self, grid_size, num_pokemon, seed, pokemon_locations=None):
+        """ Initialise a new board, see BoardModel.seeded.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            num_pokemon (int): The number of pokemons that the game will have.
+            seed (int|random.Random): Seed or generator of board seeds.
+            pokemon_locations (list<int>): Locations to use instead of generating them.
+        """
         self._grid_size = grid_size
         self._num_pokemon = num_pokemon
-        self._game = UNEXPOSED * grid_size ** 2
-        self._pokemon_locations = self.generate_pokemons(grid_size, num_pokemon)
+        self._regions = None
+        self._undo = deque(maxlen=HISTORY_SIZE)
+        self._redo = []
+        self._seeds = board_seeds(seed)
+        self.restart_game()
+        self._generate_board(pokemon_locations)
+
+    def restart_game(self):
+        """ Cover every cell again, keeping the same Pokemon."""
+        self._rows = {}
+        self._flags = set()
+        self._shown = frozenset()
         self._num_attempted_catches = 0
+        self._num_unexposed = self._grid_size ** 2
+        self._num_flags = 0
+        self._num_correct_flags = 0
+        self._clear_history()
+
+    def get_num_runs(self):
+        """ Get the number of runs of exposed cells stored.
+
+        Returns:
+            (int): Number of runs, which the memory used grows with.
+        """
+        return sum(len(bounds) for bounds in self._rows.values()) // 2
 
     def set_game(self, game):
         """ Sets the game string to a new one.
 
+        Builds the whole game string to compare with and parses every cell,
+        so it costs O(grid_size ** 2) however little was explored; it is
+        meant for loading games, not for play.
+
         Parameters:
             game (str): The game string.
         """
-        self._game = game
+        if game == self.get_game():
+            return
+        grid_size = self._grid_size
+        rows = {}
+        for match in _EXPOSED_RUN.finditer(game):
+            start, end = match.span()
+            while start < end:
+                row, column = divmod(start, grid_size)
+                stop = min(end, (row + 1) * grid_size)
+                rows.setdefault(row, []).extend((column, column + stop - start))
+                start = stop
+        self._rows = {row: tuple(bounds) for row, bounds in rows.items()}
+        self._flags = {match.start() for match in re.finditer(FLAG, game)}
+        self._shown = frozenset(match.start() for match in re.finditer(POKEMON, game))
+        self._recount()
+        self._clear_history()
 
     def get_game(self):
-        """ Get the game string.
+        """ Get the game string, built from the explored cells.
+
+        Builds one character per cell, so it costs O(grid_size ** 2) time and
+        memory each call; cell_at and get_exposed_cells read the explored
+        cells without it.
 
         Returns:
             (str): Game string.
         """
-        return self._game
-    
-    def get_pokemon_locations(self):
-        """ Get pokemon lcoations.
-        
+        return BoardStore._decode(self._cell_codes())
+
+    def _cell_codes(self):
+        """ Get the cell codes of the game from the runs, flags and shown
+        Pokemon, see cell_code.
+
         Returns:
-            (tuple<int, ...>): Tuple of all Pokemon's locations.
+            (bytearray): One code per cell.
         """
-        return self._pokemon_locations
+        grid_size = self._grid_size
+        cells = bytearray([cell_code(UNEXPOSED)]) * grid_size ** 2
+        exposed = cell_code(EXPOSED)
+        for row, bounds in self._rows.items():
+            offset = row * grid_size
+            for start, end in zip(bounds[::2], bounds[1::2]):
+                for index in range(offset + start, offset + end):
+                    cells[index] = exposed + self._count(index)
+        for index in self._flags:
+            cells[index] = cell_code(FLAG)
+        for index in self._shown:
+            cells[index] = cell_code(POKEMON)
+        return cells
+
+    def _load_cells(self, cells):
+        """ Replace the game with cell codes read from a saved game.
+
+        Parameters:
+            cells (bytearray): One code per cell.
+        """
+        self.set_game(BoardStore._decode(cells))
+
+    def _recount(self):
+        """ Count unexposed cells, flags and correct flags from the runs and sets."""
+        exposed = sum(sum(bounds[1::2]) - sum(bounds[::2]) for bounds in self._rows.values())
+        self._num_flags = len(self._flags)
+        self._num_correct_flags = len(self._flags & self._pokemon_locations.get_set()) \
+            if self._flags else 0
+        self._num_unexposed = self._grid_size ** 2 - exposed - self._num_flags - len(self._shown)
+
+    def _neighbours(self, index):
+        """ Get the cells next to a cell, without a table the size of the board.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
 
-    def get_num_attempted_catches(self):
-        """ Get number of attempted catches.
-        
         Returns:
-            (int): Number of attempted catches.
+            (list<int>): Indexes of the neighbouring cells.
         """
-        return self._num_attempted_catches
+        grid_size = self._grid_size
+        row, column = divmod(index, grid_size)
+        columns = range(max(column - 1, 0), min(column + 2, grid_size))
+        return [r * grid_size + c
+                for r in range(max(row - 1, 0), min(row + 2, grid_size))
+                for c in columns if r != row or c != column]
+
+    def _count(self, index):
+        """ Count the Pokemon next to a cell.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
 
-    def get_num_pokemon(self):
-        """ Get number of pokemons.
-        
         Returns:
-            (int): Number of pokemons.
+            (int): Number of neighbouring Pokemon.
         """
-        return self._num_pokemon
+        pokemon = self._pokemon_locations.get_set()
+        grid_size = self._grid_size
+        row, column = divmod(index, grid_size)
+        if 0 < row < grid_size - 1 and 0 < column < grid_size - 1:
+            # Away from the edges every neighbour exists, so test them
+            # directly instead of building the list.
+            above, below = index - grid_size, index + grid_size
+            return ((above - 1 in pokemon) + (above in pokemon) + (above + 1 in pokemon)
+                    + (index - 1 in pokemon) + (index + 1 in pokemon)
+                    + (below - 1 in pokemon) + (below in pokemon) + (below + 1 in pokemon))
+        return sum(1 for i in self._neighbours(index) if i in pokemon)
+
+    def _is_exposed(self, index):
+        """ Returns True if the cell shows a number.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+        """
+        row, column = divmod(index, self._grid_size)
+        bounds = self._rows.get(row)
+        return bounds is not None and bisect.bisect_right(bounds, column) % 2 == 1
+
+    def get_exposed_cells(self):
+        """Get the cells which show a number from the runs, in time that
+        grows with the explored area rather than the board.
+
+        Returns:
+            (iterable<int>): Indexes of the exposed cells, in index order.
+        """
+        grid_size = self._grid_size
+        for row in sorted(self._rows):
+            bounds = self._rows[row]
+            offset = row * grid_size
+            for start, end in zip(bounds[::2], bounds[1::2]):
+                for index in range(offset + start, offset + end):
+                    if index not in self._flags and index not in self._shown:
+                        yield index
+
+    def _is_unexposed(self, index):
+        """ Returns True if the cell is neither exposed, flagged nor a shown Pokemon.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+        """
+        return (index not in self._flags and index not in self._shown
+                and not self._is_exposed(index))
+
+    def _remember_move(self, before, after):
+        """ Add a move to the undo history.
+
+        A move is kept as the runs of the rows it touched, the flags it
+        toggled and the shown Pokemon, before and after. Runs are tuples
+        which are replaced rather than changed, so nothing is copied.
+
+        Parameters:
+            before (tuple<dict, dict, frozenset>): Rows, flags and shown
+                Pokemon from before the move.
+            after (tuple<dict, dict, frozenset>): The same from after it.
+        """
+        if after != before:
+            self._undo.append((before, after))
+            self._redo.clear()
+
+    def _apply_change(self, change, undo):
+        """ Put back the rows, flags and shown Pokemon of a remembered move.
+
+        Parameters:
+            change (tuple<tuple, tuple>): State before and after the move.
+            undo (bool): Use the state from before the move.
+        """
+        rows, flags, shown = change[0] if undo else change[1]
+        for row, bounds in rows.items():
+            if bounds:
+                self._rows[row] = bounds
+            else:
+                self._rows.pop(row, None)
+        for index, flagged in flags.items():
+            if flagged:
+                self._flags.add(index)
+            else:
+                self._flags.discard(index)
+        self._shown = shown
+        self._recount()
+
+    def _expose(self, indexes):
+        """ Expose cells as one move.
+
+        Parameters:
+            indexes (list<int>): Unexposed cells to expose.
+        """
+        if not indexes:
+            return
+        columns = {}
+        for index in indexes:
+            row, column = divmod(index, self._grid_size)
+            columns.setdefault(row, []).append(column)
+        before = {row: self._rows.get(row, ()) for row in columns}
+        for row, row_columns in columns.items():
+            self._rows[row] = merge_runs(before[row], row_columns)
+        self._num_unexposed -= len(indexes)
+        after = {row: self._rows[row] for row in columns}
+        self._remember_move((before, {}, self._shown), (after, {}, self._shown))
+
+    def _flood(self, index, discovered, changed):
+        """ Find the cells opened from a zero cell, see BoardModel._reveal.
+
+        Parameters:
+            index (int): Index of a zero cell.
+            discovered (set<int>): Cells already searched, updated in place.
+            changed (list<int>): Cells to expose, extended in place.
+        """
+        queue = deque([index])
+        while queue:
+            node = queue.popleft()
+            for neighbour in self._neighbours(node):
+                if neighbour in discovered:
+                    continue
+                discovered.add(neighbour)
+                if neighbour in self._flags:
+                    continue
+                if self._is_unexposed(neighbour):
+                    changed.append(neighbour)
+                if self._count(neighbour) == 0:
+                    queue.append(neighbour)
 
     def check_loss(self, index):
-        """ Checks, if the player lost the game. If yes, returns True.
-            Updates the game string with pokemon locations to show to the player.
+        """ Checks, if the player lost the game. If yes, returns True and
+            shows every Pokemon.
 
         Parameters:
             index (int): The index of the cell in the game string.
 
         Returns:
-            (bool): True if player lost.
+            (bool): True if player lost.
+        """
+        if index not in self._pokemon_locations:
+            return False
+        pokemon = self._pokemon_locations.get_set()
+        flagged = self._flags & pokemon
+        before = ({}, dict.fromkeys(flagged, True), self._shown)
+        self._flags -= flagged
+        self._shown = pokemon
+        self._recount()
+        self._remember_move(before, ({}, dict.fromkeys(flagged, False), self._shown))
+        return True
+
+    def flag_cell(self, game, index):
+        """Toggle Flag on or off at selected index. If the selected index is already
+        revealed, the game would return with no changes.
+
+        Parameters:
+            game (str): The game string.
+            index (int): The index in the game string where a flag is placed.
+
+        Returns:
+            (str): The updated game string.
+        """
+        self.set_game(game)
+        self.toggle_flag(index)
+        return self.get_game()
+
+    def toggle_flag(self, index):
+        """Toggle Flag on or off at index, see BoardModel.toggle_flag.
+
+        Parameters:
+            index (int): The index in the game string where a flag is placed.
+
+        Returns:
+            (bool): True if the cell changed.
+        """
+        if index in self._flags:
+            self._flags.discard(index)
+            change = -1
+        elif self._is_unexposed(index):
+            self._flags.add(index)
+            change = 1
+        else:
+            return False
+
+        self._num_flags += change
+        self._num_unexposed -= change
+        if index in self._pokemon_locations:
+            self._num_correct_flags += change
+        self._remember_move(({}, {index: change < 0}, self._shown),
+                            ({}, {index: change > 0}, self._shown))
+        return True
+
+    def cell_at(self, index):
+        """Get the character of one cell from the runs and sets.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+
+        Returns:
+            (str): The cell's game character.
+        """
+        if index in self._flags:
+            return FLAG
+        if index in self._shown:
+            return POKEMON
+        if self._is_exposed(index):
+            return str(self._count(index))
+        return UNEXPOSED
+
+    def number_at_cell(self, game, pokemon_locations, grid_size, index):
+        """Calculates what number should be displayed at that specific index in the game.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (int): Number to be displayed at the given index in the game string.
+        """
+        if game[index] != UNEXPOSED:
+            return int(game[index])
+        return self._count(index)
+
+    def big_fun_search(self, game, grid_size, pokemon_locations, index):
+        """Find all cells which should be revealed when a cell is selected,
+        searching with a set instead of a board-sized bytearray.
+        See BoardModel.big_fun_search.
+
+        Parameters:
+            game (str): Game string.
+            grid_size (int): Size of game.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): List of cells to turn visible.
+        """
+        if game[index] == FLAG or self._count(index) != 0:
+            return [index]
+
+        visible = []
+        discovered = {index}
+        queue = deque([index])
+        while queue:
+            node = queue.popleft()
+            for neighbour in self._neighbours(node):
+                if neighbour in discovered:
+                    continue
+                discovered.add(neighbour)
+                if game[neighbour] != FLAG and self._count(neighbour) == 0:
+                    queue.append(neighbour)
+                visible.append(neighbour)
+        return visible
+
+    def reveal_region(self, index):
+        """Reveals the selected cell and everything big_fun_search would open.
+
+        Parameters:
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (list<int>): Indexes of the cells which were turned visible.
+        """
+        if index in self._flags:
+            return []
+        changed = [index] if self._is_unexposed(index) else []
+        if self._count(index) == 0:
+            self._flood(index, {index}, changed)
+        self._expose(changed)
+        return changed
+
+    def chord(self, index):
+        """Reveals every unflagged neighbour of a satisfied number, merging
+        their cascades into one search. See BoardModel.chord.
+
+        Parameters:
+            index (int): Index of the numbered cell.
+
+        Returns:
+            (bool): True if a neighbour held a Pokemon and the player lost.
+        """
+        if not self._is_exposed(index):
+            return False
+        neighbours = self._neighbours(index)
+        if sum(1 for i in neighbours if i in self._flags) != self._count(index):
+            return False
+        targets = [i for i in neighbours if self._is_unexposed(i)]
+        for i in targets:
+            if i in self._pokemon_locations:
+                return self.check_loss(i)
+
+        changed = []
+        discovered = set()
+        for i in targets:
+            if i not in discovered:
+                discovered.add(i)
+                changed.append(i)
+                if self._count(i) == 0:
+                    self._flood(i, discovered, changed)
+        self._expose(changed)
+        return False
+
+    def reveal_cells(self, game, grid_size, pokemon_locations, index):
+        """Reveals all neighbouring cells at index and repeats for all
+        cells that had a 0.
+
+        Does not reveal flagged cells or cells with Pokemon.
+
+        Parameters:
+            game (str): Game string.
+            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            grid_size (int): Size of game.
+            index (int): Index of the currently selected cell
+
+        Returns:
+            (str): The updated game string
+        """
+        self.set_game(game)
+        self.reveal_region(index)
+        return self.get_game()
+
+
+ENGINES = {
+    "string": BoardModel,
+    "numpy": NumpyBoardModel,
+    "bitboard": BitboardBoardModel,
+    "sparse": SparseBoardModel,
+}
+
+
+def create_board_model(grid_size, num_pokemon, engine="string", seed=None):
+    """ Create a board model using the chosen engine.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        num_pokemon (int): The number of pokemons that the game will have.
+        engine (str): Name of the engine, a key of ENGINES.
+        seed (int|random.Random): Seed or generator of board seeds, or None
+            for a random board.
+
+    Returns:
+        (BoardModel): The new board model.
+
+    Raises:
+        ValueError: If engine is not known.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown board engine {engine!r}, expected one of {sorted(ENGINES)}")
+    return ENGINES[engine].seeded(grid_size, num_pokemon, seed)
+
+
+CHUNK_SIZE = 32
+CHUNK_CACHE_SIZE = 256
+REVEAL_LIMIT = 100000
+# Value of a Pokemon cell in a chunk layout; other cells hold their count.
+_LAYOUT_POKEMON = 9
+
+
+class InfiniteBoardModel:
+    """
+    Unbounded board, split into square chunks which are generated on demand.
+
+    The Pokemon of a chunk are drawn from a generator seeded with the board
+    seed and the chunk's coordinates, so a chunk's layout can always be built
+    again: only an LRU cache of CHUNK_CACHE_SIZE layouts is kept. The cells
+    the player changed are kept for every chunk they touched, until every
+    cell of a chunk but its Pokemon is exposed: such a cleared chunk is only
+    remembered by its coordinates, as its cells follow from its layout. So
+    memory grows with the edge of the explored area rather than all of it.
+    Cells are (row, column) positions, which may be negative; otherwise the
+    methods follow BoardModel.
+    """
+
+    def __init__(self, pokemon_per_chunk, seed=None, chunk_size=CHUNK_SIZE,
+                 cache_size=CHUNK_CACHE_SIZE):
+        """ Create an unexplored board.
+
+        Parameters:
+            pokemon_per_chunk (int): Number of Pokemon in every chunk.
+            seed (int|random.Random): Board seed, see board_seeds.
+            chunk_size (int): Number of cells in a row or column of a chunk.
+            cache_size (int): Number of chunk layouts kept in memory.
+        """
+        self._chunk_size = chunk_size
+        self._pokemon_per_chunk = max(0, min(pokemon_per_chunk, chunk_size ** 2))
+        self._seed = next(board_seeds(seed))
+        self._cache_size = cache_size
+        self._layouts = OrderedDict()
+        self._marks = {}
+        self._cleared = set()
+        self._pending = deque()
+        self._lost = False
+        self._num_exposed = 0
+        self._num_flags = 0
+
+    def get_seed(self):
+        """ Get the seed the chunks are generated from.
+
+        Returns:
+            (int): Board seed.
+        """
+        return self._seed
+
+    def get_num_exposed(self):
+        """ Get the number of exposed cells.
+
+        Returns:
+            (int): Number of exposed cells.
+        """
+        return self._num_exposed
+
+    def get_num_flags(self):
+        """ Get the number of flags placed.
+
+        Returns:
+            (int): Number of flags.
+        """
+        return self._num_flags
+
+    def get_pending(self):
+        """ Get the zero cells whose neighbours a cascade has not searched yet,
+        because reveal_cells stopped at its limit. See continue_reveal.
+
+        Returns:
+            (tuple<tuple<int, int>, ...>): Positions of the exposed zero cells.
         """
-        if index in self._pokemon_locations:
-            for i in self._pokemon_locations:
-                self._game = self.replace_character_at_index(self._game, i, POKEMON)
-            return True
-        else:
-            return False
-
-    def position_to_index(self, position, grid_size):
-        """Convert the row, column coordinate in the grid to the game strings index.
+        return tuple(self._pending)
 
-        Parameters:
-            position (tuple<int, int>): The row, column position of a cell.
-            grid_size (int): The grid size of the game.
+    def get_num_chunks_cached(self):
+        """ Get the number of chunk layouts in the cache.
 
         Returns:
-            (int): The index of the cell in the game string.
+            (int): At most the cache size.
         """
-        index = position[0] * grid_size + position[1]
-        return index
+        return len(self._layouts)
 
-    def index_to_position(self, index, grid_size):
-        """ Converts the game string index to row, column coordinate.
+    def get_num_chunks_touched(self):
+        """ Get the number of chunks holding cells the player changed.
 
-        Parameters:
-            index (int): The index of the cell in the game string.
-            grid_size (int): The grid size of the game.
+        Returns:
+            (int): Number of touched chunks.
+        """
+        return len(self._marks) + len(self._cleared)
+
+    def get_num_chunks_stored(self):
+        """ Get the number of touched chunks whose cells are stored, which
+        are those not cleared yet.
 
         Returns:
-            (tuple<int, int>): The row, column position of a cell.
+            (int): Number of stored chunks.
         """
-        position = index % grid_size , index // grid_size
-        return position
+        return len(self._marks)
 
-    def replace_character_at_index(self, game, index, character):
-        """A specified index in the game string 
-        at the specified index is replaced by a new character.
+    def _chunk_pokemon(self, chunk):
+        """ Generate the Pokemon of a chunk.
 
         Parameters:
-            game (str): The game string.
-            index (int): The index in the game string where the character is replaced.
-            character (str): The new character that will be replacing the old character.
+            chunk (tuple<int, int>): Row and column of the chunk.
 
         Returns:
-            (str): The updated game string.
+            (list<int>): Indexes of the Pokemon within the chunk.
         """
-        game = game[:index] + character + game[index + 1:]
-        return game
+        rng = random.Random(f"{self._seed}:{chunk[0]}:{chunk[1]}")
+        return rng.sample(range(self._chunk_size ** 2), self._pokemon_per_chunk)
 
-    def flag_cell(self, game, index):
-        """Toggle Flag on or off at selected index. If the selected index is already
-        revealed, the game would return with no changes.
+    def _layout(self, chunk):
+        """ Get the layout of a chunk, building it if it is not cached.
+
+        The counts along the edges need the Pokemon of the neighbouring
+        chunks, which are generated again rather than laid out.
 
         Parameters:
-            game (str): The game string.
-            index (int): The index in the game string where a flag is placed.
+            chunk (tuple<int, int>): Row and column of the chunk.
 
         Returns:
-            (str): The updated game string.
+            (bytearray): Neighbour count of every cell, or _LAYOUT_POKEMON.
         """
-        if game[index] == FLAG:
-            self._game = self.replace_character_at_index(game, index, UNEXPOSED)
+        layout = self._layouts.get(chunk)
+        if layout is not None:
+            self._layouts.move_to_end(chunk)
+            return layout
+
+        size = self._chunk_size
+        layout = bytearray(size * size)
+        for chunk_row in (-1, 0, 1):
+            for chunk_column in (-1, 0, 1):
+                pokemon = self._chunk_pokemon((chunk[0] + chunk_row, chunk[1] + chunk_column))
+                for index in pokemon:
+                    row, column = divmod(index, size)
+                    row += chunk_row * size
+                    column += chunk_column * size
+                    if not (-1 <= row <= size and -1 <= column <= size):
+                        continue
+                    for r in range(max(row - 1, 0), min(row + 2, size)):
+                        for c in range(max(column - 1, 0), min(column + 2, size)):
+                            layout[r * size + c] += 1
+        for index in self._chunk_pokemon(chunk):
+            layout[index] = _LAYOUT_POKEMON
+
+        self._layouts[chunk] = layout
+        if len(self._layouts) > self._cache_size:
+            self._layouts.popitem(last=False)
+        return layout
+
+    def _locate(self, position):
+        """ Find the chunk of a cell and the cell's index within it.
 
-        elif game[index] == UNEXPOSED:
-            self._game = self.replace_character_at_index(game, index, FLAG)
+        Parameters:
+            position (tuple<int, int>): Row and column of the cell.
 
-        return game
+        Returns:
+            (tuple<tuple<int, int>, int>): Chunk and index in the chunk.
+        """
+        chunk_row, row = divmod(position[0], self._chunk_size)
+        chunk_column, column = divmod(position[1], self._chunk_size)
+        return (chunk_row, chunk_column), row * self._chunk_size + column
 
-    def index_in_direction(self, index, grid_size, direction):
-        """The index in the game string is updated by determining the
-        adjacent cell given the direction.
-        The index of the adjacent cell in the game is then calculated and returned.
+    def _touch(self, chunk):
+        """ Get the player's cells of a chunk to change them, creating them
+        when first changed and storing them again if it was cleared.
 
-        For example:
-        | 1 | 2 | 3 |
-        A | i | j | k |
-        B | l | m | n |
-        C | o | p | q |
+        Parameters:
+            chunk (tuple<int, int>): Row and column of the chunk.
 
-        The index of m is 4 in the game string.
-        if the direction specified is "up" then:
-        the updated position corresponds with j which has the index of 1 in the game string.
+        Returns:
+            (bytearray): Cell code of every cell in the chunk.
+        """
+        marks = self._marks.get(chunk)
+        if marks is None:
+            if chunk in self._cleared:
+                self._cleared.remove(chunk)
+                marks = self._cleared_marks(chunk)
+            else:
+                marks = bytearray([cell_code(UNEXPOSED)]) * self._chunk_size ** 2
+            self._marks[chunk] = marks
+        return marks
+
+    def _cleared_marks(self, chunk):
+        """ Build the player's cells of a cleared chunk from its layout.
 
         Parameters:
-            index (int): The index in the game string.
-            grid_size (int): The grid size of the game.
-            direction (str): The direction of the adjacent cell.
+            chunk (tuple<int, int>): Row and column of the chunk.
 
         Returns:
-            (int): The index in the game string corresponding to the new cell position
-            in the game.
-
-            None for invalid direction.
+            (bytearray): Cell code of every cell in the chunk.
         """
-        # convert index to row, col coordinate
-        col = index % grid_size
-        row = index // grid_size
-        if RIGHT in direction:
-            col += 1
-        elif LEFT in direction:
-            col -= 1
-        
-        if UP in direction:
-            row -= 1
-        elif DOWN in direction:
-            row += 1
-
-        if not (0 <= col < grid_size and 0 <= row < grid_size):
-            return None
+        unexposed = cell_code(UNEXPOSED)
+        exposed = cell_code(EXPOSED)
+        return bytearray(unexposed if count == _LAYOUT_POKEMON else exposed + count
+                         for count in self._layout(chunk))
 
-        return self.position_to_index((row, col), grid_size)
+    def _settle(self, chunks):
+        """ Stop storing the cells of chunks with no flags whose cells follow
+        from their layout: those cleared, with nothing unexposed but their
+        Pokemon, and those left with every cell unexposed.
 
-    def neighbour_directions(self, index, grid_size):
-        """Seek out all direction that has a neighbouring cell.
+        Parameters:
+            chunks (iterable<tuple<int, int>>): Chunks whose cells changed.
+        """
+        for chunk in chunks:
+            marks = self._marks.get(chunk)
+            if marks is None or cell_code(FLAG) in marks:
+                continue
+            unexposed = marks.count(cell_code(UNEXPOSED))
+            if unexposed == self._pokemon_per_chunk:
+                del self._marks[chunk]
+                self._cleared.add(chunk)
+            elif unexposed == len(marks):
+                del self._marks[chunk]
+
+    def character_at(self, position):
+        """ Get the character shown at a cell.
 
         Parameters:
-            index (int): The index in the game string.
-            grid_size (int): The grid size of the game.
+            position (tuple<int, int>): Row and column of the cell.
 
         Returns:
-            (list<int>): A list of index that has a neighbouring cell.
+            (str): Game character.
         """
-        neighbours = []
-        for direction in DIRECTIONS:
-            neighbour = self.index_in_direction(index, grid_size, direction)
-            if neighbour is not None:
-                neighbours.append(neighbour)
-
-        return neighbours
+        return self.get_window(position[0], position[1], 1, 1)
 
-    def number_at_cell(self, game, pokemon_locations, grid_size, index):
-        """Calculates what number should be displayed at that specific index in the game.
+    def number_at_cell(self, position):
+        """ Count the Pokemon next to a cell.
 
         Parameters:
-            game (str): Game string.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
-            grid_size (int): Size of game.
-            index (int): Index of the currently selected cell
+            position (tuple<int, int>): Row and column of the cell.
 
         Returns:
-            (int): Number to be displayed at the given index in the game string.
+            (int): Number of neighbouring Pokemon.
         """
-        if game[index] != UNEXPOSED:
-            return int(game[index])
+        chunk, index = self._locate(position)
+        count = self._layout(chunk)[index]
+        if count != _LAYOUT_POKEMON:
+            return count
+        row, column = position
+        count = 0
+        for r in (row - 1, row, row + 1):
+            for c in (column - 1, column, column + 1):
+                neighbour_chunk, neighbour = self._locate((r, c))
+                if (r, c) != position and self._layout(neighbour_chunk)[neighbour] == _LAYOUT_POKEMON:
+                    count += 1
+        return count
+
+    def check_loss(self, position):
+        """ Checks, if the player lost the game. If yes, returns True and
+            every Pokemon is shown from then on.
 
-        number = 0
-        for neighbour in self.neighbour_directions(index, grid_size):
-            if neighbour in pokemon_locations:
-                number += 1
+        Parameters:
+            position (tuple<int, int>): Row and column of the cell.
 
-        return number
+        Returns:
+            (bool): True if player lost.
+        """
+        chunk, index = self._locate(position)
+        if self._layout(chunk)[index] == _LAYOUT_POKEMON:
+            self._lost = True
+        return self._lost
 
-    def check_win(self, game, pokemon_locations):
-        """Checking if the player has won the game.
+    def flag_cell(self, position):
+        """ Toggle Flag on or off at a cell. Exposed cells are left as they are.
 
         Parameters:
-            game (str): Game string.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+            position (tuple<int, int>): Row and column of the cell.
 
         Returns:
-            (bool): True if the player has won the game, false if not.
+            (str): The character now at the cell.
         """
-        return UNEXPOSED not in self._game and self._game.count(FLAG) == len(pokemon_locations)
+        chunk, index = self._locate(position)
+        marks = self._touch(chunk)
+        if marks[index] == cell_code(FLAG):
+            marks[index] = cell_code(UNEXPOSED)
+            self._num_flags -= 1
+        elif marks[index] == cell_code(UNEXPOSED):
+            marks[index] = cell_code(FLAG)
+            self._num_flags += 1
+        character = _CHARACTERS[marks[index]]
+        self._settle([chunk])
+        return character
 
-    def reveal_cells(self, game, grid_size, pokemon_locations, index):
-        """Reveals all neighbouring cells at index and repeats for all
-        cells that had a 0.
+    def reveal_cells(self, position, limit=REVEAL_LIMIT):
+        """ Reveal a cell and, from zero cells, the cascade around it.
 
-        Does not reveal flagged cells or cells with Pokemon.
+        The cascade crosses chunk boundaries, generating chunks as it goes.
+        On sparse boards a zero region can be unbounded, so it stops once
+        limit cells are revealed, keeping the cells it would have searched
+        from next: see get_pending and continue_reveal. Pokemon cells are
+        left alone, see check_loss.
 
         Parameters:
-            game (str): Game string.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
-            grid_size (int): Size of game.
-            index (int): Index of the currently selected cell
+            position (tuple<int, int>): Row and column of the cell.
+            limit (int): Most cells to reveal.
 
         Returns:
-            (str): The updated game string
+            (list<tuple<int, int>>): Positions of the cells turned visible.
         """
-        number = self.number_at_cell(game, pokemon_locations, grid_size, index)
-        game = self.replace_character_at_index(game, index, str(number))
-        clear = self.big_fun_search(game, grid_size, pokemon_locations, index)
-        for i in clear:
-            if game[i] != FLAG:
-                number = self.number_at_cell(game, pokemon_locations, grid_size, i)
-                game = self.replace_character_at_index(game, i, str(number))
+        unexposed = cell_code(UNEXPOSED)
+        exposed = cell_code(EXPOSED)
+        changed = []
+
+        chunk, index = self._locate(position)
+        count = self._layout(chunk)[index]
+        # Every cell of a cleared chunk but its Pokemon is exposed already.
+        if count == _LAYOUT_POKEMON or chunk in self._cleared:
+            return changed
+        marks = self._touch(chunk)
+        if marks[index] == cell_code(FLAG):
+            return changed
+        if marks[index] == unexposed:
+            marks[index] = exposed + count
+            changed.append(position)
+        self._num_exposed += len(changed)
+        if count != 0:
+            self._settle([chunk])
+            return changed
+        return changed + self._cascade(deque([position]), limit - len(changed), {chunk})
+
+    def continue_reveal(self, limit=REVEAL_LIMIT):
+        """ Carry on with the cascades which reveal_cells left pending.
 
-        return game
+        Parameters:
+            limit (int): Most cells to reveal.
 
-    def big_fun_search(self, game, grid_size, pokemon_locations, index):
-        """Searching adjacent cells to see if there are any Pokemon"s present.
+        Returns:
+            (list<tuple<int, int>>): Positions of the cells turned visible.
+        """
+        queue, self._pending = self._pending, deque()
+        return self._cascade(queue, limit)
 
-        Using some sick algorithms.
+    def _cascade(self, queue, limit, touched=()):
+        """ Reveal the neighbours of exposed zero cells, and theirs in turn.
 
-        Find all cells which should be revealed when a cell is selected.
+        Cells still queued when limit cells have been revealed are added to
+        the pending cells.
 
-        For cells which have a zero value (i.e. no neighbouring pokemons) all the cell"s
-        neighbours are revealed. If one of the neighbouring cells is also zero then
-        all of that cell"s neighbours are also revealed. This repeats until no
-        zero value neighbours exist.
+        Parameters:
+            queue (deque<tuple<int, int>>): Exposed zero cells to search from.
+            limit (int): Most cells to reveal.
+            touched (set<tuple<int, int>>): Chunks already changed by the
+                caller, to settle with the cascade's.
 
-        For cells which have a non-zero value (i.e. cells with neighbour pokemons), only
-        the cell itself is revealed.
+        Returns:
+            (list<tuple<int, int>>): Positions of the cells turned visible.
+        """
+        unexposed = cell_code(UNEXPOSED)
+        exposed = cell_code(EXPOSED)
+        touched = set(touched)
+        cleared = self._cleared
+        changed = []
+        while queue and len(changed) < limit:
+            row, column = queue.popleft()
+            for r in (row - 1, row, row + 1):
+                for c in (column - 1, column, column + 1):
+                    chunk, index = self._locate((r, c))
+                    # Cells next to a zero are not Pokemon, so in a cleared
+                    # chunk they are exposed already.
+                    if chunk in cleared:
+                        continue
+                    marks = self._touch(chunk)
+                    if marks[index] != unexposed:
+                        continue
+                    count = self._layout(chunk)[index]
+                    marks[index] = exposed + count
+                    touched.add(chunk)
+                    changed.append((r, c))
+                    if count == 0:
+                        queue.append((r, c))
+        self._pending.extend(queue)
+        self._num_exposed += len(changed)
+        self._settle(touched)
+        return changed
+
+    def get_window(self, top, left, rows, columns):
+        """ Get the game string of a window of the board, for rendering.
+
+        Only the chunks under the window are looked at, and their layouts are
+        only needed once the game is lost and the Pokemon are shown.
 
         Parameters:
-            game (str): Game string.
-            grid_size (int): Size of game.
-            pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
-            index (int): Index of the currently selected cell
+            top (int): Row of the first cell.
+            left (int): Column of the first cell.
+            rows (int): Number of rows.
+            columns (int): Number of columns.
 
         Returns:
-            (list<int>): List of cells to turn visible.
+            (str): Game string of rows * columns cells.
         """
-        queue = [index]
-        discovered = [index]
-        visible = []
+        size = self._chunk_size
+        codes = bytearray()
+        for row in range(top, top + rows):
+            column = left
+            while column < left + columns:
+                chunk, index = self._locate((row, column))
+                span = min(size - index % size, left + columns - column)
+                marks = self._marks.get(chunk)
+                if marks is not None:
+                    segment = marks[index:index + span]
+                elif chunk in self._cleared:
+                    segment = self._cleared_marks(chunk)[index:index + span]
+                else:
+                    segment = bytearray([cell_code(UNEXPOSED)]) * span
+                if self._lost:
+                    layout = self._layout(chunk)
+                    for i in range(span):
+                        if layout[index + i] == _LAYOUT_POKEMON:
+                            segment[i] = cell_code(POKEMON)
+                codes += segment
+                column += span
+        return BoardStore._decode(codes)
+
+
+JOURNAL_BOARD = "B"
+JOURNAL_MOVE = "M"
+JOURNAL_FLAG = "F"
+JOURNAL_CHORD = "C"
+JOURNAL_UNDO = "U"
+JOURNAL_REDO = "R"
+
+
+class Journal:
+    """Append-only record of the games played and the moves made in them.
+
+    Each line is an operation and its argument: JOURNAL_BOARD and the ID of
+    the board a game starts on, then JOURNAL_MOVE, JOURNAL_FLAG or
+    JOURNAL_CHORD and the index of each cell the player played, or
+    JOURNAL_UNDO or JOURNAL_REDO on their own. Replaying the moves on a
+    board generated from the ID gives back the same game.
+    """
 
-        if game[index] == FLAG:
-            return queue
+    def __init__(self, file):
+        """Create a journal writing to an open text file.
 
-        number = self.number_at_cell(game, pokemon_locations, grid_size, index)
-        if number != 0:
-            return queue
+        Parameters:
+            file (file): Text stream, normally opened for appending.
+        """
+        self._file = file
 
-        while queue:
-            node = queue.pop()
-            for neighbour in self.neighbour_directions(node, grid_size):
-                if neighbour in discovered:
-                    continue
+    def start_game(self, board_id):
+        """Records the start of a game.
 
-                discovered.append(neighbour)
-                if game[neighbour] != FLAG:
-                    number = self.number_at_cell(game, pokemon_locations, grid_size, neighbour)
-                    if number == 0:
-                        queue.append(neighbour)
-                visible.append(neighbour)
-        return visible
+        Parameters:
+            board_id (str): ID of the board, see make_board_id.
+        """
+        self._file.write(f"{JOURNAL_BOARD} {board_id}\n")
 
-    def generate_pokemons(self, grid_size, number_of_pokemons):
-        """Pokemons will be generated and given a random index within the game.
+    def record(self, op, index=None):
+        """Records a move.
 
         Parameters:
-            grid_size (int): The grid size of the game.
-            number_of_pokemons (int): The number of pokemons that the game will have.
-
-        Returns:
-            (tuple<int>): A tuple containing  indexes where the pokemons are
-            created for the game string.
+            op (str): JOURNAL_MOVE, JOURNAL_FLAG, JOURNAL_CHORD, JOURNAL_UNDO
+                or JOURNAL_REDO.
+            index (int): Index of the cell, except for undo and redo.
         """
-        cell_count = grid_size ** 2
-        pokemon_locations = ()
-
-        for _ in range(number_of_pokemons):
-            if len(pokemon_locations) >= cell_count:
-                break
-            index = random.randint(0, cell_count-1)
+        self._file.write(f"{op}\n" if index is None else f"{op} {index}\n")
 
-            while index in pokemon_locations:
-                index = random.randint(0, cell_count-1)
+    def flush(self):
+        """Writes any buffered records to the file."""
+        self._file.flush()
 
-            pokemon_locations += (index,)
 
-        return pokemon_locations
+def read_journal(lines):
+    """ Split a journal into its games.
 
-    def character_at_index(self, game, index):
-        """ Returns character at the specified game string index.
+    Parameters:
+        lines (iterable<str>): Lines of a journal, e.g. an open file.
 
-        Parameters:
-            game (str): Game string.
-            index (int): Index of the currently selected cell
+    Yields:
+        (tuple<str, list<tuple<str, int>>>): The board ID of each game and
+            its moves as (op, index) pairs; the index of an undo or redo is None.
 
-        Returns:
-            (string): Character at game string index.
-        """
-        character = game[index]
-        return character
+    Raises:
+        ValueError: If a line is not a journal record.
+    """
+    board_id = None
+    moves = []
+    for number, line in enumerate(lines, 1):
+        op, _, argument = line.rstrip("\r\n").partition(" ")
+        if op == JOURNAL_BOARD:
+            if board_id is not None:
+                yield board_id, moves
+            board_id = argument
+            moves = []
+        elif op in (JOURNAL_MOVE, JOURNAL_FLAG, JOURNAL_CHORD) and board_id is not None and argument.isdigit():
+            moves.append((op, int(argument)))
+        elif op in (JOURNAL_UNDO, JOURNAL_REDO) and board_id is not None and not argument:
+            moves.append((op, None))
+        elif op or argument:
+            raise ValueError(f"line {number} is not a journal record: {line!r}")
+    if board_id is not None:
+        yield board_id, moves
+
+
+def replay_game(board, moves):
+    """ Apply journal moves to a fresh board, as PokemonGame would.
+
+    Wins are judged by BoardModel.has_won, so a game from a1.py won with
+    extra flags on empty cells replays to the same cells but as "playing".
+
+    Parameters:
+        board (BoardModel): Board generated from the game's board ID.
+        moves (iterable<tuple<str, int>>): Moves read from a journal.
+
+    Returns:
+        (str): "won", "lost", or "playing" if the game was not finished.
+    """
+    for op, index in moves:
+        if op == JOURNAL_UNDO:
+            board.undo()
+        elif op == JOURNAL_REDO:
+            board.redo()
+        elif op == JOURNAL_FLAG:
+            board.toggle_flag(index)
+        elif op == JOURNAL_CHORD:
+            if board.chord(index):
+                return "lost"
+        elif board.check_loss(index):
+            return "lost"
+        else:
+            board.reveal_region(index)
+        if board.has_won():
+            return "won"
+    return "playing"
 
 
 class PokemonGame:
@@ -369,9 +3528,11 @@ class PokemonGame:
 
         self._board = BoardModel(self._grid_size, self._num_pokemon)
         self._pok_locations = self._board.get_pokemon_locations()
+        self._journal = None
 
         # Top panel is static, no need to draw it more than once
-        self._top_panel = TopPanel(self._master)
+        _, top_panel = _widgets()
+        self._top_panel = top_panel(self._master)
         self._top_panel.pack()
 
         if self._task == 2:
@@ -379,6 +3540,36 @@ class PokemonGame:
 
         self.draw()
 
+    def set_journal(self, journal):
+        """Record the current game and every move from now on in a journal.
+
+        Parameters:
+            journal (Journal): Journal to write to.
+        """
+        self._journal = journal
+        journal.start_game(self._board.get_board_id())
+
+    def _replayable(self, board):
+        """Returns True if a journal can replay the board from the start:
+        it has a board ID and no cell has been played yet.
+
+        Parameters:
+            board (BoardModel): Board to journal.
+        """
+        return (board.get_board_id() is not None
+                and board.get_num_unexposed() == board.get_grid_size() ** 2)
+
+    def _record(self, op, index=None):
+        """Record a move in the journal, if there is one.
+
+        Parameters:
+            op (str): JOURNAL_MOVE, JOURNAL_FLAG, JOURNAL_CHORD, JOURNAL_UNDO
+                or JOURNAL_REDO.
+            index (int): Index of the cell, except for undo and redo.
+        """
+        if self._journal is not None:
+            self._journal.record(op, index)
+
     def redraw(self):
         """Redraw the board view."""
         self._board_view.destroy()
@@ -386,21 +3577,94 @@ class PokemonGame:
 
     def draw(self):
         """Draw the board view."""
-        self._board_view = BoardView(self._master, self._grid_size, self._board, self.move_to, self.flag_cell)
+        board_view, _ = _widgets()
+        self._board_view = board_view(self._master, self._grid_size, self._board, self.move_to, self.flag_cell)
+        self._board_view.set_chord(self.chord)
         self._board_view.pack()
 
     def draw_menubar(self):
         """Define and add menubar to the master widget."""
+        import tkinter as tk
+
         self._menubar = tk.Menu(self._master)
         self._filemenu = tk.Menu(self._menubar, tearoff=0)
-        self._filemenu.add_command(label="Open", command="")
-        self._filemenu.add_command(label="Save", command="")
+        self._filemenu.add_command(label="Open", command=self.open_game)
+        self._filemenu.add_command(label="Save", command=self.save_game)
         self._filemenu.add_separator()
         self._filemenu.add_command(label="Exit", command=self._master.quit)
         self._menubar.add_cascade(label="File", menu=self._filemenu)
+        self._editmenu = tk.Menu(self._menubar, tearoff=0)
+        self._editmenu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        self._editmenu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        self._menubar.add_cascade(label="Edit", menu=self._editmenu)
+        self._master.bind("<Control-z>", self.undo)
+        self._master.bind("<Control-y>", self.redo)
 
         self._master.config(menu=self._menubar)
 
+    def undo(self, e=None):
+        """Take back the last move, even one that lost the game.
+
+        Parameters:
+            e (tkinter.Event): Key event, if called from a shortcut.
+        """
+        if self._board.undo():
+            self._record(JOURNAL_UNDO)
+            self.redraw()
+
+    def redo(self, e=None):
+        """Make the last undone move again.
+
+        Parameters:
+            e (tkinter.Event): Key event, if called from a shortcut.
+        """
+        if self._board.redo():
+            self._record(JOURNAL_REDO)
+            self.redraw()
+
+    def open_game(self):
+        """Ask for a saved game and continue playing it."""
+        from tkinter import filedialog, messagebox
+
+        filename = filedialog.askopenfilename(
+            filetypes=[("Pokemon games", "*" + SAVE_EXTENSION)])
+        if not filename:
+            return
+        try:
+            board = type(self._board).load(filename)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Open", f"Could not open {filename}:\n{error}")
+            return
+
+        self._board = board
+        self._grid_size = board.get_grid_size()
+        self._num_pokemon = board.get_num_pokemon()
+        self._pok_locations = board.get_pokemon_locations()
+        if self._journal is not None:
+            if self._replayable(board):
+                self._journal.start_game(board.get_board_id())
+            else:
+                # A journal is replayed on a fresh board made from its ID, so
+                # it cannot follow a board without one or with moves made.
+                self._journal = None
+                messagebox.showwarning("Journal", f"{filename} cannot be replayed from a "
+                                                  "journal, so journaling has stopped.")
+        self.redraw()
+
+    def save_game(self):
+        """Ask for a file name and save the game to it."""
+        from tkinter import filedialog, messagebox
+
+        filename = filedialog.asksaveasfilename(
+            defaultextension=SAVE_EXTENSION,
+            filetypes=[("Pokemon games", "*" + SAVE_EXTENSION)])
+        if not filename:
+            return
+        try:
+            self._board.save(filename)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Save", f"Could not save {filename}:\n{error}")
+
     def move_to(self, e):
         """Discover what is in the unexposed cell.
         If there are no pokemon, reveal nearby cells.
@@ -409,31 +3673,30 @@ class PokemonGame:
         Parameters:
             e (tkinter.Event): Event class generated by mouse click. Contains pixel coordinates on the canvas.
         """
-        print(type(e))
+        from tkinter import messagebox
+
         position = self._board_view.pixel_to_position(e)
         # messagebox.showinfo("Mouse 1", "LMB pressed, x = " + str(e.x) + ", y = " + str(e.y))
 
         index = self._board.position_to_index(position, self._grid_size)
-        game = self._board.get_game()
+        character = self._board.cell_at(index)
+        if character == UNEXPOSED:
+            self._record(JOURNAL_MOVE, index)
         
         #update game string based on player movement
-        if game[index] == FLAG or game[index] != UNEXPOSED:
+        if character == FLAG or character != UNEXPOSED:
             None
         # check, if there is a pokemon at the selected square and player lost
         elif self._board.check_loss(index):
             messagebox.showwarning("GG", "GAME OVER")
             self.redraw()
             self._board_view.unbind_mouse()
-            game = self._board.get_game()
-            print(game)
         else:
-            game = self._board.reveal_cells(game, self._grid_size, self._pok_locations, index)
-            self._board.set_game(game)
-            print(game)
+            self._board.reveal_region(index)
             self.redraw()
 
         # check for win
-        if self._board.check_win(game, self._pok_locations):
+        if self._board.has_won():
             messagebox.showinfo("GG", "YOU WIN!")
             self._board_view.unbind_mouse()
 
@@ -445,149 +3708,241 @@ class PokemonGame:
         Parameters:
             e (tkinter.Event): Event class generated by mouse click. Contains pixel coordinates on the canvas.
         """
+        from tkinter import messagebox
+
         position = self._board_view.pixel_to_position(e)
-        game = self._board.get_game()
         index = self._board.position_to_index(position, self._grid_size)
 
-        if game[index] == UNEXPOSED or game[index] == FLAG:
+        if self._board.cell_at(index) in (UNEXPOSED, FLAG):
             # flag cell in model
-            self._board.flag_cell(game, index)
-
-            print(game)
+            self._record(JOURNAL_FLAG, index)
+            self._board.toggle_flag(index)
             self.redraw()
 
         # check for win
-        if self._board.check_win(game, self._pok_locations):
+        if self._board.has_won():
             messagebox.showinfo("GG", "YOU WIN!")
             self._board_view.unbind_mouse()
 
-
-class BoardView(tk.Canvas):
-    """View of the pokemon game board"""
-
-    def __init__(self, master, grid_size, board, move_to, flag_cell, board_width = 600, *args, **kwargs):
-        """Construct a board view based on board_width and grid_size.
+    def chord(self, e):
+        """Reveal the unflagged neighbours of a number whose Pokemon are
+        all flagged, redrawing the board once.
 
         Parameters:
-            master (tk.Widget): Widget within which the board is placed.
-            grid_size (int): Sum of squares in one row or column.
-            board (BoardModel): Board model of the Pokemon game.
-            move_to (callable): Callable to call when player moves to an unexposed cell.
-            flag_cell (callable): Callable to call when player flags an unexposed cell.
-            board_width (int): Board width in pixels.
+            e (tkinter.Event): Event class generated by mouse click. Contains pixel coordinates on the canvas.
         """
-        super().__init__(master, width = board_width-100, height = board_width-100, *args, **kwargs)
-        self._master = master
-
-        self._grid_size = grid_size
-        self._board_width = board_width
-        self._board = board
-
-        # functions from the PokemonGame class to be called by clicks
-        self.move_to = move_to
-        self.flag_cell = flag_cell
-
-        # square width based on board width
-        self._square_width = self._board_width / 12
-
-        self.bind_mouse()
+        from tkinter import messagebox
 
-        self.draw_board(self._square_width, self._board)
-
-    def bind_mouse(self):
-        """Bind left (b1) and right (b2, b3) mouse button."""
-        self._b1 = self.bind("<Button-1>", self._handle_left_click)
-        self._b2 = self.bind("<Button-2>", self._handle_right_click)
-        self._b3 = self.bind("<Button-3>", self._handle_right_click)
-
-    def unbind_mouse(self):
-        """Unbind the mouse buttons."""
-        self.unbind("<Button-1>", self._b1)
-        self.unbind("<Button-2>", self._b2)
-        self.unbind("<Button-3>", self._b3)
+        position = self._board_view.pixel_to_position(e)
+        index = self._board.position_to_index(position, self._grid_size)
+        num_unexposed = self._board.get_num_unexposed()
+        lost = self._board.chord(index)
+        # Only a chord which changed the board is a move.
+        if not lost and self._board.get_num_unexposed() == num_unexposed:
+            return
+        self._record(JOURNAL_CHORD, index)
+
+        if lost:
+            messagebox.showwarning("GG", "GAME OVER")
+            self.redraw()
+            self._board_view.unbind_mouse()
+            return
+        self.redraw()
 
-    def _handle_left_click(self, e):
-        """Called when left mouse button is clicked."""
-        self.move_to(e)
+        # check for win
+        if self._board.has_won():
+            messagebox.showinfo("GG", "YOU WIN!")
+            self._board_view.unbind_mouse()
 
-    def _handle_right_click(self, e):
-        """Called when right mouse button is clicked."""
-        self.flag_cell(e)
 
-    def get_square_width(self):
-        """Returns the square width.
+@functools.lru_cache(maxsize=None)
+def _widgets():
+    """ Import tkinter and define the window's widgets, the first time the
+    window is drawn. Only the window needs Tk, so the board models and
+    journals import without it.
 
-        Returns:
-            (int): Square width.
-        """
-        return self._square_width
+    Returns:
+        (tuple<type, type>): The BoardView and TopPanel classes.
+    """
+    import tkinter as tk
+
+    class BoardView(tk.Canvas):
+        """View of the pokemon game board"""
+
+        def __init__(self, master, grid_size, board, move_to, flag_cell, board_width = 600, *args, **kwargs):
+            """Construct a board view based on board_width and grid_size.
+
+            Parameters:
+                master (tk.Widget): Widget within which the board is placed.
+                grid_size (int): Sum of squares in one row or column.
+                board (BoardModel): Board model of the Pokemon game.
+                move_to (callable): Callable to call when player moves to an unexposed cell.
+                flag_cell (callable): Callable to call when player flags an unexposed cell.
+                board_width (int): Board width in pixels.
+            """
+            super().__init__(master, width = board_width-100, height = board_width-100, *args, **kwargs)
+            self._master = master
+
+            self._grid_size = grid_size
+            self._board_width = board_width
+            self._board = board
+
+            # functions from the PokemonGame class to be called by clicks
+            self.move_to = move_to
+            self.flag_cell = flag_cell
+            self.chord = None
+
+            # square width based on board width
+            self._square_width = self._board_width / 12
+
+            self.bind_mouse()
+
+            self.draw_board(self._square_width, self._board)
+
+        def bind_mouse(self):
+            """Bind left (b1) and right (b2, b3) mouse button."""
+            self._b1 = self.bind("<Button-1>", self._handle_left_click)
+            self._b2 = self.bind("<Button-2>", self._handle_right_click)
+            self._b3 = self.bind("<Button-3>", self._handle_right_click)
+
+        def set_chord(self, chord):
+            """Call chord on a double click of the left mouse button.
+
+            Parameters:
+                chord (callable): Called with the click event.
+            """
+            self.chord = chord
+            self._double = self.bind("<Double-Button-1>", self._handle_double_click)
+
+        def unbind_mouse(self):
+            """Unbind the mouse buttons."""
+            self.unbind("<Button-1>", self._b1)
+            self.unbind("<Button-2>", self._b2)
+            self.unbind("<Button-3>", self._b3)
+            if self.chord is not None:
+                self.unbind("<Double-Button-1>", self._double)
+
+        def _handle_left_click(self, e):
+            """Called when left mouse button is clicked."""
+            self.move_to(e)
+
+        def _handle_right_click(self, e):
+            """Called when right mouse button is clicked."""
+            self.flag_cell(e)
+
+        def _handle_double_click(self, e):
+            """Called when left mouse button is double clicked."""
+            self.chord(e)
+
+        def get_square_width(self):
+            """Returns the square width.
+
+            Returns:
+                (int): Square width.
+            """
+            return self._square_width
+
+        def draw_board(self, square_width, board):
+            """Create squares on the canvas based on the current game.
+            Dynamic square width based on board width.
+
+            Parameters:
+                square_width (int): Width of a square.
+                board (BoardModel): Board model of the Pokemon game.
+            """
+            index = 0
+
+            for row in range(self._grid_size):
+                y0 = square_width * row
+                y1 = square_width * (row + 1)
+
+                for column in range(self._grid_size):
+                    x0 = square_width * column
+                    x1 = square_width * (column + 1)
+
+                    character = board.cell_at(index)
+                    if character == UNEXPOSED:
+                        self.create_rectangle(x0, y0, x1, y1, fill="dark green")
+                    elif character == FLAG:
+                        self.create_rectangle(x0, y0, x1, y1, fill="red")
+                    elif character == POKEMON:
+                        self.create_rectangle(x0, y0, x1, y1, fill="yellow")
+                        self.create_text((x0 + 25, y0 + 25), text=character)
+                    else:
+                        self.create_rectangle(x0, y0, x1, y1, fill="light green")
+                        self.create_text((x0 + 25, y0 + 25), text=character)
+
+                    index += 1
+
+        def pixel_to_position(self, pixel):
+            """ Convers pixel coordinates to row, col position. 
+        
+            Parameters:
+                pixel(tkinter.Event): Event class generated by mouse click. Contains pixel coordinates on the canvas.
+        
+            Returns:
+                (tuple<int, int>): The row, column position of a cell.
+            """
+            position = int(pixel.y // self._square_width), int(pixel.x // self._square_width)
+            return position
 
-    def draw_board(self, square_width, board):
-        """Create squares on the canvas based on the current game.
-        Dynamic square width based on board width.
+    class TopPanel(tk.Frame):
+        """Top panel in the game window with the game name as a heading."""
+        def __init__(self, master):
+            """Crate new top panel"""
+            super().__init__(master)
 
-        Parameters:
-            square_width (int): Width of a square.
-            board (BoardModel): Board model of the Pokemon game.
-        """
-        game = board.get_game()
-        index = 0
+            self.draw()
 
-        for row in range(self._grid_size):
-            y0 = square_width * row
-            y1 = square_width * (row + 1)
+        def draw(self):
+            """Draw label with the game name."""
+            tk.Label(text="Pokemon: Got 2 Find Them All!", bg = "IndianRed2", fg = "white", font=("Courier", 22, "bold")).pack()
 
-            for column in range(self._grid_size):
-                x0 = square_width * column
-                x1 = square_width * (column + 1)
+    globals().update(BoardView=BoardView, TopPanel=TopPanel)
+    return BoardView, TopPanel
 
-                if game[index] == UNEXPOSED:
-                    self.create_rectangle(x0, y0, x1, y1, fill="dark green")
-                elif game[index] == FLAG:
-                    self.create_rectangle(x0, y0, x1, y1, fill="red")
-                elif game[index] == POKEMON:
-                    self.create_rectangle(x0, y0, x1, y1, fill="yellow")
-                    character = board.character_at_index(game, index)
-                    self.create_text((x0 + 25, y0 + 25), text=character)
-                else:
-                    self.create_rectangle(x0, y0, x1, y1, fill="light green")
-                    character = board.character_at_index(game, index)
-                    self.create_text((x0 + 25, y0 + 25), text=character)
 
-                index += 1
+def __getattr__(name):
+    """ Define the window's widgets when a3.BoardView or a3.TopPanel is first used.
 
-    def pixel_to_position(self, pixel):
-        """ Convers pixel coordinates to row, col position. 
-        
-        Parameters:
-            pixel(tkinter.Event): Event class generated by mouse click. Contains pixel coordinates on the canvas.
-        
-        Returns:
-            (tuple<int, int>): The row, column position of a cell.
-        """
-        position = int(pixel.y // self._square_width), int(pixel.x // self._square_width)
-        return position
+    Raises:
+        AttributeError: If name is not a widget of the window.
+    """
+    if name in ("BoardView", "TopPanel"):
+        _widgets()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-class TopPanel(tk.Frame):
-    """Top panel in the game window with the game name as a heading."""
-    def __init__(self, master):
-        """Crate new top panel"""
-        super().__init__(master)
 
-        self.draw()
+def main():
+    """ Start the game in a new window.
 
-    def draw(self):
-        """Draw label with the game name."""
-        tk.Label(text="Pokemon: Got 2 Find Them All!", bg = "IndianRed2", fg = "white", font=("Courier", 22, "bold")).pack()
+    With --journal FILE on the command line the games and moves are
+    appended to FILE, see Journal.
+    """
+    parser = argparse.ArgumentParser(description="Pokemon: Got 2 Find Them All!")
+    parser.add_argument("--journal", metavar="FILE", help="append the games and moves to FILE")
+    args = parser.parse_args()
+    try:
+        import tkinter as tk
+    except ImportError:
+        raise ImportError("the game window needs tkinter installed") from None
 
-def main():
     root = tk.Tk()
     root.title("Pokemon: Got 2 Find Them All!")
 
-    PokemonGame(root)
-
-    root.update()
-    root.mainloop()
+    game = PokemonGame(root)
+    journal_file = None
+    if args.journal is not None:
+        journal_file = open(args.journal, "a", encoding="ascii", buffering=1)
+        game.set_journal(Journal(journal_file))
+
+    try:
+        root.update()
+        root.mainloop()
+    finally:
+        if journal_file is not None:
+            journal_file.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+"""
+Benchmarks for the Pokemon board model in a3.py.
+
+Usage:
+    python benchmarks.py [name ...]
+
+With no names every benchmark is run.
+"""
+
+import os
+import random
+import sys
+import time
+
+import a3
+import generator
+import metrics
+import probability
+import selfplay
+import solver
+
+
+def _timed(function, *args):
+    """ Call function and measure how long it took.
+
+    Returns:
+        (tuple<object, float>): The result and the elapsed seconds.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _engines():
+    """ Names of the board engines which can run here. """
+    names = []
+    for name in a3.ENGINES:
+        try:
+            a3.create_board_model(1, 0, name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def bench_reveal(grid_size=1000, densities=(0.001, 0.01, 0.05), clicks=20, seed=0):
+    """ Time reveal_region on large, sparse boards with every engine.
+
+    Clicks are made on random unexposed cells which are not Pokemon, on the
+    same seeded board for every engine, so the first clicks open large regions.
+    """
+    for engine, density in ((engine, density) for density in densities
+                            for engine in _engines()):
+        rng = random.Random(seed + 1)
+        num_pokemon = int(grid_size ** 2 * density)
+        try:
+            board, setup = _timed(a3.create_board_model, grid_size, num_pokemon, engine, seed)
+        except ValueError:
+            continue  # grid too large for this engine
+        pokemon = set(board.get_pokemon_locations())
+
+        revealed = 0
+        elapsed = 0.0
+        largest = 0
+        for _ in range(clicks):
+            index = rng.randrange(grid_size ** 2)
+            if index in pokemon or board.get_game()[index] != a3.UNEXPOSED:
+                continue
+            changed, seconds = _timed(board.reveal_region, index)
+            revealed += len(changed)
+            largest = max(largest, len(changed))
+            elapsed += seconds
+
+        rate = revealed / elapsed if elapsed else 0.0
+        print(f"reveal {engine:<8} {grid_size}x{grid_size} density={density:<6} "
+              f"setup={setup:.3f}s cells={revealed} largest={largest} "
+              f"time={elapsed:.3f}s ({rate:,.0f} cells/s)")
+
+
+def bench_regions(grid_size=300, density=0.05, probes=500, seed=0):
+    """ Time big_fun_search with and without labelled zero regions.
+
+    The same board is probed many times, as in replay and analysis runs.
+    """
+    rng = random.Random(seed)
+    board = a3.BoardModel(grid_size, int(grid_size ** 2 * density))
+    game = board.get_game()
+    locations = board.get_pokemon_locations()
+    indexes = [rng.randrange(grid_size ** 2) for _ in range(probes)]
+
+    def probe():
+        for index in indexes:
+            board.big_fun_search(game, grid_size, locations, index)
+
+    _, searched = _timed(probe)
+    _, labelling = _timed(board.label_regions)
+    _, looked_up = _timed(probe)
+    print(f"regions {grid_size}x{grid_size} density={density} probes={probes} "
+          f"search={searched:.3f}s label={labelling:.3f}s lookup={looked_up:.3f}s")
+
+
+def bench_moves(grid_size=30, num_pokemon=90, games=200, seed=0):
+    """ Time whole games of random clicks and flags with every engine.
+
+    This is the per-move cost seen by bots driving the model directly;
+    building the boards is timed separately.
+    """
+    for engine in _engines():
+        rng = random.Random(seed)
+        moves = 0
+        setup = 0.0
+        start = time.perf_counter()
+        for game_number in range(games):
+            board, seconds = _timed(a3.create_board_model, grid_size, num_pokemon,
+                                    engine, seed + game_number)
+            setup += seconds
+            locations = board.get_pokemon_locations()
+            while True:
+                game = board.get_game()
+                index = rng.randrange(grid_size ** 2)
+                if game[index] != a3.UNEXPOSED:
+                    continue
+                moves += 1
+                if rng.random() < 0.1:
+                    board.flag_cell(game, index)
+                elif board.check_loss(index):
+                    break
+                else:
+                    board.set_game(board.reveal_cells(game, grid_size, locations, index))
+                if board.check_win(board.get_game(), locations):
+                    break
+        elapsed = time.perf_counter() - start - setup
+        print(f"moves  {engine:<8} {grid_size}x{grid_size} pokemon={num_pokemon} games={games} "
+              f"setup={setup:.3f}s moves={moves} time={elapsed:.3f}s "
+              f"({moves / elapsed:,.0f} moves/s)")
+
+
+def bench_solver(grid_size=100, num_pokemon=1600, games=20, seed=0):
+    """ Time the deduction solver playing seeded boards from a safe first click.
+
+    A step is one reveal of a proven safe cell followed by the solver
+    catching up with it.
+    """
+    steps = 0
+    solved = 0
+    elapsed = 0.0
+    for game_number in range(games):
+        board = a3.BoardModel.seeded(grid_size, num_pokemon, seed + game_number)
+        board.reveal_region(solver.first_safe_cell(board))
+        game_steps, seconds = _timed(solver.solve, board)
+        steps += game_steps
+        elapsed += seconds
+        solved += board.get_num_unexposed() == len(board.get_pokemon_locations())
+    print(f"solver {grid_size}x{grid_size} pokemon={num_pokemon} games={games} "
+          f"solved={solved} steps={steps} time={elapsed:.3f}s ({steps / elapsed:,.0f} steps/s)")
+
+
+def bench_probability(grid_size=22, num_pokemon=99, games=50, seed=0):
+    """ Time exact probabilities on boards where deduction got stuck.
+
+    The defaults match an expert board: 484 cells and a fifth of them Pokemon.
+    Every board is solved by deduction first, then probabilities are taken
+    with a fresh cache so no result is reused.
+    """
+    times = []
+    cells = 0
+    for game_number in range(games):
+        board = a3.BoardModel.seeded(grid_size, num_pokemon, seed + game_number)
+        board.reveal_region(solver.first_safe_cell(board))
+        deducer = solver.Solver(board)
+        solver.solve(board, deducer)
+        probability.enumerate_component.cache_clear()
+        probabilities, seconds = _timed(probability.pokemon_probabilities, board, deducer)
+        times.append(seconds)
+        cells += len(probabilities)
+    print(f"probability {grid_size}x{grid_size} pokemon={num_pokemon} games={games} "
+          f"cells={cells} mean={sum(times) / games * 1000:.1f}ms max={max(times) * 1000:.1f}ms")
+
+
+def bench_generator(sizes=((9, 10), (16, 40), (22, 99)), seconds=2.0, seed=0):
+    """ Count no-guess boards generated per second for common sizes and densities.
+
+    The defaults are beginner, intermediate and expert boards (the last
+    squared up to 484 cells), each opened from a random first click.
+    """
+    for grid_size, num_pokemon in sizes:
+        rng = random.Random(seed)
+        boards = 0
+        repairs = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            _, board_repairs = generator.place_no_guess(
+                grid_size, num_pokemon, rng.randrange(grid_size ** 2), rng)
+            boards += 1
+            repairs += board_repairs
+        elapsed = time.perf_counter() - start
+        print(f"generator {grid_size}x{grid_size} pokemon={num_pokemon} boards={boards} "
+              f"repairs={repairs / boards:.1f}/board ({boards / elapsed:,.1f} boards/s)")
+
+
+def bench_metrics(sizes=((22, 99), (100, 2000)), boards=500, seed=0):
+    """ Count layouts scored per second, one by one and as a NumPy batch. """
+    for grid_size, num_pokemon in sizes:
+        rng = random.Random(seed)
+        layouts = [rng.sample(range(grid_size ** 2), num_pokemon) for _ in range(boards)]
+        for use_numpy in (False, True):
+            try:
+                _, elapsed = _timed(metrics.batch_metrics, layouts, grid_size, use_numpy)
+            except ImportError:
+                continue
+            print(f"metrics {grid_size}x{grid_size} pokemon={num_pokemon} boards={boards} "
+                  f"{'numpy' if use_numpy else 'python'} time={elapsed:.3f}s "
+                  f"({boards / elapsed:,.0f} boards/s)")
+
+
+def bench_selfplay(grid_size=16, num_pokemon=40, games=2000, seed=0):
+    """ Count games per second of the solver bot in this process and across
+    process pools of growing size, up to one worker per CPU.
+    """
+    workers = 1
+    while True:
+        tally, elapsed = _timed(selfplay.run, games, grid_size, num_pokemon, "solver",
+                                "string", workers, selfplay.BATCH_SIZE, seed)
+        print(f"selfplay {grid_size}x{grid_size} pokemon={num_pokemon} games={games} "
+              f"workers={workers} time={elapsed:.3f}s ({games / elapsed:,.0f} games/s, "
+              f"won {tally.get_totals()['won'] / games:.1%})")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count())
+
+
+BENCHMARKS = {
+    "reveal": bench_reveal,
+    "regions": bench_regions,
+    "moves": bench_moves,
+    "solver": bench_solver,
+    "probability": bench_probability,
+    "generator": bench_generator,
+    "metrics": bench_metrics,
+    "selfplay": bench_selfplay,
+}
+
+
+def main(names):
+    """ Run the named benchmarks, or all of them. """
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
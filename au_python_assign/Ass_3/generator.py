@@ -0,0 +1,234 @@
+"""
+Generate Pokemon boards which can be won from a given first click without
+guessing.
+
+Usage:
+    python generator.py [--size N] [--pokemon N] [--seed N] [--click INDEX]
+
+Prints the repairs the board took and the board once solved.
+"""
+
+import argparse
+import random
+import time
+
+import a3
+import solver
+
+MAX_REPAIRS = 1000
+
+
+def safe_zone(grid_size, index):
+    """ Get the cells kept free of Pokemon around the first click.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        index (int): Index of the first click.
+
+    Returns:
+        (set<int>): The clicked cell and its neighbours.
+    """
+    return {index, *a3.neighbour_table(grid_size).neighbours(index)}
+
+
+def play_by_deduction(board, first_click):
+    """ Click the first cell, then reveal every cell the solver proves safe.
+
+    Parameters:
+        board (BoardModel): Board to play on.
+        first_click (int): Index of the first click, which must be safe.
+
+    Returns:
+        (solver.Solver): The solver, following the board where it got stuck.
+    """
+    board.reveal_region(first_click)
+    deducer = solver.Solver(board)
+    solver.solve(board, deducer)
+    return deducer
+
+
+def place_no_guess(grid_size, num_pokemon, first_click, rng=random, max_repairs=MAX_REPAIRS):
+    """ Place Pokemon so that the board is won by deduction from first_click.
+
+    The Pokemon are placed at random outside the safe zone and the board is
+    played by the solver. While it gets stuck, one Pokemon it could not
+    account for is moved from the stuck frontier to a covered cell away
+    from the revealed area, and the solver carries on from where it got
+    stuck, reading only the numbers around the moved Pokemon again. Each
+    repair changes one Pokemon, so the rest of the layout is kept.
+
+    Cells revealed before a repair were proven from numbers it may have
+    changed, so once the repaired board is won it is played again from the
+    first click, and repaired further from there if it needs to be.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        num_pokemon (int): The number of pokemons that the game will have.
+        first_click (int): Index of the first click.
+        rng (random.Random): Source of randomness, the random module by default.
+        max_repairs (int): Repairs to try before giving up.
+
+    Returns:
+        (tuple<list<int>, int>): Indexes of the Pokemon, and the number of
+        repairs made.
+
+    Raises:
+        ValueError: If the Pokemon do not fit outside the safe zone, or the
+            board could not be repaired within max_repairs, see _repair.
+    """
+    zone = safe_zone(grid_size, first_click)
+    candidates = [i for i in range(grid_size ** 2) if i not in zone]
+    if not 0 <= num_pokemon <= len(candidates):
+        raise ValueError(f"{num_pokemon} Pokemon do not fit on a {grid_size}x{grid_size} "
+                         f"grid outside the first click")
+    pokemon = set(rng.sample(candidates, num_pokemon))
+
+    repairs = 0
+    board = None
+    while True:
+        if board is None:
+            board = a3.BoardModel.with_pokemon(grid_size, sorted(pokemon))
+            deducer = play_by_deduction(board, first_click)
+            played_from_start = True
+        if board.get_num_unexposed() == num_pokemon:
+            if played_from_start:
+                return sorted(pokemon), repairs
+            board = None
+            continue
+        if repairs == max_repairs:
+            raise ValueError(f"board needs guessing after {max_repairs} repairs")
+        moved = _repair(board, deducer, pokemon, zone, rng)
+        board, changed = _move_pokemon(board, pokemon, moved)
+        deducer.follow(board, changed)
+        solver.solve(board, deducer)
+        repairs += 1
+        played_from_start = False
+
+
+def _repair(board, deducer, pokemon, zone, rng):
+    """ Move one Pokemon next to a cell the solver could not reach.
+
+    The cell is taken from the stuck frontier if there is one, else from
+    the safe cells walled in by Pokemon. The Pokemon goes to a covered cell
+    next to nothing revealed if possible, so no number the solver has seen
+    changes, and never next to the cell it was moved away from. Failing
+    that it goes to any covered cell outside the safe zone; revealed cells
+    are never covered again.
+
+    Parameters:
+        board (BoardModel): Board played as far as deduction goes.
+        deducer (solver.Solver): The solver following it.
+        pokemon (set<int>): Indexes of the Pokemon, updated in place.
+        zone (set<int>): Cells which must stay free of Pokemon.
+        rng (random.Random): Source of randomness.
+
+    Returns:
+        (tuple<int, int>): The cell the Pokemon left and the cell it went to.
+
+    Raises:
+        ValueError: If no covered cell outside the safe zone is free of
+            Pokemon.
+    """
+    game = board.get_game()
+    grid_size = board.get_grid_size()
+    neighbours = a3.neighbour_table(grid_size).neighbours
+    frontier = set()
+    for cells, _ in deducer.get_constraints():
+        frontier |= cells
+    stuck = [i for i, character in enumerate(game)
+             if character in (a3.UNEXPOSED, a3.FLAG) and i not in pokemon and i not in zone]
+    if not stuck:
+        raise ValueError("no covered cell outside the first click is free to move a Pokemon to")
+    target = rng.choice(sorted(frontier - pokemon) or stuck)
+
+    sources = [i for i in neighbours(target) if i in pokemon and i not in zone]
+    if not sources:
+        sources = sorted(frontier & pokemon) or sorted(pokemon - zone)
+    blocked = pokemon | zone | {target, *neighbours(target)}
+    free = [i for i in stuck if i not in blocked and i not in frontier]
+    far = [i for i in free if not any(game[n].isdigit() for n in neighbours(i))]
+    destinations = far or free or stuck
+    source = rng.choice(sources)
+    destination = rng.choice(destinations)
+    pokemon.remove(source)
+    pokemon.add(destination)
+    return source, destination
+
+
+def _move_pokemon(board, pokemon, moved):
+    """ Build the board for a layout with one Pokemon moved, keeping what
+    was revealed on the old one.
+
+    Parameters:
+        board (BoardModel): Board played on the old layout.
+        pokemon (set<int>): Indexes of the Pokemon, already moved.
+        moved (tuple<int, int>): The cell the Pokemon left and the covered
+            cell it went to.
+
+    Returns:
+        (tuple<BoardModel, list<int>>): The new board, and the moved cells
+        with the cells around them, whose numbers may have changed.
+    """
+    grid_size = board.get_grid_size()
+    neighbours = a3.neighbour_table(grid_size).neighbours
+    moved_board = a3.BoardModel.with_pokemon(grid_size, sorted(pokemon))
+    counts = a3.counts_for(moved_board.get_pokemon_locations(), grid_size)
+    game = list(board.get_game())
+    changed = sorted({cell for index in moved for cell in (index, *neighbours(index))})
+    for index in changed:
+        if index not in pokemon and game[index].isdigit():
+            game[index] = str(counts[index])
+    moved_board.set_game("".join(game))
+    return moved_board, changed
+
+
+def no_guess_board(grid_size, num_pokemon, first_click, seed=None, engine="string"):
+    """ Create a board which is won by deduction alone from first_click.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        num_pokemon (int): The number of pokemons that the game will have.
+        first_click (int): Index of the first click; it opens a region.
+        seed (int): Seed of the layout, or None for a random one. The same
+            seed and first click give the same board.
+        engine (str): Name of the board engine, a key of a3.ENGINES.
+
+    Returns:
+        (BoardModel): The new board, nothing revealed yet. It has no board
+        ID, see BoardModel.with_pokemon; the seed and first click make it
+        again.
+
+    Raises:
+        ValueError: See place_no_guess.
+    """
+    rng = random.Random(seed)
+    pokemon, _ = place_no_guess(grid_size, num_pokemon, first_click, rng)
+    return a3.ENGINES[engine].with_pokemon(grid_size, pokemon)
+
+
+def main():
+    """ Generate a no-guess board and print it solved."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=22)
+    parser.add_argument("--pokemon", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--click", type=int, help="first click, the centre by default")
+    args = parser.parse_args()
+
+    click = args.click
+    if click is None:
+        click = args.size // 2 * args.size + args.size // 2
+    start = time.perf_counter()
+    pokemon, repairs = place_no_guess(args.size, args.pokemon, click, random.Random(args.seed))
+    elapsed = time.perf_counter() - start
+
+    board = a3.BoardModel.with_pokemon(args.size, pokemon)
+    play_by_deduction(board, click)
+    print(f"seed {args.seed}, first click {click}: {repairs} repairs in {elapsed:.3f}s")
+    game = board.get_game()
+    for row in range(args.size):
+        print(game[row * args.size:(row + 1) * args.size])
+
+
+if __name__ == "__main__":
+    main()
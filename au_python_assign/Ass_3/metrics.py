@@ -0,0 +1,223 @@
+"""
+Difficulty metrics of Pokemon layouts, for scoring generated boards.
+
+Usage:
+    python metrics.py [--size N] [--pokemon N] [--boards N] [--seed N]
+
+Scores a batch of seeded layouts and prints the average metrics and the
+boards scored per second.
+"""
+
+import argparse
+import random
+import time
+from array import array
+from collections import namedtuple
+
+import a3
+
+Metrics = namedtuple("Metrics", ["bbbv", "openings", "isolated"])
+Metrics.__doc__ = """\
+Metrics of one layout.
+
+bbbv is the 3BV: the fewest clicks that clear the board, one per opening
+plus one per numbered cell outside every opening. openings is the number
+of connected regions of zero cells, and isolated the number of numbered
+cells not next to any zero cell.
+"""
+
+_POKEMON = 9  # a count no cell can have, marking the Pokemon
+
+
+def board_metrics(pokemon_locations, grid_size):
+    """ Score one layout in a single pass over the grid.
+
+    Openings are counted with a union-find over the zero cells, joining
+    each one to its zero neighbours already visited, and each numbered
+    cell is checked for a zero neighbour on the way.
+
+    Parameters:
+        pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (Metrics): The layout's 3BV, openings and isolated numbered cells.
+    """
+    cells = bytearray(a3.counts_for(pokemon_locations, grid_size))
+    for index in pokemon_locations:
+        cells[index] = _POKEMON
+    offsets_at = a3.neighbour_table(grid_size).offsets_at
+    parent = array("i", range(grid_size ** 2))
+
+    def find(index):
+        """ Get the root of a zero cell's opening, halving the path. """
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    zeros = 0
+    joins = 0
+    isolated = 0
+    for index, count in enumerate(cells):
+        if count == 0:
+            zeros += 1
+            root = find(index)
+            for offset in offsets_at(index):
+                if offset < 0 and cells[index + offset] == 0:
+                    other = find(index + offset)
+                    if other != root:
+                        parent[other] = root
+                        joins += 1
+        elif count != _POKEMON:
+            if all(cells[index + offset] for offset in offsets_at(index)):
+                isolated += 1
+    openings = zeros - joins
+    return Metrics(openings + isolated, openings, isolated)
+
+
+def batch_metrics(layouts, grid_size, use_numpy=None):
+    """ Score many layouts of the same grid size.
+
+    Parameters:
+        layouts (iterable<tuple<int, ...>>): Pokemon locations of each board.
+        grid_size (int): Size of the game grid.
+        use_numpy (bool): Score all boards at once with NumPy, score them one
+            by one with board_metrics, or (None) use NumPy if it is installed.
+
+    Returns:
+        (list<Metrics>): The metrics of each layout, in order.
+
+    Raises:
+        ImportError: If use_numpy is True and NumPy is not installed.
+    """
+    layouts = list(layouts)
+    np = None
+    if use_numpy is not False:
+        try:
+            import numpy as np
+        except ImportError:
+            if use_numpy:
+                raise ImportError("batch_metrics needs NumPy installed to use it") from None
+    if np is None or not layouts:
+        return [board_metrics(layout, grid_size) for layout in layouts]
+    return _numpy_metrics(np, layouts, grid_size)
+
+
+def _neighbourhood(np, padded, combine):
+    """ Combine the eight shifted views of padded boards, one per neighbour.
+
+    Parameters:
+        np (module): The numpy module.
+        padded (ndarray): Boards with a one cell border, shape (boards, g + 2, g + 2).
+        combine (ufunc): How to combine the views, e.g. numpy.add.
+
+    Returns:
+        (ndarray): The combined views, shape (boards, g, g).
+    """
+    size = padded.shape[1] - 2
+    result = None
+    for row in range(3):
+        for column in range(3):
+            if row == column == 1:
+                continue
+            view = padded[:, row:row + size, column:column + size]
+            result = view.copy() if result is None else combine(result, view)
+    return result
+
+
+def _numpy_metrics(np, layouts, grid_size):
+    """ Score a batch of layouts with whole-array operations.
+
+    Counts and zero neighbours are sums of shifted views of the stacked
+    boards. Openings are counted with an array union-find over the zero
+    cells of all boards: every pair of neighbouring zero cells hooks the
+    larger of their roots under the smaller, then each cell jumps to its
+    root, until every pair shares one. Each opening keeps one root.
+
+    Parameters:
+        np (module): The numpy module.
+        layouts (list<tuple<int, ...>>): Pokemon locations of each board.
+        grid_size (int): Size of the game grid.
+
+    Returns:
+        (list<Metrics>): The metrics of each layout, in order.
+    """
+    boards = len(layouts)
+    cell_count = grid_size ** 2
+    pokemon = np.zeros((boards, grid_size + 2, grid_size + 2), dtype=np.uint8)
+    board_numbers = np.repeat(np.arange(boards), [len(layout) for layout in layouts])
+    indexes = np.fromiter((i for layout in layouts for i in layout), dtype=np.intp,
+                          count=len(board_numbers))
+    pokemon[board_numbers, 1 + indexes // grid_size, 1 + indexes % grid_size] = 1
+
+    counts = _neighbourhood(np, pokemon, np.add)
+    is_pokemon = pokemon[:, 1:-1, 1:-1].astype(bool)
+    zero = (counts == 0) & ~is_pokemon
+    padded_zero = np.pad(zero, ((0, 0), (1, 1), (1, 1)))
+    near_zero = _neighbourhood(np, padded_zero, np.logical_or)
+    isolated = (~is_pokemon & ~zero & ~near_zero).sum(axis=(1, 2))
+
+    zero_cells = np.flatnonzero(zero)
+    position = np.zeros(boards * cell_count, dtype=np.intp)
+    position[zero_cells] = np.arange(len(zero_cells))
+    position = position.reshape(zero.shape)
+    # Neighbouring cells, each pair once: right, down, down-right, down-left.
+    every, head, tail = slice(None), slice(None, -1), slice(1, None)
+    pairs = [((every, every, head), (every, every, tail)),
+             ((every, head, every), (every, tail, every)),
+             ((every, head, head), (every, tail, tail)),
+             ((every, head, tail), (every, tail, head))]
+    firsts = []
+    seconds = []
+    for first, second in pairs:
+        both = zero[first] & zero[second]
+        firsts.append(position[first][both])
+        seconds.append(position[second][both])
+    firsts = np.concatenate(firsts)
+    seconds = np.concatenate(seconds)
+
+    parent = np.arange(len(zero_cells))
+    while True:
+        first_roots = parent[firsts]
+        second_roots = parent[seconds]
+        apart = first_roots != second_roots
+        if not apart.any():
+            break
+        np.minimum.at(parent, np.maximum(first_roots, second_roots)[apart],
+                      np.minimum(first_roots, second_roots)[apart])
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    roots = zero_cells[parent == np.arange(len(zero_cells))]
+    openings = np.bincount(roots // cell_count, minlength=boards)
+
+    return [Metrics(int(opening + alone), int(opening), int(alone))
+            for opening, alone in zip(openings, isolated)]
+
+
+def main():
+    """ Score a batch of seeded layouts and print the averages."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=22)
+    parser.add_argument("--pokemon", type=int, default=99)
+    parser.add_argument("--boards", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-numpy", action="store_true", help="score boards one by one")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    layouts = [rng.sample(range(args.size ** 2), args.pokemon) for _ in range(args.boards)]
+    start = time.perf_counter()
+    scores = batch_metrics(layouts, args.size, False if args.no_numpy else None)
+    elapsed = time.perf_counter() - start
+    print(f"{args.boards} boards {args.size}x{args.size} pokemon={args.pokemon}: "
+          + ", ".join(f"{name}={sum(getattr(score, name) for score in scores) / args.boards:.1f}"
+                      for name in Metrics._fields)
+          + f" ({args.boards / elapsed:,.0f} boards/s)")
+
+
+if __name__ == "__main__":
+    main()
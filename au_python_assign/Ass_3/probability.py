@@ -0,0 +1,294 @@
+"""
+Exact probability that each covered cell of a Pokemon board holds a Pokemon,
+for when the numbers prove no cell safe.
+
+Usage:
+    python probability.py [--size N] [--pokemon N] [--seed N]
+
+Plays a seeded board by deduction until it gets stuck, then prints how long
+the probabilities took and the safest cells to guess.
+"""
+
+import argparse
+import functools
+import math
+import time
+
+import a3
+import solver
+
+
+def frontier_components(constraints):
+    """ Split constraints into groups which share no cells.
+
+    Cells in different groups do not constrain each other, so each group
+    can be enumerated on its own.
+
+    Parameters:
+        constraints (list<tuple<frozenset<int>, int>>): Cells and the number
+            of Pokemon among them, see solver.Solver.get_constraints.
+
+    Returns:
+        (list<list<tuple<frozenset<int>, int>>>): The constraints of each group.
+    """
+    parent = {}
+
+    def find(cell):
+        """ Get the representative of a cell's group, shortening the path. """
+        root = cell
+        while parent[root] != root:
+            root = parent[root]
+        while parent[cell] != root:
+            parent[cell], cell = root, parent[cell]
+        return root
+
+    for cells, _ in constraints:
+        first = None
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            if first is None:
+                first = find(cell)
+            else:
+                parent[find(cell)] = first
+
+    groups = {}
+    for constraint in set(constraints):
+        groups.setdefault(find(next(iter(constraint[0]))), []).append(constraint)
+    return list(groups.values())
+
+
+def _cell_order(constraints):
+    """ Order a group's cells so that constraints open and close quickly.
+
+    Cells are taken constraint by constraint in breadth-first order, which
+    keeps few constraints half-assigned at any point of the enumeration.
+
+    Parameters:
+        constraints (tuple<tuple<frozenset<int>, int>, ...>): One group.
+
+    Returns:
+        (list<int>): The group's cells.
+    """
+    by_cell = {}
+    for constraint in constraints:
+        for cell in constraint[0]:
+            by_cell.setdefault(cell, []).append(constraint)
+
+    order = []
+    seen = set()
+    queue = [min(constraints, key=lambda constraint: min(constraint[0]))]
+    done = {queue[0]}
+    while queue:
+        cells = queue.pop(0)[0]
+        for cell in sorted(cells):
+            if cell in seen:
+                continue
+            seen.add(cell)
+            order.append(cell)
+            for constraint in by_cell[cell]:
+                if constraint not in done:
+                    done.add(constraint)
+                    queue.append(constraint)
+    return order
+
+
+@functools.lru_cache(maxsize=256)
+def enumerate_component(constraints):
+    """ Count the Pokemon layouts of one group which satisfy its numbers.
+
+    Cells are assigned in turn, and partial layouts which leave the same
+    Pokemon still needed by every half-assigned constraint are merged, so
+    the work grows with the number of such states rather than the number
+    of layouts. Results are cached, so groups that did not change since
+    the last call are not enumerated again.
+
+    Parameters:
+        constraints (tuple<tuple<frozenset<int>, int>, ...>): One group,
+            see frontier_components, as a sorted tuple.
+
+    Returns:
+        (tuple<tuple<int, ...>, dict<int, tuple<int, tuple<int, ...>>>>):
+        The group's cells, and for each number of Pokemon in the group the
+        number of layouts and, per cell, the number of those layouts with a
+        Pokemon there.
+    """
+    cells = _cell_order(constraints)
+    position = {cell: i for i, cell in enumerate(cells)}
+    spans = [sorted(position[cell] for cell in members) for members, _ in constraints]
+    counts = [count for _, count in constraints]
+    containing = [[] for _ in cells]
+    for c, span in enumerate(spans):
+        for i in span:
+            containing[i].append(c)
+    # Constraints with cells on both sides of the boundary before cell i.
+    active = [[c for c, span in enumerate(spans) if span[0] < i <= span[-1]]
+              for i in range(len(cells) + 1)]
+
+    layer = {(): {0: (1, [])}}
+    for i in range(len(cells)):
+        slot = {c: k for k, c in enumerate(active[i])}
+        checks = [(slot.get(c, -1), counts[c], len(spans[c]) - spans[c].index(i) - 1)
+                  for c in containing[i]]
+        follow = [(slot.get(c, -1), counts[c], c in containing[i]) for c in active[i + 1]]
+        following = {}
+        for state, by_pokemon in layer.items():
+            for value in (0, 1):
+                feasible = True
+                for k, count, after in checks:
+                    left = (state[k] if k >= 0 else count) - value
+                    if not 0 <= left <= after:
+                        feasible = False
+                        break
+                if not feasible:
+                    continue
+                next_state = tuple((state[k] if k >= 0 else count) - (value if contains else 0)
+                                   for k, count, contains in follow)
+                merged = following.setdefault(next_state, {})
+                for pokemon, (ways, sums) in by_pokemon.items():
+                    sums = sums + [ways * value]
+                    key = pokemon + value
+                    if key in merged:
+                        old_ways, old_sums = merged[key]
+                        merged[key] = (old_ways + ways, [a + b for a, b in zip(old_sums, sums)])
+                    else:
+                        merged[key] = (ways, sums)
+        layer = following
+
+    result = {pokemon: (ways, tuple(sums)) for pokemon, (ways, sums) in layer.get((), {}).items()}
+    return tuple(cells), result
+
+
+def _convolve(first, second):
+    """ Combine two distributions of layouts by number of Pokemon.
+
+    Parameters:
+        first (dict<int, int>): Layouts per number of Pokemon.
+        second (dict<int, int>): The same for cells disjoint from first's.
+
+    Returns:
+        (dict<int, int>): Layouts of both per total number of Pokemon.
+    """
+    result = {}
+    for a, a_ways in first.items():
+        for b, b_ways in second.items():
+            result[a + b] = result.get(a + b, 0) + a_ways * b_ways
+    return result
+
+
+def pokemon_probabilities(board, deducer=None):
+    """ Get the exact probability of a Pokemon under every covered cell.
+
+    Every layout of the Pokemon consistent with the numbers shown and the
+    number of Pokemon on the board is equally likely. The frontier (the
+    unknown cells next to numbers) is split into independent groups which
+    are enumerated separately; the other covered cells share the
+    remaining Pokemon, counted with binomial coefficients.
+
+    Parameters:
+        board (BoardModel): Board to look at, of any engine.
+        deducer (solver.Solver): Solver already following the board, or
+            None to create one. Cells it proves are given 0 or 1.
+
+    Returns:
+        (dict<int, float>): Probability for every unexposed or flagged cell.
+
+    Raises:
+        ValueError: If no layout fits the board, e.g. after a loss.
+    """
+    if deducer is None:
+        deducer = solver.Solver(board)
+    grid_size = board.get_grid_size()
+    constraints = deducer.get_constraints()
+    safe, known = deducer.deduce()
+    components = [enumerate_component(tuple(sorted(group, key=lambda c: (sorted(c[0]), c[1]))))
+                  for group in frontier_components(constraints)]
+
+    game = board.get_game()
+    covered = [i for i, character in enumerate(game) if character in (a3.UNEXPOSED, a3.FLAG)]
+    frontier = sum(len(cells) for cells, _ in components)
+    interior = len(covered) - len(safe) - len(known) - frontier
+    remaining = max(0, min(board.get_num_pokemon(), grid_size ** 2)) - len(known)
+
+    # Layouts of all groups but one, for every group: prefix and suffix products.
+    distributions = [{pokemon: ways for pokemon, (ways, _) in by_pokemon.items()}
+                     for _, by_pokemon in components]
+    prefixes = [{0: 1}]
+    for distribution in distributions:
+        prefixes.append(_convolve(prefixes[-1], distribution))
+    suffixes = [{0: 1}]
+    for distribution in reversed(distributions):
+        suffixes.append(_convolve(suffixes[-1], distribution))
+    suffixes.reverse()
+
+    def interior_ways(pokemon):
+        """ Ways to place the Pokemon left after the frontier's inside the interior. """
+        return math.comb(interior, remaining - pokemon) if 0 <= remaining - pokemon else 0
+
+    total = sum(ways * interior_ways(pokemon) for pokemon, ways in prefixes[-1].items())
+    if total == 0:
+        raise ValueError("no Pokemon layout fits the board")
+
+    probabilities = dict.fromkeys(safe, 0.0)
+    probabilities.update(dict.fromkeys(known, 1.0))
+    for n, (cells, by_pokemon) in enumerate(components):
+        others = _convolve(prefixes[n], suffixes[n + 1])
+        weighted = [0] * len(cells)
+        for pokemon, (_, sums) in by_pokemon.items():
+            weight = sum(ways * interior_ways(pokemon + rest) for rest, ways in others.items())
+            for i, layouts in enumerate(sums):
+                weighted[i] += layouts * weight
+        for cell, layouts in zip(cells, weighted):
+            probabilities[cell] = layouts / total
+
+    if interior:
+        # Each interior cell holds a Pokemon in comb(interior - 1, left - 1)
+        # of the comb(interior, left) ways to fill the interior.
+        inside = sum(ways * (math.comb(interior - 1, remaining - pokemon - 1)
+                             if remaining - pokemon >= 1 else 0)
+                     for pokemon, ways in prefixes[-1].items())
+        chance = inside / total
+        for cell in covered:
+            probabilities.setdefault(cell, chance)
+    return probabilities
+
+
+def safest_cell(probabilities):
+    """ Pick the covered cell least likely to hold a Pokemon.
+
+    Parameters:
+        probabilities (dict<int, float>): See pokemon_probabilities.
+
+    Returns:
+        (int): Index of the cell, the lowest one on ties, or None if there
+        are no covered cells.
+    """
+    if not probabilities:
+        return None
+    return min(probabilities, key=lambda cell: (probabilities[cell], cell))
+
+
+def main():
+    """ Solve a seeded board until deduction gets stuck and print the best guesses."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=22)
+    parser.add_argument("--pokemon", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    board = a3.BoardModel.seeded(args.size, args.pokemon, args.seed)
+    board.reveal_region(solver.first_safe_cell(board))
+    deducer = solver.Solver(board)
+    solver.solve(board, deducer)
+    start = time.perf_counter()
+    probabilities = pokemon_probabilities(board, deducer)
+    elapsed = time.perf_counter() - start
+
+    print(f"{board.get_board_id()}: {len(probabilities)} covered cells, "
+          f"probabilities in {elapsed * 1000:.1f}ms")
+    for cell in sorted(probabilities, key=lambda cell: (probabilities[cell], cell))[:5]:
+        row, column = divmod(cell, args.size)
+        print(f"  row {row} column {column}: {probabilities[cell]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Replay journals recorded by a3.py or a1.py (--journal FILE) without Tk.
+
+Usage:
+    python replay.py [--engine NAME] [--verbose] JOURNAL [JOURNAL ...]
+
+Every game is played again on a fresh board generated from its board ID,
+and the outcomes and replay speed are printed.
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import a3
+
+
+def replay(lines, engine="string"):
+    """ Replay every game of a journal.
+
+    Parameters:
+        lines (iterable<str>): Lines of a journal.
+        engine (str): Board engine to replay on, see a3.ENGINES.
+
+    Yields:
+        (tuple<str, BoardModel, str>): Board ID, final board and outcome of
+            each game.
+    """
+    for board_id, moves in a3.read_journal(lines):
+        grid_size, num_pokemon, seed = a3.parse_board_id(board_id)
+        board = a3.create_board_model(grid_size, num_pokemon, engine, seed)
+        yield board_id, board, a3.replay_game(board, moves)
+
+
+def main():
+    """ Replay the journals named on the command line and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("journals", nargs="+", metavar="JOURNAL")
+    parser.add_argument("--engine", default="string", choices=sorted(a3.ENGINES))
+    parser.add_argument("--verbose", action="store_true", help="print every game")
+    args = parser.parse_args()
+
+    outcomes = Counter()
+    start = time.perf_counter()
+    for name in args.journals:
+        with open(name, encoding="ascii") as lines:
+            for board_id, board, outcome in replay(lines, args.engine):
+                outcomes[outcome] += 1
+                if args.verbose:
+                    print(f"{board_id:<16} {outcome:<8} "
+                          f"unexposed={board.get_num_unexposed()} flags={board.get_num_flags()}")
+    elapsed = time.perf_counter() - start
+
+    games = sum(outcomes.values())
+    rate = games / elapsed if elapsed else 0.0
+    print(f"{games} games replayed on {args.engine} in {elapsed:.3f}s ({rate:,.0f} games/s): "
+          + ", ".join(f"{outcome} {count}" for outcome, count in sorted(outcomes.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Play many headless games with bots across a process pool and report
+win rates and move statistics.
+
+Usage:
+    python selfplay.py [--player NAME] [--games N] [--size N] [--pokemon N]
+                       [--engine NAME] [--workers N] [--batch N] [--seed N]
+
+Games are split into batches of seeded games; each batch runs in a worker
+process and sends back one compact record per game, which are tallied as
+they arrive. The same seed gives the same totals whatever the number of
+workers.
+"""
+
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+from array import array
+
+import a3
+import probability
+import solver
+
+BATCH_SIZE = 200
+# Fields of a game's record, in order.
+RECORD_FIELDS = ("won", "moves", "guesses", "revealed")
+
+
+class RandomPlayer:
+    """
+    Player clicking covered cells at random.
+    """
+
+    def __init__(self, board, rng):
+        """ Start following a new board.
+
+        Parameters:
+            board (BoardModel): Board to play, nothing revealed yet.
+            rng (random.Random): The player's source of randomness.
+        """
+        self._board = board
+        self._rng = rng
+        self._covered = list(range(board.get_grid_size() ** 2))
+        self._revealed = set()
+        self._num_guesses = 0
+
+    def next_move(self):
+        """ Choose the next cell to click.
+
+        Returns:
+            (int): Index of a covered cell, or None if there is none left.
+        """
+        self._num_guesses += 1
+        return self._random_cell()
+
+    def observe(self, changed):
+        """ Learn which cells the last click revealed.
+
+        Parameters:
+            changed (list<int>): Cells revealed, see BoardModel.reveal_region.
+        """
+        self._revealed.update(changed)
+
+    def get_num_guesses(self):
+        """ Get the number of clicks that were not proven safe.
+
+        Returns:
+            (int): Number of guesses.
+        """
+        return self._num_guesses
+
+    def _random_cell(self, avoid=()):
+        """ Pick a covered cell at random, never the same one twice.
+
+        Picked and revealed cells are dropped from the list as they are met,
+        so a pick takes constant time on average.
+
+        Parameters:
+            avoid (set<int>): Cells not to pick, e.g. known Pokemon.
+
+        Returns:
+            (int): Index of the cell, or None if every covered cell is
+            avoided.
+        """
+        covered = self._covered
+        skipped = []
+        while covered:
+            k = self._rng.randrange(len(covered))
+            index = covered[k]
+            covered[k] = covered[-1]
+            covered.pop()
+            if index in avoid:
+                skipped.append(index)
+            elif index not in self._revealed:
+                covered.extend(skipped)
+                return index
+        covered.extend(skipped)
+        return None
+
+
+class SolverPlayer(RandomPlayer):
+    """
+    Player clicking the cells the deduction solver proves safe, and a
+    random cell not known to hold a Pokemon when there are none.
+    """
+
+    def __init__(self, board, rng):
+        """ Start following a new board.
+
+        Parameters:
+            board (BoardModel): Board to play, nothing revealed yet.
+            rng (random.Random): The player's source of randomness.
+        """
+        super().__init__(board, rng)
+        self._solver = solver.Solver(board)
+
+    def next_move(self):
+        """ Choose the next cell to click.
+
+        Returns:
+            (int): Index of a covered cell, or None if there is none left
+            but known Pokemon.
+        """
+        cell = self._solver.next_safe()
+        if cell is not None:
+            return cell
+        self._num_guesses += 1
+        return self._guess()
+
+    def observe(self, changed):
+        """ Learn which cells the last click revealed.
+
+        Parameters:
+            changed (list<int>): Cells revealed, see BoardModel.reveal_region.
+        """
+        super().observe(changed)
+        self._solver.update(changed)
+
+    def _guess(self):
+        """ Choose a cell when none is proven safe.
+
+        Returns:
+            (int): Index of a covered cell not known to hold a Pokemon, or
+            None if there is none.
+        """
+        return self._random_cell(self._solver.deduce()[1])
+
+
+class ProbabilityPlayer(SolverPlayer):
+    """
+    Solver player which guesses the cell least likely to hold a Pokemon.
+    """
+
+    def _guess(self):
+        """ Choose a cell when none is proven safe.
+
+        Returns:
+            (int): Index of the covered cell with the lowest exact probability,
+            or None if there is none.
+        """
+        probabilities = probability.pokemon_probabilities(self._board, self._solver)
+        return probability.safest_cell(probabilities)
+
+
+PLAYERS = {
+    "random": RandomPlayer,
+    "solver": SolverPlayer,
+    "probability": ProbabilityPlayer,
+}
+
+
+def play_game(board, player):
+    """ Play one game to the end.
+
+    The game is won once every cell without a Pokemon is revealed; the bots
+    do not need to flag the Pokemon. A player with no cell left to click
+    gives the game up, which counts as a loss.
+
+    Parameters:
+        board (BoardModel): Board to play, nothing revealed yet.
+        player (RandomPlayer): Player following the board.
+
+    Returns:
+        (tuple<int, ...>): The game's record, see RECORD_FIELDS.
+    """
+    num_pokemon = len(board.get_pokemon_locations())
+    moves = 0
+    revealed = 0
+    won = 1
+    while board.get_num_unexposed() + board.get_num_flags() > num_pokemon:
+        index = player.next_move()
+        if index is None:
+            won = 0
+            break
+        moves += 1
+        # A loss shows the Pokemon, so count the revealed cells as they open.
+        if board.check_loss(index):
+            won = 0
+            break
+        changed = board.reveal_region(index)
+        revealed += len(changed)
+        player.observe(changed)
+    return won, moves, player.get_num_guesses(), revealed
+
+
+def play_batch(settings, batch_number, games):
+    """ Play a batch of games in a worker; see run.
+
+    Every batch draws its boards and its players' randomness from its own
+    stream, seeded from the run's seed and the batch number.
+
+    Parameters:
+        settings (tuple): Grid size, number of Pokemon, engine name, player
+            name and seed of the run.
+        batch_number (int): Position of the batch in the run.
+        games (int): Number of games to play.
+
+    Returns:
+        (bytes): The games' records, packed as uint32s.
+    """
+    grid_size, num_pokemon, engine, player_name, seed = settings
+    rng = random.Random(f"{seed}:{batch_number}")
+    player_class = PLAYERS[player_name]
+    records = array("I")
+    for _ in range(games):
+        board = a3.create_board_model(grid_size, num_pokemon, engine, rng.getrandbits(32))
+        records.extend(play_game(board, player_class(board, rng)))
+    return records.tobytes()
+
+
+class Tally:
+    """
+    Running totals of the games played, updated one batch at a time.
+    """
+
+    def __init__(self):
+        """ Start with no games."""
+        self._games = 0
+        self._totals = dict.fromkeys(RECORD_FIELDS, 0)
+        self._won_moves = 0
+
+    def add_batch(self, data):
+        """ Add a batch of records, see play_batch.
+
+        Parameters:
+            data (bytes): The packed records.
+        """
+        records = array("I")
+        records.frombytes(data)
+        width = len(RECORD_FIELDS)
+        self._games += len(records) // width
+        for offset, field in enumerate(RECORD_FIELDS):
+            self._totals[field] += sum(records[offset::width])
+        won = records[0::width]
+        moves = records[1::width]
+        self._won_moves += sum(move for win, move in zip(won, moves) if win)
+
+    def get_num_games(self):
+        """ Get the number of games added.
+
+        Returns:
+            (int): Number of games.
+        """
+        return self._games
+
+    def get_totals(self):
+        """ Get the sum of every record field over the games added.
+
+        Returns:
+            (dict<str, int>): Totals by field, see RECORD_FIELDS.
+        """
+        return dict(self._totals)
+
+    def summary(self):
+        """ Describe the games added so far.
+
+        Returns:
+            (str): Win rate and mean moves, guesses and revealed cells.
+        """
+        games = self._games or 1
+        wins = self._totals["won"]
+        return (f"{self._games} games, won {wins} ({wins / games:.2%}), "
+                f"moves {self._totals['moves'] / games:.1f}/game "
+                f"({self._won_moves / (wins or 1):.1f}/win), "
+                f"guesses {self._totals['guesses'] / games:.2f}/game, "
+                f"revealed {self._totals['revealed'] / games:.1f}/game")
+
+
+def run(games, grid_size, num_pokemon, player="solver", engine="string", workers=None,
+        batch_size=BATCH_SIZE, seed=0, on_batch=None):
+    """ Play games across a process pool and tally the results as they come.
+
+    Only a few batches per worker are queued at a time, so memory does not
+    grow with the number of games.
+
+    Parameters:
+        games (int): Number of games to play.
+        grid_size (int): The grid size of the games.
+        num_pokemon (int): The number of pokemons in each game.
+        player (str): Name of the player, a key of PLAYERS.
+        engine (str): Name of the board engine, a key of a3.ENGINES.
+        workers (int): Number of worker processes, by default one per CPU.
+            With 1 the games are played in this process.
+        batch_size (int): Games per batch.
+        seed (int): Seed of the run.
+        on_batch (callable): Called with the Tally after each batch, e.g.
+            to show progress.
+
+    Returns:
+        (Tally): Totals over every game.
+
+    Raises:
+        ValueError: If player or engine is not known.
+    """
+    if player not in PLAYERS:
+        raise ValueError(f"unknown player {player!r}, expected one of {sorted(PLAYERS)}")
+    if engine not in a3.ENGINES:
+        raise ValueError(f"unknown board engine {engine!r}, expected one of {sorted(a3.ENGINES)}")
+    settings = (grid_size, num_pokemon, engine, player, seed)
+    batches = [(number, min(batch_size, games - start))
+               for number, start in enumerate(range(0, games, batch_size))]
+    workers = workers or os.cpu_count() or 1
+    tally = Tally()
+
+    def add(data):
+        """ Tally one batch and report progress. """
+        tally.add_batch(data)
+        if on_batch is not None:
+            on_batch(tally)
+
+    if workers == 1:
+        for number, size in batches:
+            add(play_batch(settings, number, size))
+        return tally
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = set()
+        for number, size in batches:
+            if len(pending) >= 4 * workers:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    add(future.result())
+            pending.add(executor.submit(play_batch, settings, number, size))
+        for future in concurrent.futures.as_completed(pending):
+            add(future.result())
+    return tally
+
+
+def main():
+    """ Run self-play games from the command line and print the totals."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--player", default="solver", choices=sorted(PLAYERS))
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=16)
+    parser.add_argument("--pokemon", type=int, default=40)
+    parser.add_argument("--engine", default="string", choices=sorted(a3.ENGINES))
+    parser.add_argument("--workers", type=int, help="worker processes, one per CPU by default")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="games per batch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--progress", action="store_true", help="print the totals after every batch")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(tally):
+        """ Print the totals so far. """
+        print(f"{time.perf_counter() - start:8.1f}s  {tally.summary()}", flush=True)
+
+    tally = run(args.games, args.size, args.pokemon, args.player, args.engine, args.workers,
+                args.batch, args.seed, progress if args.progress else None)
+    elapsed = time.perf_counter() - start
+    print(f"{args.player} on {args.size}x{args.size} pokemon={args.pokemon}: {tally.summary()}")
+    print(f"{elapsed:.2f}s ({tally.get_num_games() / elapsed:,.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
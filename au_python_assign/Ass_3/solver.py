@@ -0,0 +1,316 @@
+"""
+Deduce which covered cells of a Pokemon board are safe and which hold
+Pokemon, from the numbers the player can see.
+
+Usage:
+    python solver.py [--size N] [--pokemon N] [--seed N]
+
+Plays one seeded board from a safe first click as far as deduction alone
+goes, and prints how far it got.
+"""
+
+import argparse
+import functools
+import time
+
+import a3
+
+
+@functools.lru_cache(maxsize=8)
+def neighbour_lists(grid_size):
+    """ Get the neighbours of every cell, built once per grid size.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+
+    Returns:
+        (tuple<tuple<int, ...>, ...>): Indexes of each cell's neighbours.
+    """
+    table = a3.neighbour_table(grid_size)
+    return tuple(tuple(table.neighbours(index)) for index in range(grid_size ** 2))
+
+
+class Solver:
+    """
+    Deduction solver working on the game of a BoardModel.
+
+    Every number next to covered cells is a constraint: the covered cells
+    around it that are not yet known hold exactly that many Pokemon, less
+    the known Pokemon around it. A constraint whose count is zero makes its
+    cells safe, and one whose count equals its size makes them Pokemon.
+    Two overlapping constraints A and B are compared as well: if A's count
+    exceeds B's by the number of A's cells outside B, those cells are all
+    Pokemon and B's cells outside A are all safe. This covers the subset
+    rules.
+
+    Flags are not trusted; flagged cells are treated as covered.
+
+    Only numbers whose surroundings changed since the last deduction are
+    looked at again, and cells are read one at a time with the board's
+    cell_at, so after update a deduction costs what the reveal changed
+    rather than the size of the board.
+    """
+
+    def __init__(self, board):
+        """ Create a solver for a board and read the numbers it shows.
+
+        Parameters:
+            board (BoardModel): Board to solve, of any engine.
+        """
+        self._board = board
+        self._grid_size = board.get_grid_size()
+        self._neighbours = neighbour_lists(self._grid_size).__getitem__
+        self._cell_at = board.cell_at
+        self._constraints = {}
+        self._dirty = set()
+        self._safe = set()
+        self._pokemon = set()
+        self.update()
+
+    def update(self, changed=None):
+        """ Read the board again after cells were revealed.
+
+        Parameters:
+            changed (iterable<int>): Cells revealed since the last update,
+                e.g. the result of reveal_region, or None to rescan the
+                whole board.
+        """
+        if changed is None:
+            self._constraints.clear()
+            self._safe = {i for i in self._safe if self._is_covered(i)}
+            self._pokemon = {i for i in self._pokemon if self._is_covered(i)}
+            self._dirty = set(self._board.get_exposed_cells())
+            return
+
+        cell_at = self._cell_at
+        for index in changed:
+            self._safe.discard(index)
+            if cell_at(index).isdigit():
+                self._dirty.add(index)
+            for neighbour in self._neighbours(index):
+                if cell_at(neighbour).isdigit():
+                    self._dirty.add(neighbour)
+
+    def follow(self, board, changed):
+        """ Switch to a board whose Pokemon were moved, e.g. by a generator.
+
+        What was deduced about the changed cells is forgotten and the
+        numbers around them are read again. What was deduced about other
+        cells is kept: it is still true, as they did not change, though the
+        new numbers may no longer prove it.
+
+        Parameters:
+            board (BoardModel): The new board, of the same size.
+            changed (iterable<int>): Cells whose Pokemon or number changed.
+        """
+        self._board = board
+        self._cell_at = cell_at = board.cell_at
+        for index in changed:
+            self._safe.discard(index)
+            self._pokemon.discard(index)
+            for cell in (index, *self._neighbours(index)):
+                self._constraints.pop(cell, None)
+                if cell_at(cell).isdigit():
+                    self._dirty.add(cell)
+
+    def deduce(self):
+        """ Find every covered cell that the numbers prove safe or a Pokemon.
+
+        Returns:
+            (tuple<frozenset<int>, frozenset<int>>): Covered cells that are
+            safe, and covered cells that hold Pokemon.
+        """
+        self._propagate()
+        return frozenset(self._safe), frozenset(self._pokemon)
+
+    def next_safe(self):
+        """ Get a covered cell which is proven safe.
+
+        Returns:
+            (int): Index of a safe cell, or None if none can be proven.
+        """
+        self._propagate()
+        return next(iter(self._safe), None)
+
+    def get_constraints(self):
+        """ Get what the numbers still say about cells not known yet.
+
+        Returns:
+            (list<tuple<frozenset<int>, int>>): For every number next to
+            unknown cells, those cells and the number of Pokemon among
+            them, once everything that can be deduced has been.
+        """
+        self._propagate()
+        return list(self._constraints.values())
+
+    def _propagate(self):
+        """ Apply the rules to the queued numbers until nothing new follows."""
+        dirty = self._dirty
+        while dirty:
+            cell = dirty.pop()
+            constraint = self._constraint(cell)
+            if constraint is None:
+                self._constraints.pop(cell, None)
+                continue
+            self._constraints[cell] = constraint
+            unknown, count = constraint
+            if count == 0:
+                self._mark(unknown, self._safe)
+            elif count == len(unknown):
+                self._mark(unknown, self._pokemon)
+            else:
+                self._compare(cell, unknown, count)
+
+    def _is_covered(self, index):
+        """ Returns True if the cell is unexposed or flagged.
+
+        Parameters:
+            index (int): The index of the cell in the game string.
+        """
+        return self._cell_at(index) in (a3.UNEXPOSED, a3.FLAG)
+
+    def _constraint(self, cell):
+        """ Build the constraint of a numbered cell, whose number is the one
+        number_at_cell gives for an exposed cell.
+
+        Parameters:
+            cell (int): Index of an exposed cell.
+
+        Returns:
+            (tuple<frozenset<int>, int>): Covered cells around it not known
+            yet and the number of Pokemon among them, or None if every
+            cell around it is known.
+        """
+        count = int(self._cell_at(cell))
+        unknown = []
+        for neighbour in self._neighbours(cell):
+            if neighbour in self._pokemon:
+                count -= 1
+            elif neighbour not in self._safe and self._is_covered(neighbour):
+                unknown.append(neighbour)
+        if not unknown:
+            return None
+        return frozenset(unknown), count
+
+    def _compare(self, cell, unknown, count):
+        """ Apply the pair rule between a constraint and those overlapping it.
+
+        Constraints are facts about the board even when their cells have
+        been deduced since, so stored ones can be compared before they are
+        rebuilt.
+
+        Parameters:
+            cell (int): Numbered cell of the constraint.
+            unknown (frozenset<int>): Its unknown cells.
+            count (int): Pokemon among them.
+        """
+        constraints = self._constraints
+        others = {other for i in unknown for other in self._neighbours(i)
+                  if other != cell and other in constraints}
+        for other in others:
+            other_unknown, other_count = constraints[other]
+            only_here = unknown - other_unknown
+            only_there = other_unknown - unknown
+            if count - other_count == len(only_here):
+                self._mark(only_here, self._pokemon)
+                self._mark(only_there, self._safe)
+            elif other_count - count == len(only_there):
+                self._mark(only_there, self._pokemon)
+                self._mark(only_here, self._safe)
+
+    def _mark(self, cells, known):
+        """ Record deduced cells and queue the numbers around them.
+
+        Parameters:
+            cells (iterable<int>): Cells deduced.
+            known (set<int>): self._safe or self._pokemon.
+        """
+        cell_at = self._cell_at
+        for index in cells:
+            if index in self._safe or index in self._pokemon or not self._is_covered(index):
+                continue
+            known.add(index)
+            for neighbour in self._neighbours(index):
+                if cell_at(neighbour).isdigit():
+                    self._dirty.add(neighbour)
+
+
+def solve(board, solver=None):
+    """ Reveal safe cells for as long as the numbers prove one.
+
+    Safe cells the player has flagged are not revealed, so solving stops
+    once a round opens nothing, even if such cells are left.
+
+    Parameters:
+        board (BoardModel): Board to play on.
+        solver (Solver): Solver already following the board, or None to
+            create one.
+
+    Returns:
+        (int): Number of reveals made.
+    """
+    if solver is None:
+        solver = Solver(board)
+    steps = 0
+    safe = solver.deduce()[0]
+    while safe:
+        # Reveal everything proven so far, then catch up once: cells opened
+        # by an earlier cascade of the same round are skipped.
+        revealed = set()
+        for cell in sorted(safe):
+            if cell not in revealed:
+                opened = board.reveal_region(cell)
+                if opened:
+                    revealed.update(opened)
+                    steps += 1
+        if not revealed:
+            break
+        solver.update(revealed)
+        safe = solver.deduce()[0]
+    return steps
+
+
+def first_safe_cell(board):
+    """ Pick a cell with no Pokemon around it to open the game with.
+
+    Parameters:
+        board (BoardModel): Board to look at.
+
+    Returns:
+        (int): Index of the zero cell closest to the centre, or of any cell
+        without a Pokemon if there is no zero cell, or None if every cell
+        holds a Pokemon.
+    """
+    grid_size = board.get_grid_size()
+    pokemon_locations = board.get_pokemon_locations()
+    counts = a3.counts_for(pokemon_locations, grid_size)
+    centre = (grid_size - 1) / 2
+    empty = [i for i in range(grid_size ** 2) if i not in pokemon_locations]
+    if not empty:
+        return None
+    return min(empty, key=lambda i: (counts[i] != 0,
+                                     abs(i // grid_size - centre) + abs(i % grid_size - centre)))
+
+
+def main():
+    """ Solve a seeded board from a safe first click and print the outcome."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--pokemon", type=int, default=1600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    board = a3.BoardModel.seeded(args.size, args.pokemon, args.seed)
+    board.reveal_region(first_safe_cell(board))
+    start = time.perf_counter()
+    solver = Solver(board)
+    steps = solve(board, solver)
+    elapsed = time.perf_counter() - start
+    safe, pokemon = solver.deduce()
+    print(f"{board.get_board_id()}: {steps} reveals in {elapsed:.3f}s, "
+          f"{board.get_num_unexposed()} cells still covered, {len(pokemon)} Pokemon found, "
+          f"solved={board.get_num_unexposed() == len(board.get_pokemon_locations())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""
+Behavioural tests of the board models in a3.py
+"""
+
+import ast
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from testrunner import OrderedTestCase, TestMaster
+
+MOVES = ("reveal", "flag", "chord", "undo", "redo")
+# Helpers copied between a3.py and Assignment 1's a1_support.py.
+SHARED_HELPERS = ("BoardStore", "cell_code", "NeighbourTable", "neighbour_table",
+                  "pokemon_counts", "counts_for", "PokemonLocations", "board_seeds",
+                  "_BASE36", "_to_base36", "make_board_id", "parse_board_id", "Journal")
+A1_SUPPORT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "..", "Ass_1", "a1_files", "a1_support.py")
+
+
+class A3:
+    BoardModel: ...
+    ENGINES: ...
+    create_board_model: ...
+
+
+class TestA3(OrderedTestCase):
+    a3: A3
+
+
+def has_numpy():
+    """ Check if NumPy is installed. """
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+
+def random_moves(rng, grid_size, count):
+    """ Make a list of moves for play, the same for every engine. """
+    return [(rng.choice(MOVES), rng.randrange(grid_size ** 2)) for _ in range(count)]
+
+
+def play(a3, board, op, index):
+    """ Make one move on a board and return what it reported. """
+    if op == "reveal":
+        if board.cell_at(index) != a3.UNEXPOSED:
+            return None
+        if board.check_loss(index):
+            return "lost"
+        return sorted(board.reveal_region(index))
+    if op == "flag":
+        return board.toggle_flag(index)
+    if op == "chord":
+        return board.chord(index)
+    if op == "undo":
+        return board.undo()
+    return board.redo()
+
+
+def board_state(board):
+    """ The parts of a board every engine must agree on. """
+    return (board.get_game(), board.get_num_unexposed(), board.get_num_flags(),
+            board.get_num_correct_flags(), tuple(sorted(board.get_pokemon_locations())),
+            board.has_won(), tuple(board.get_exposed_cells()))
+
+
+class TestEngines(TestA3):
+    def _check_engine(self, engine, max_size=12):
+        """ Play the same random moves on engine and the string engine """
+        rng = random.Random(engine)
+        for _ in range(40):
+            grid_size = rng.randint(2, max_size)
+            num_pokemon = rng.randint(0, grid_size ** 2 // 3)
+            seed = rng.randrange(10 ** 6)
+            expected = self.a3.create_board_model(grid_size, num_pokemon, "string", seed)
+            actual = self.a3.create_board_model(grid_size, num_pokemon, engine, seed)
+            self.assertEqual(board_state(actual), board_state(expected))
+            for op, index in random_moves(rng, grid_size, 40):
+                self.assertEqual(play(self.a3, actual, op, index),
+                                 play(self.a3, expected, op, index),
+                                 msg=f"{engine} {op} {index} on {expected.get_board_id()}")
+                self.assertEqual(board_state(actual), board_state(expected))
+            game = expected.get_game()
+            self.assertEqual([actual.cell_at(i) for i in range(grid_size ** 2)], list(game))
+
+    def test_numpy_engine(self):
+        """ test the NumPy engine plays like the string engine """
+        if not has_numpy():
+            self.skipTest("NumPy is not installed")
+        self._check_engine("numpy")
+
+    def test_bitboard_engine(self):
+        """ test the bitboard engine plays like the string engine """
+        self._check_engine("bitboard")
+
+    def test_sparse_engine(self):
+        """ test the sparse engine plays like the string engine """
+        self._check_engine("sparse")
+
+    def test_bitboard_size_limit(self):
+        """ test the bitboard engine refuses grids over 64x64 """
+        with self.assertRaises(ValueError):
+            self.a3.create_board_model(65, 10, "bitboard", 1)
+
+
+class TestUndo(TestA3):
+    def _boards(self):
+        """ A board of every engine, with the same Pokemon """
+        return [self.a3.create_board_model(10, 15, engine, 42) for engine in self.a3.ENGINES
+                if engine != "numpy" or has_numpy()]
+
+    def test_undo_redo_walk_history(self):
+        """ test undo steps back through every move and redo forward again """
+        for board in self._boards():
+            rng = random.Random(1)
+            states = [board_state(board)]
+            for op, index in random_moves(rng, 10, 60):
+                if op in ("undo", "redo"):
+                    continue
+                before = board_state(board)
+                play(self.a3, board, op, index)
+                if board_state(board) != before:
+                    states.append(board_state(board))
+
+            for state in reversed(states[:-1]):
+                self.assertTrue(board.undo())
+                self.assertEqual(board_state(board), state)
+            self.assertFalse(board.undo())
+            for state in states[1:]:
+                self.assertTrue(board.redo())
+                self.assertEqual(board_state(board), state)
+            self.assertFalse(board.redo())
+
+    def test_undo_loss(self):
+        """ test a losing click can be taken back """
+        for board in self._boards():
+            before = board_state(board)
+            self.assertTrue(board.check_loss(board.get_pokemon_locations()[0]))
+            self.assertTrue(board.undo())
+            self.assertEqual(board_state(board), before)
+
+    def test_new_move_clears_redo(self):
+        """ test a move after an undo drops the moves undone """
+        for board in self._boards():
+            board.toggle_flag(0)
+            board.undo()
+            board.toggle_flag(1)
+            self.assertFalse(board.redo())
+            self.assertEqual(board.cell_at(0), self.a3.UNEXPOSED)
+            self.assertEqual(board.cell_at(1), self.a3.FLAG)
+
+    def test_history_cap(self):
+        """ test only the last HISTORY_SIZE moves can be undone """
+        extra = 7
+        for board in self._boards():
+            for _ in range(self.a3.HISTORY_SIZE + extra):
+                board.toggle_flag(0)
+            undone = 0
+            while board.undo():
+                undone += 1
+            self.assertEqual(undone, self.a3.HISTORY_SIZE)
+            expected = self.a3.FLAG if extra % 2 else self.a3.UNEXPOSED
+            self.assertEqual(board.cell_at(0), expected)
+
+
+class TestSave(TestA3):
+    def _played_boards(self):
+        """ Boards of every engine part way through a game """
+        rng = random.Random(3)
+        for engine in self.a3.ENGINES:
+            if engine == "numpy" and not has_numpy():
+                continue
+            for grid_size in (1, 5, 13, 30):
+                grid_size = min(grid_size, 8) if engine == "bitboard" else grid_size
+                board = self.a3.create_board_model(grid_size, grid_size ** 2 // 5, engine,
+                                                   rng.randrange(10 ** 6))
+                for op, index in random_moves(rng, grid_size, 30):
+                    play(self.a3, board, op, index)
+                yield engine, board
+
+    def test_round_trip(self):
+        """ test a saved game loads back the same on the engine that saved it """
+        for engine, board in self._played_boards():
+            loaded = self.a3.ENGINES[engine].from_bytes(board.to_bytes())
+            self.assertEqual(board_state(loaded), board_state(board))
+            self.assertEqual(loaded.get_board_id(), board.get_board_id())
+            self.assertEqual(loaded.get_num_attempted_catches(), board.get_num_attempted_catches())
+
+    def test_saves_match_across_engines(self):
+        """ test the string engine reads every engine's saves and writes them back unchanged """
+        for engine, board in self._played_boards():
+            data = board.to_bytes()
+            loaded = self.a3.BoardModel.from_bytes(data)
+            self.assertEqual(board_state(loaded), board_state(board))
+            self.assertEqual(loaded.to_bytes(), data)
+
+    def test_save_file(self):
+        """ test save and load go through a file """
+        board = self.a3.BoardModel.seeded(9, 10, 5)
+        board.reveal_region(0)
+        handle, filename = tempfile.mkstemp(suffix=self.a3.SAVE_EXTENSION)
+        os.close(handle)
+        try:
+            board.save(filename)
+            self.assertEqual(board_state(self.a3.BoardModel.load(filename)), board_state(board))
+        finally:
+            os.remove(filename)
+
+    def test_size(self):
+        """ test cells take 2 bits and the Pokemon 4 bytes each """
+        board = self.a3.BoardModel.seeded(1000, 50000, 1)
+        header = 41
+        self.assertEqual(len(board.to_bytes()), header + 250000 + 4 * 50000)
+
+    def test_placed_pokemon_have_no_board_id(self):
+        """ test a board from with_pokemon has no board ID, even once loaded """
+        board = self.a3.BoardModel.with_pokemon(6, [0, 7, 35], 12)
+        self.assertIsNone(board.get_board_id())
+        self.assertIsNone(self.a3.BoardModel.from_bytes(board.to_bytes()).get_board_id())
+
+    def test_invalid_data(self):
+        """ test damaged saves raise ValueError """
+        data = self.a3.BoardModel.seeded(6, 5, 2).to_bytes()
+        for damaged in (b"", data[:10], data[:-1], data + b"\0", b"XXXX" + data[4:]):
+            with self.assertRaises(ValueError):
+                self.a3.BoardModel.from_bytes(damaged)
+
+
+class TestJournal(TestA3):
+    def _record_game(self, board, journal, rng):
+        """ Play random moves on board, journaling them as PokemonGame does """
+        a3 = self.a3
+        journal.start_game(board.get_board_id())
+        for op, index in random_moves(rng, board.get_grid_size(), 60):
+            if op == "reveal" and board.cell_at(index) == a3.UNEXPOSED:
+                journal.record(a3.JOURNAL_MOVE, index)
+                if board.check_loss(index):
+                    return "lost"
+                board.reveal_region(index)
+            elif op == "flag" and board.toggle_flag(index):
+                journal.record(a3.JOURNAL_FLAG, index)
+            elif op == "chord":
+                num_unexposed = board.get_num_unexposed()
+                lost = board.chord(index)
+                if lost or board.get_num_unexposed() != num_unexposed:
+                    journal.record(a3.JOURNAL_CHORD, index)
+                if lost:
+                    return "lost"
+            elif op == "undo" and board.undo():
+                journal.record(a3.JOURNAL_UNDO)
+            elif op == "redo" and board.redo():
+                journal.record(a3.JOURNAL_REDO)
+            if board.has_won():
+                return "won"
+        return "playing"
+
+    def _record_win(self, board, journal):
+        """ Flag every Pokemon and reveal every other cell, journaling the moves """
+        a3 = self.a3
+        journal.start_game(board.get_board_id())
+        for index in range(board.get_grid_size() ** 2):
+            if index in board.get_pokemon_locations():
+                board.toggle_flag(index)
+                journal.record(a3.JOURNAL_FLAG, index)
+            elif board.cell_at(index) == a3.UNEXPOSED:
+                board.reveal_region(index)
+                journal.record(a3.JOURNAL_MOVE, index)
+        return "won"
+
+    def test_replay(self):
+        """ test replaying a journal gives back every game on every engine """
+        rng = random.Random(8)
+        stream = io.StringIO()
+        journal = self.a3.Journal(stream)
+        games = []
+        for _ in range(30):
+            grid_size = rng.randint(2, 8)
+            board = self.a3.BoardModel.seeded(grid_size, rng.randint(1, grid_size ** 2 // 4),
+                                              rng.randrange(10 ** 6))
+            if len(games) % 5:
+                outcome = self._record_game(board, journal, rng)
+            else:
+                outcome = self._record_win(board, journal)
+            games.append((board.get_board_id(), board_state(board), outcome))
+        lines = stream.getvalue().splitlines()
+
+        for engine in self.a3.ENGINES:
+            if engine == "numpy" and not has_numpy():
+                continue
+            replayed = []
+            for board_id, moves in self.a3.read_journal(lines):
+                grid_size, num_pokemon, seed = self.a3.parse_board_id(board_id)
+                board = self.a3.create_board_model(grid_size, num_pokemon, engine, seed)
+                outcome = self.a3.replay_game(board, moves)
+                replayed.append((board_id, board_state(board), outcome))
+            self.assertEqual(replayed, games, msg=engine)
+
+    def test_bad_line(self):
+        """ test read_journal rejects lines which are not records, giving the line """
+        a3 = self.a3
+        board = f"{a3.JOURNAL_BOARD} {a3.BoardModel.seeded(3, 1, 1).get_board_id()}"
+        for second in (f"{a3.JOURNAL_MOVE} x", f"{a3.JOURNAL_MOVE}", f"{a3.JOURNAL_FLAG} -1",
+                       f"{a3.JOURNAL_UNDO} 4", f"{a3.JOURNAL_REDO} 4", "J 2"):
+            lines = [board, second, f"{a3.JOURNAL_MOVE} 0"]
+            with self.assertRaisesRegex(ValueError, "^line 2 "):
+                list(a3.read_journal(lines))
+        list(a3.read_journal([board, f"{a3.JOURNAL_MOVE} 0", f"{a3.JOURNAL_UNDO}", ""]))
+        with self.assertRaisesRegex(ValueError, "^line 1 "):
+            list(a3.read_journal([f"{a3.JOURNAL_MOVE} 3"]))
+
+    def test_replay_without_tk(self):
+        """ test a3.py and replay.py do not import tkinter """
+        check = "import sys, a3, replay; sys.exit('tkinter' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", check],
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.returncode, 0)
+
+
+class TestInfinite(TestA3):
+    def _pokemon(self, seed, density, chunk_size, top, left, rows, columns):
+        """ Positions of the Pokemon of an infinite board inside a window """
+        board = self.a3.InfiniteBoardModel(density, seed, chunk_size)
+        position = (top, left)
+        while not board.check_loss(position):
+            position = (position[0], position[1] + 1)
+        window = board.get_window(top, left, rows, columns)
+        return {divmod(i, columns) for i, character in enumerate(window)
+                if character == self.a3.POKEMON}
+
+    def test_counts_across_chunks(self):
+        """ test numbers match a finite board with the same Pokemon, across chunk edges """
+        size = 40
+        pokemon = self._pokemon(19, 30, 16, -20, -20, size, size)
+        finite = self.a3.BoardModel.with_pokemon(size, [row * size + column
+                                                        for row, column in pokemon])
+        counts = self.a3.counts_for(finite.get_pokemon_locations(), size)
+        board = self.a3.InfiniteBoardModel(30, 19, 16)
+        for row in range(1, size - 1):
+            for column in range(1, size - 1):
+                if (row, column) not in pokemon:
+                    self.assertEqual(board.number_at_cell((row - 20, column - 20)),
+                                     counts[row * size + column], msg=(row, column))
+
+    def test_evicted_chunks_regenerate(self):
+        """ test chunks evicted from the layout cache are built again the same """
+        cached = self.a3.InfiniteBoardModel(20, 7, 16)
+        evicting = self.a3.InfiniteBoardModel(20, 7, 16, cache_size=2)
+        rng = random.Random(19)
+        positions = [(rng.randint(-200, 200), rng.randint(-200, 200)) for _ in range(300)]
+        for position in positions * 2:
+            self.assertEqual(evicting.number_at_cell(position), cached.number_at_cell(position))
+            self.assertLessEqual(evicting.get_num_chunks_cached(), 2)
+
+    def _zero_cell(self, board):
+        """ A position showing zero near the origin """
+        for column in range(10 ** 6):
+            if board.number_at_cell((0, column)) == 0 and not board.check_loss((0, column)):
+                return 0, column
+
+    def test_limited_cascade(self):
+        """ test a cascade cut at its limit and continued reveals the same cells """
+        whole = self.a3.InfiniteBoardModel(30, 0, 16)
+        start = self._zero_cell(whole)
+        expected = whole.reveal_cells(start)
+        self.assertEqual(whole.get_pending(), ())
+        self.assertGreater(len(expected), 50)
+
+        board = self.a3.InfiniteBoardModel(30, 0, 16)
+        revealed = board.reveal_cells(start, limit=10)
+        self.assertLess(len(revealed), len(expected))
+        self.assertTrue(board.get_pending())
+        while board.get_pending():
+            revealed += board.continue_reveal(limit=10)
+        self.assertEqual(sorted(revealed), sorted(expected))
+        self.assertEqual(board.get_num_exposed(), len(expected))
+        for row, column in revealed:
+            self.assertEqual(board.character_at((row, column)),
+                             str(board.number_at_cell((row, column))))
+
+    def test_cleared_chunks(self):
+        """ test cleared chunks are not stored, and flagging their Pokemon stores them again """
+        board = self.a3.InfiniteBoardModel(1, 5, 8)
+        revealed = board.reveal_cells(self._zero_cell(board), limit=5000)
+        self.assertGreater(board.get_num_chunks_touched(), 20)
+        self.assertLess(board.get_num_chunks_stored(), board.get_num_chunks_touched() // 2)
+        window = board.get_window(-40, -40, 80, 80)
+        for row in range(80):
+            for column in range(80):
+                position = (row - 40, column - 40)
+                character = window[row * 80 + column]
+                if position in revealed:
+                    self.assertEqual(character, str(board.number_at_cell(position)))
+                else:
+                    self.assertIn(character, (self.a3.UNEXPOSED, self.a3.FLAG))
+
+        stored = board.get_num_chunks_stored()
+        for row, column in sorted(self._pokemon(5, 1, 8, -40, -40, 80, 80)):
+            position = (row - 40, column - 40)
+            self.assertEqual(board.flag_cell(position), self.a3.FLAG)
+            self.assertEqual(board.character_at(position), self.a3.FLAG)
+            self.assertEqual(board.reveal_cells(position), [])
+            self.assertEqual(board.flag_cell(position), self.a3.UNEXPOSED)
+        self.assertEqual(board.get_num_chunks_stored(), stored)
+        self.assertEqual(board.get_window(-40, -40, 80, 80), window)
+
+
+class TestSharedHelpers(TestA3):
+    @staticmethod
+    def _definitions(path):
+        """ Source of the module-level definitions in a file, by name """
+        with open(path, newline="") as file:
+            source = file.read().replace("\r\n", "\n")
+        definitions = {}
+        for node in ast.parse(source).body:
+            name = getattr(node, "name", None)
+            if name is None and isinstance(node, ast.Assign):
+                name = getattr(node.targets[0], "id", None)
+            definitions[name] = ast.get_source_segment(source, node)
+        return definitions
+
+    def test_copies_match(self):
+        """ test the helpers copied into a1_support.py are the same as a3.py's """
+        if not os.path.exists(A1_SUPPORT):
+            self.skipTest("a1_support.py is not next to this assignment")
+        a1_support = self._definitions(A1_SUPPORT)
+        a3 = self._definitions(self.a3.__file__)
+        for name in SHARED_HELPERS:
+            self.assertMultiLineEqual(a1_support.get(name, ""), a3.get(name, ""),
+                                      msg=f"{name} differs between a1_support.py and a3.py")
+
+
+def main():
+    test_cases = [
+        TestEngines,
+        TestUndo,
+        TestSave,
+        TestJournal,
+        TestInfinite,
+        TestSharedHelpers,
+    ]
+
+    master = TestMaster(max_diff=None,
+                        suppress_stdout=True,
+                        timeout=60,
+                        include_no_print=True,
+                        scripts=[
+                            ('a3', 'a3.py')
+                        ])
+    master.run(test_cases)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+"""
+Behavioural tests of the tools built on a3.py: the solver, the probabilities,
+the no-guess generator, the board metrics and self-play
+"""
+
+import itertools
+import random
+from array import array
+
+from testrunner import OrderedTestCase, TestMaster
+
+
+class A3:
+    BoardModel: ...
+    ENGINES: ...
+    create_board_model: ...
+
+
+class Solver:
+    Solver: ...
+    solve: ...
+    first_safe_cell: ...
+
+
+class Probability:
+    pokemon_probabilities: ...
+    safest_cell: ...
+
+
+class Generator:
+    safe_zone: ...
+    play_by_deduction: ...
+    place_no_guess: ...
+    no_guess_board: ...
+
+
+class Metrics:
+    Metrics: ...
+    board_metrics: ...
+    batch_metrics: ...
+
+
+class SelfPlay:
+    PLAYERS: ...
+    RECORD_FIELDS: ...
+    RandomPlayer: ...
+    Tally: ...
+    play_batch: ...
+    run: ...
+
+
+class TestTools(OrderedTestCase):
+    a3: A3
+    solver: Solver
+    probability: Probability
+    generator: Generator
+    metrics: Metrics
+    selfplay: SelfPlay
+
+
+def random_boards(a3, rng, count, max_size=12):
+    """ Yield seeded boards of random sizes, each on a random engine. """
+    for _ in range(count):
+        grid_size = rng.randint(3, max_size)
+        num_pokemon = rng.randint(1, grid_size ** 2 // 4)
+        seed = rng.randrange(10 ** 6)
+        engine = rng.choice(sorted(a3.ENGINES))
+        try:
+            board = a3.create_board_model(grid_size, num_pokemon, engine, seed)
+        except ImportError:
+            board = a3.create_board_model(grid_size, num_pokemon, "string", seed)
+        yield board
+
+
+class TestSolver(TestTools):
+    def _check_sound(self, deducer, board):
+        """ Check what the solver deduced against the board's Pokemon """
+        safe, pokemon = deducer.deduce()
+        locations = set(board.get_pokemon_locations())
+        self.assertFalse(safe & locations, msg=f"Pokemon deduced safe on {board.get_board_id()}")
+        self.assertLessEqual(pokemon, locations,
+                             msg=f"safe cells deduced Pokemon on {board.get_board_id()}")
+        for cells, count in deducer.get_constraints():
+            self.assertEqual(len(cells & locations), count)
+
+    def test_sound(self):
+        """ test every cell the solver deduces is right, while it plays """
+        rng = random.Random(21)
+        for board in random_boards(self.a3, rng, 60):
+            board.reveal_region(self.solver.first_safe_cell(board))
+            deducer = self.solver.Solver(board)
+            self._check_sound(deducer, board)
+            while True:
+                cell = deducer.next_safe()
+                if cell is None:
+                    break
+                deducer.update(board.reveal_region(cell))
+                self._check_sound(deducer, board)
+
+    def test_flags_not_trusted(self):
+        """ test wrong flags do not change what the solver deduces """
+        rng = random.Random(2121)
+        for board in random_boards(self.a3, rng, 30):
+            board.reveal_region(self.solver.first_safe_cell(board))
+            covered = [i for i in range(board.get_grid_size() ** 2)
+                       if board.cell_at(i) == self.a3.UNEXPOSED]
+            for index in rng.sample(covered, len(covered) // 3):
+                board.toggle_flag(index)
+            deducer = self.solver.Solver(board)
+            self._check_sound(deducer, board)
+            self.solver.solve(board, deducer)
+            self._check_sound(deducer, board)
+            for index in board.get_pokemon_locations():
+                self.assertIn(board.cell_at(index), (self.a3.UNEXPOSED, self.a3.FLAG))
+
+    def test_solve_stops_on_flagged_safe_cell(self):
+        """ test solve returns when the only safe cells left are flagged """
+        board = self.a3.BoardModel.with_pokemon(3, [0])
+        flag = self.a3.FLAG
+        board.set_game(f"~1{flag}11{flag}{flag}{flag}{flag}")
+        self.assertEqual(self.solver.solve(board), 0)
+        self.assertEqual(self.solver.Solver(board).deduce()[0], {2, 5, 6, 7, 8})
+        self.assertEqual(board.get_num_flags(), 5)
+
+    def test_engines_agree(self):
+        """ test solve plays the same on every engine as on the string engine """
+        rng = random.Random(212)
+        engines = [engine for engine in sorted(self.a3.ENGINES) if engine != "string"]
+        for _ in range(20):
+            grid_size = rng.randint(4, 16)
+            num_pokemon = rng.randint(1, grid_size ** 2 // 5)
+            seed = rng.randrange(10 ** 6)
+            expected = self.a3.create_board_model(grid_size, num_pokemon, "string", seed)
+            click = self.solver.first_safe_cell(expected)
+            expected.reveal_region(click)
+            steps = self.solver.solve(expected)
+            for engine in engines:
+                try:
+                    board = self.a3.create_board_model(grid_size, num_pokemon, engine, seed)
+                except ImportError:
+                    continue
+                board.reveal_region(click)
+                self.assertEqual(self.solver.solve(board), steps, msg=engine)
+                self.assertEqual(board.get_game(), expected.get_game(), msg=engine)
+
+    def test_sparse_without_game_string(self):
+        """ test the solver plays a sparse board without building its game string """
+        board = self.a3.create_board_model(400, 2000, "sparse", 5)
+        expected = self.a3.create_board_model(400, 2000, "string", 5)
+        click = self.solver.first_safe_cell(expected)
+
+        def get_game():
+            raise AssertionError("get_game called")
+
+        board.get_game = get_game
+        board.reveal_region(click)
+        deducer = self.solver.Solver(board)
+        self.solver.solve(board, deducer)
+        deducer.update()
+        expected.reveal_region(click)
+        self.solver.solve(expected)
+        self.assertEqual(board.get_num_unexposed(), expected.get_num_unexposed())
+
+
+class TestProbability(TestTools):
+    def _brute_force(self, board):
+        """ Probabilities from every layout of the Pokemon fitting the numbers """
+        grid_size = board.get_grid_size()
+        neighbour_table = self.a3.neighbour_table(grid_size)
+        game = board.get_game()
+        covered = [i for i, character in enumerate(game)
+                   if character in (self.a3.UNEXPOSED, self.a3.FLAG)]
+        numbers = [(i, int(character), neighbour_table.neighbours(i))
+                   for i, character in enumerate(game) if character.isdigit()]
+        hits = dict.fromkeys(covered, 0)
+        layouts = 0
+        for layout in itertools.combinations(covered, board.get_num_pokemon()):
+            pokemon = set(layout)
+            if all(sum(n in pokemon for n in around) == count for _, count, around in numbers):
+                layouts += 1
+                for index in layout:
+                    hits[index] += 1
+        return {index: found / layouts for index, found in hits.items()}
+
+    def test_brute_force(self):
+        """ test probabilities match enumerating every layout on small boards """
+        rng = random.Random(22)
+        checked = 0
+        while checked < 40:
+            grid_size = rng.randint(3, 5)
+            num_pokemon = rng.randint(1, 6)
+            board = self.a3.create_board_model(grid_size, num_pokemon, "string",
+                                               rng.randrange(10 ** 6))
+            board.reveal_region(self.solver.first_safe_cell(board))
+            covered = board.get_num_unexposed()
+            if covered > 18 or covered == num_pokemon:
+                continue
+            expected = self._brute_force(board)
+            actual = self.probability.pokemon_probabilities(board)
+            self.assertEqual(set(actual), set(expected))
+            for index, chance in expected.items():
+                self.assertAlmostEqual(actual[index], chance, msg=f"cell {index}")
+            checked += 1
+
+    def test_interior(self):
+        """ test covered cells away from every number share the rest evenly """
+        board = self.a3.BoardModel.with_pokemon(4, [5, 15])
+        board.reveal_region(0)
+        probabilities = self.probability.pokemon_probabilities(board)
+        for index, chance in self._brute_force(board).items():
+            self.assertAlmostEqual(probabilities[index], chance, msg=f"cell {index}")
+        for index in (1, 4, 5):
+            self.assertAlmostEqual(probabilities.pop(index), 1 / 3)
+        for chance in probabilities.values():
+            self.assertAlmostEqual(chance, 1 / 12)
+
+    def test_safest_cell(self):
+        """ test safest_cell takes the lowest probability, then the lowest index """
+        self.assertEqual(self.probability.safest_cell({4: 0.5, 2: 0.25, 7: 0.25}), 2)
+        self.assertIsNone(self.probability.safest_cell({}))
+
+
+class TestGenerator(TestTools):
+    def test_won_by_deduction(self):
+        """ test generated boards are won from the first click without guessing """
+        rng = random.Random(23)
+        for engine in sorted(self.a3.ENGINES):
+            for _ in range(5):
+                grid_size = rng.randint(5, 14)
+                num_pokemon = rng.randint(1, grid_size ** 2 // 5)
+                click = rng.randrange(grid_size ** 2)
+                try:
+                    board = self.generator.no_guess_board(grid_size, num_pokemon, click,
+                                                          rng.randrange(10 ** 6), engine)
+                except ImportError:
+                    continue
+                self.assertEqual(board.get_num_unexposed(), grid_size ** 2)
+                pokemon = set(board.get_pokemon_locations())
+                self.assertEqual(len(pokemon), num_pokemon)
+                self.assertFalse(pokemon & self.generator.safe_zone(grid_size, click))
+                self.assertIsNone(board.get_board_id())
+                self.generator.play_by_deduction(board, click)
+                self.assertEqual(board.get_num_unexposed(), num_pokemon, msg=engine)
+
+    def test_reproducible(self):
+        """ test the same seed and first click give the same board """
+        first = self.generator.no_guess_board(12, 30, 50, seed=7)
+        second = self.generator.no_guess_board(12, 30, 50, seed=7)
+        self.assertEqual(first.get_pokemon_locations(), second.get_pokemon_locations())
+
+    def test_repairs(self):
+        """ test dense boards are repaired and still won by deduction """
+        rng = random.Random(2323)
+        pokemon, repairs = self.generator.place_no_guess(16, 60, 0, rng)
+        self.assertGreater(repairs, 0)
+        board = self.a3.BoardModel.with_pokemon(16, pokemon)
+        self.generator.play_by_deduction(board, 0)
+        self.assertEqual(board.get_num_unexposed(), 60)
+
+    def test_repair_keeps_revealed_cells(self):
+        """ test a repair only moves Pokemon onto covered cells outside the safe zone """
+        rng = random.Random(230)
+        zone = self.generator.safe_zone(5, 0)
+        outside = [i for i in range(25) if i not in zone]
+        for _ in range(300):
+            pokemon = set(rng.sample(outside, 14))
+            board = self.a3.BoardModel.with_pokemon(5, sorted(pokemon))
+            deducer = self.generator.play_by_deduction(board, 0)
+            game = board.get_game()
+            source, destination = self.generator._repair(board, deducer, pokemon, zone, rng)
+            self.assertEqual(game[destination], self.a3.UNEXPOSED)
+            self.assertNotIn(destination, zone)
+            self.assertNotIn(source, pokemon)
+            self.assertIn(destination, pokemon)
+
+        pokemon = set(outside)
+        board = self.a3.BoardModel.with_pokemon(5, sorted(pokemon))
+        deducer = self.generator.play_by_deduction(board, 0)
+        with self.assertRaises(ValueError):
+            self.generator._repair(board, deducer, pokemon, zone, rng)
+
+    def test_too_many_pokemon(self):
+        """ test Pokemon which do not fit outside the safe zone are refused """
+        with self.assertRaises(ValueError):
+            self.generator.place_no_guess(4, 8, 5)
+        with self.assertRaises(ValueError):
+            self.generator.place_no_guess(16, 100, 0, random.Random(1), max_repairs=0)
+
+
+class TestMetrics(TestTools):
+    def test_small_layouts(self):
+        """ test metrics of layouts counted by hand """
+        metrics = self.metrics.Metrics
+        self.assertEqual(self.metrics.board_metrics((0,), 3), metrics(1, 1, 0))
+        self.assertEqual(self.metrics.board_metrics((4,), 3), metrics(8, 0, 8))
+        self.assertEqual(self.metrics.board_metrics((2, 7, 12, 17, 22), 5), metrics(2, 2, 0))
+        self.assertEqual(self.metrics.board_metrics((), 4), metrics(1, 1, 0))
+
+    def test_numpy_matches_python(self):
+        """ test batch_metrics gives the same with and without NumPy """
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        rng = random.Random(24)
+        for grid_size in (1, 2, 5, 9, 16):
+            layouts = [tuple(rng.sample(range(grid_size ** 2), rng.randint(0, grid_size ** 2)))
+                       for _ in range(40)]
+            expected = self.metrics.batch_metrics(layouts, grid_size, use_numpy=False)
+            self.assertEqual(expected,
+                             [self.metrics.board_metrics(layout, grid_size) for layout in layouts])
+            self.assertEqual(self.metrics.batch_metrics(layouts, grid_size, use_numpy=True),
+                             expected, msg=f"grid size {grid_size}")
+
+
+class TestSelfPlay(TestTools):
+    def test_same_totals_for_any_workers(self):
+        """ test a seeded run gives the same totals in one process and across workers """
+        for player in sorted(self.selfplay.PLAYERS):
+            one = self.selfplay.run(12, 8, 10, player, workers=1, batch_size=5, seed=3)
+            pool = self.selfplay.run(12, 8, 10, player, workers=2, batch_size=5, seed=3)
+            self.assertEqual(one.get_num_games(), 12)
+            self.assertEqual(pool.get_totals(), one.get_totals(), msg=player)
+            self.assertEqual(pool.summary(), one.summary(), msg=player)
+
+    def test_batch_records(self):
+        """ test a batch packs one record of sensible fields per game """
+        width = len(self.selfplay.RECORD_FIELDS)
+        settings = (8, 10, "string", "solver", 4)
+        data = self.selfplay.play_batch(settings, 0, 20)
+        self.assertEqual(data, self.selfplay.play_batch(settings, 0, 20))
+        records = array("I")
+        records.frombytes(data)
+        self.assertEqual(len(records), 20 * width)
+        for start in range(0, len(records), width):
+            won, moves, guesses, revealed = records[start:start + width]
+            self.assertIn(won, (0, 1))
+            self.assertLessEqual(guesses, moves)
+            self.assertLessEqual(revealed, 8 ** 2 - 10)
+            if won:
+                self.assertEqual(revealed, 8 ** 2 - 10)
+
+        tally = self.selfplay.Tally()
+        tally.add_batch(data)
+        tally.add_batch(data)
+        self.assertEqual(tally.get_num_games(), 40)
+        self.assertEqual(tally.get_totals(),
+                         {field: 2 * sum(records[offset::width])
+                          for offset, field in enumerate(self.selfplay.RECORD_FIELDS)})
+
+    def test_tally(self):
+        """ test the totals and summary of records packed by hand """
+        tally = self.selfplay.Tally()
+        tally.add_batch(array("I", [1, 10, 2, 54, 0, 3, 1, 7]).tobytes())
+        self.assertEqual(tally.get_num_games(), 2)
+        self.assertEqual(tally.get_totals(), {"won": 1, "moves": 13, "guesses": 3, "revealed": 61})
+        self.assertEqual(tally.summary(), "2 games, won 1 (50.00%), moves 6.5/game (10.0/win), "
+                                          "guesses 1.50/game, revealed 30.5/game")
+
+    def test_no_cell_left(self):
+        """ test a player with every covered cell avoided picks nothing """
+        board = self.a3.BoardModel.seeded(4, 3, 1)
+        player = self.selfplay.RandomPlayer(board, random.Random(1))
+        self.assertIsNone(player._random_cell(set(range(16))))
+        self.assertIn(player._random_cell({0}), range(1, 16))
+
+
+def main():
+    test_cases = [
+        TestSolver,
+        TestProbability,
+        TestGenerator,
+        TestMetrics,
+        TestSelfPlay,
+    ]
+
+    master = TestMaster(max_diff=None,
+                        suppress_stdout=True,
+                        timeout=60,
+                        include_no_print=True,
+                        scripts=[
+                            ('a3', 'a3.py'),
+                            ('solver', 'solver.py'),
+                            ('probability', 'probability.py'),
+                            ('generator', 'generator.py'),
+                            ('metrics', 'metrics.py'),
+                            ('selfplay', 'selfplay.py'),
+                        ])
+    master.run(test_cases)
+
+
+if __name__ == '__main__':
+    main()